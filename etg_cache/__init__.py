@@ -0,0 +1,17 @@
+# 页面缓存相关的工具
+from .metadata import build_metadata, read_metadata, write_metadata, content_hash
+from .pages import (PAGE_EMPTY, PAGE_MISSING, PAGE_VALID, classify_page, list_cached_keys, page_status, read_cached_page,
+                    save_cached_page)
+from .stores import (PageCache, DirectoryCache, BlobStore, SqliteCache, PackedArchive, CACHE_BACKENDS,
+                     DEFAULT_CACHE_BACKEND, create_page_cache, copy_pages, build_pack)
+from .index import CacheIndex
+from .policy import CacheManifest, CachePolicy, EVICTION_POLICIES, ManagedCache
+from .revalidate import RevalidationReport, revalidate_cache
+from .trim import is_trimmed, trim_page
+
+__all__ = ['build_metadata', 'read_metadata', 'write_metadata', 'content_hash',
+           'PAGE_EMPTY', 'PAGE_MISSING', 'PAGE_VALID', 'classify_page', 'list_cached_keys', 'page_status',
+           'read_cached_page', 'save_cached_page',
+           'PageCache', 'DirectoryCache', 'BlobStore', 'SqliteCache', 'PackedArchive', 'CACHE_BACKENDS',
+           'DEFAULT_CACHE_BACKEND', 'create_page_cache', 'copy_pages', 'build_pack',
+           'CacheIndex', 'CacheManifest', 'CachePolicy', 'EVICTION_POLICIES', 'ManagedCache', 'RevalidationReport', 'revalidate_cache', 'is_trimmed', 'trim_page']
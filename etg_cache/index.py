@@ -0,0 +1,73 @@
+import threading
+import time
+
+
+class CacheIndex:
+    """
+    启动时建立一次的缓存索引
+
+    只扫描一次缓存（目录缓存只做一次listdir），之后判断某个key是否有缓存
+    都在内存中完成，不再逐个探测文件；同时统计命中、别名命中和未命中次数。
+
+    参数:
+    - cache: 被索引的PageCache
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        start = time.time()
+        self._keys = set(cache.keys())
+        self.build_time = time.time() - start
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.hits = 0
+        self.alias_hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+    def lookup(self, key, requested=None):
+        """
+        查询key是否有缓存，并计入统计
+
+        参数:
+        - key: 要读取的页面key（通常是标准化后的wiki_key）
+        - requested: 调用方原本请求的key（物品key），与key不同时命中计为别名命中
+
+        返回:
+        - 有缓存时返回key，否则返回None
+        """
+        found = key in self._keys
+        with self._lock:
+            if not found:
+                self.misses += 1
+            elif requested is not None and requested != key:
+                self.alias_hits += 1
+            else:
+                self.hits += 1
+        return key if found else None
+
+    def add(self, key):
+        """新页面写入缓存后登记到索引"""
+        with self._lock:
+            self._keys.add(key)
+
+    def report(self):
+        """
+        生成索引统计报告文本
+
+        返回:
+        - 多行报告字符串
+        """
+        lookups = self.hits + self.alias_hits + self.misses
+        hit_rate = (self.hits + self.alias_hits) / lookups if lookups else 0.0
+        return "\n".join([
+            f"缓存索引统计 ({self.cache.describe()}):",
+            f"索引页面: {len(self._keys)}，建立用时: {self.build_time:.3f} 秒",
+            f"查询: {lookups}，命中: {self.hits}，别名命中: {self.alias_hits}，未命中: {self.misses}，命中率: {hit_rate:.1%}",
+        ])
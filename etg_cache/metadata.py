@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import re
+import time
+
+# 元数据旁路文件的后缀，例如 cache/ak-47.html 对应 cache/ak-47.meta.json
+META_SUFFIX = '.meta.json'
+
+# wikidot页面信息中的版本号，中英文界面各一种写法
+REVISION_PATTERNS = [
+    re.compile(r'页面版本[:：]\s*(\d+)'),
+    re.compile(r'page revision[:：]\s*(\d+)', re.IGNORECASE),
+    # 裁剪后的页面把版本号保存在meta标签中
+    re.compile(r'<meta name="wiki-revision" content="(\d+)">'),
+]
+PAGE_ID_PATTERNS = [
+    re.compile(r'WIKIREQUEST\.info\.pageId\s*=\s*(\d+)'),
+    re.compile(r'<meta name="wiki-page-id" content="(\d+)">'),
+]
+
+
+def content_hash(html_content):
+    """
+    计算页面内容的SHA-256
+
+    参数:
+    - html_content: 页面HTML字符串或bytes
+
+    返回:
+    - 十六进制哈希字符串
+    """
+    if isinstance(html_content, str):
+        html_content = html_content.encode('utf-8')
+    return hashlib.sha256(html_content).hexdigest()
+
+
+def extract_revision(html_content):
+    """
+    从页面中提取wikidot的页面版本号和pageId
+
+    返回:
+    - (revision, page_id)，找不到时为None
+    """
+    revision = None
+    for pattern in REVISION_PATTERNS:
+        match = pattern.search(html_content)
+        if match:
+            revision = int(match.group(1))
+            break
+    page_id = None
+    for pattern in PAGE_ID_PATTERNS:
+        match = pattern.search(html_content)
+        if match:
+            page_id = int(match.group(1))
+            break
+    return revision, page_id
+
+
+def meta_path(cache_dir, wiki_key):
+    """返回wiki_key对应的元数据文件路径"""
+    return os.path.join(cache_dir, f"{wiki_key}{META_SUFFIX}")
+
+
+def build_metadata(wiki_key, html_content, url=None, status_code=None, headers=None, backend=None, fetched_at=None):
+    """
+    为一个缓存页面生成元数据
+
+    参数:
+    - wiki_key: 页面的wiki_key
+    - html_content: 页面HTML内容
+    - url: 请求的URL
+    - status_code: HTTP状态码
+    - headers: 响应头，用于记录ETag和Last-Modified
+    - backend: 获取页面的后端名称
+    - fetched_at: 获取时间戳，默认为当前时间
+
+    返回:
+    - 元数据字典
+    """
+    headers = headers or {}
+    revision, page_id = extract_revision(html_content)
+    now = fetched_at if fetched_at is not None else time.time()
+    return {
+        "key": wiki_key,
+        "url": url,
+        "fetched_at": now,
+        "validated_at": now,
+        "sha256": content_hash(html_content),
+        "size": len(html_content.encode('utf-8')),
+        "etag": headers.get('ETag') or headers.get('etag'),
+        "last_modified": headers.get('Last-Modified') or headers.get('last-modified'),
+        "revision": revision,
+        "page_id": page_id,
+        "status_code": status_code,
+        "backend": backend,
+    }
+
+
+def read_metadata(cache_dir, wiki_key):
+    """
+    读取页面的元数据
+
+    返回:
+    - 元数据字典，不存在或损坏时返回None
+    """
+    path = meta_path(cache_dir, wiki_key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"读取元数据 {path} 失败: {e}")
+        return None
+
+
+def write_metadata(cache_dir, wiki_key, metadata):
+    """把元数据写入旁路文件"""
+    with open(meta_path(cache_dir, wiki_key), 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+
+def conditional_headers(metadata):
+    """
+    根据已有元数据生成条件请求头
+
+    返回:
+    - 请求头字典，没有可用的校验信息时为空
+    """
+    headers = {}
+    if not metadata:
+        return headers
+    if metadata.get('etag'):
+        headers['If-None-Match'] = metadata['etag']
+    if metadata.get('last_modified'):
+        headers['If-Modified-Since'] = metadata['last_modified']
+    return headers
@@ -0,0 +1,132 @@
+import os
+import re
+
+from .metadata import build_metadata, write_metadata
+from .trim import PAGE_CONTENT_START, trim_page
+
+
+# 页面状态：正常页面，wikidot的“页面不存在”存根页面，或内容为空/获取失败（没有#page-content）的页面
+PAGE_VALID = 'valid'
+PAGE_MISSING = 'missing'
+PAGE_EMPTY = 'empty'
+
+# 存根页面中<em>标签里是请求的页面名
+MISSING_KEY_PATTERN = re.compile(r'<em>(.*?)</em>')
+
+
+def classify_page(html_content):
+    """
+    判断页面的状态，存根页面同时提取其中的<em>关键词
+
+    与utils/check_invalid_html.py以前的判断规则一致，页面写入缓存时调用一次，结果记录在元数据和缓存清单中
+
+    返回:
+    - (状态, 存根页面的关键词)，状态为PAGE_VALID、PAGE_MISSING或PAGE_EMPTY，关键词只有存根页面才有
+    """
+    if not html_content or not html_content.strip():
+        return PAGE_EMPTY, None
+    if "你想访问的页面" in html_content and "不存在" in html_content:
+        match = MISSING_KEY_PATTERN.search(html_content)
+        return PAGE_MISSING, match.group(1) if match else None
+    if PAGE_CONTENT_START.search(html_content) is None:
+        return PAGE_EMPTY, None
+    return PAGE_VALID, None
+
+
+def page_status(html_content):
+    """
+    判断缓存页面的状态
+
+    返回:
+    - PAGE_VALID、PAGE_MISSING或PAGE_EMPTY
+    """
+    return classify_page(html_content)[0]
+
+
+def page_path(cache_dir, wiki_key):
+    """返回wiki_key对应的缓存HTML文件路径"""
+    return os.path.join(cache_dir, f"{wiki_key}.html")
+
+
+def list_cached_keys(cache_dir):
+    """
+    列出缓存目录中的所有页面key
+
+    返回:
+    - 排序后的wiki_key列表
+    """
+    if not os.path.exists(cache_dir):
+        return []
+    return sorted(f[:-5] for f in os.listdir(cache_dir) if f.endswith('.html'))
+
+
+def read_cached_page(cache_dir, wiki_key):
+    """
+    读取缓存页面
+
+    返回:
+    - 页面HTML内容，不存在时返回None
+    """
+    # 直接打开，不先探测文件是否存在，省一次stat
+    try:
+        with open(page_path(cache_dir, wiki_key), 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def prepare_cached_page(wiki_key, html_content, page=None, trim=False):
+    """
+    生成要写入缓存的页面内容和元数据
+
+    参数:
+    - wiki_key: 页面的wiki_key
+    - html_content: 页面HTML内容
+    - page: 获取页面时的PageResponse（可选），用于记录状态码和ETag/Last-Modified
+    - trim: 是否只保存#page-content子树；元数据中的哈希和大小仍按原始页面计算，便于重新验证
+
+    返回:
+    - (实际保存的HTML, 元数据字典)
+    """
+    metadata = build_metadata(
+        wiki_key, html_content,
+        url=getattr(page, 'url', None),
+        status_code=getattr(page, 'status_code', None),
+        headers=getattr(page, 'headers', None),
+        backend=getattr(page, 'backend', None),
+    )
+    # 按原始页面分类一次，之后按状态查询时不需要再读取页面
+    metadata['status'], metadata['missing_key'] = classify_page(html_content)
+    if trim:
+        trimmed = trim_page(html_content)
+        if trimmed is not None:
+            html_content = trimmed
+            mark_trimmed(metadata, html_content)
+    return html_content, metadata
+
+
+def save_cached_page(cache_dir, wiki_key, html_content, page=None, trim=False):
+    """
+    把页面写入缓存，并生成元数据旁路文件
+
+    参数:
+    - cache_dir: 缓存目录
+    - wiki_key: 页面的wiki_key
+    - html_content: 页面HTML内容
+    - page: 获取页面时的PageResponse（可选）
+    - trim: 是否只保存#page-content子树
+
+    返回:
+    - 写入的元数据字典
+    """
+    html_content, metadata = prepare_cached_page(wiki_key, html_content, page, trim)
+    with open(page_path(cache_dir, wiki_key), 'w', encoding='utf-8') as f:
+        f.write(html_content)
+    write_metadata(cache_dir, wiki_key, metadata)
+    return metadata
+
+
+def mark_trimmed(metadata, trimmed_content):
+    """在元数据中记录页面已裁剪及裁剪后的大小"""
+    metadata['trimmed'] = True
+    metadata['stored_size'] = len(trimmed_content.encode('utf-8'))
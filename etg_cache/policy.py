@@ -0,0 +1,442 @@
+import json
+import os
+import threading
+import time
+
+from .pages import PAGE_MISSING, PAGE_VALID, classify_page
+from .stores import PageCache
+
+# 淘汰策略：lru按最近访问时间，lrf按最近获取时间
+EVICTION_POLICIES = ('lru', 'lrf')
+
+# cache stats中年龄分布的分段（天）
+AGE_BUCKETS = [(1, '1天内'), (7, '1~7天'), (30, '7~30天'), (90, '30~90天'), (None, '90天以上')]
+
+DAY = 24 * 60 * 60
+
+
+class CachePolicy:
+    """
+    缓存容量和过期策略
+
+    参数:
+    - max_bytes: 缓存总大小上限（字节），None表示不限制
+    - ttl: 页面获取后的有效期（秒），None表示永不过期
+    - eviction: 超出上限时的淘汰顺序，'lru'（最久未访问）或'lrf'（最早获取）
+    """
+
+    def __init__(self, max_bytes=None, ttl=None, eviction='lru'):
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"未知的淘汰策略: {eviction}，可选: {', '.join(EVICTION_POLICIES)}")
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.eviction = eviction
+
+    def expired(self, entry, now):
+        """页面自获取（或最近一次重新验证）起超过有效期即为过期"""
+        if self.ttl is None:
+            return False
+        fresh_since = max(entry.get('fetched_at') or now, entry.get('validated_at') or 0)
+        return now - fresh_since > self.ttl
+
+    def eviction_order(self, entries):
+        """按淘汰先后排序的key列表"""
+        field = 'last_access' if self.eviction == 'lru' else 'fetched_at'
+        return sorted(entries, key=lambda key: (entries[key].get(field) or 0, key))
+
+    def describe(self):
+        budget = f"{self.max_bytes / 1024 / 1024:.1f} MB" if self.max_bytes is not None else "不限"
+        ttl = f"{self.ttl / DAY:g} 天" if self.ttl is not None else "永不过期"
+        return f"容量上限: {budget}，有效期: {ttl}，淘汰策略: {self.eviction}"
+
+
+class CacheManifest:
+    """
+    记录每个缓存页面大小、状态、获取时间和访问时间的清单
+
+    访问时间记录在清单中而不是依赖文件系统的atime，所有缓存后端都能使用。
+    页面状态（正常、存根页面及其<em>关键词、空页面）在写入时分类一次，之后按状态查询不再读取页面。
+    清单还累计跨多次运行的命中和未命中次数。
+
+    参数:
+    - path: 清单文件路径
+    """
+
+    VERSION = 1
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.entries = data.get('entries', {})
+            self.hits = data.get('hits', 0)
+            self.misses = data.get('misses', 0)
+
+    def sync(self, cache):
+        """
+        把清单中缺少的缓存页面补进来，并去掉已经不在缓存中的条目
+
+        旧清单中没有页面状态的条目在这里补做一次分类
+
+        参数:
+        - cache: 清单对应的PageCache
+        """
+        keys = set(cache.keys())
+        now = time.time()
+        with self._lock:
+            for key in list(self.entries):
+                if key not in keys:
+                    del self.entries[key]
+                    self.dirty = True
+            for key in keys - set(self.entries):
+                metadata = cache.get_metadata(key) or {}
+                size = metadata.get('stored_size') or metadata.get('size')
+                html_content = None
+                if size is None or 'status' not in metadata:
+                    html_content = cache.get(key) or ''
+                    size = len(html_content.encode('utf-8')) if size is None else size
+                fetched_at = metadata.get('fetched_at') or cache.modified_time(key) or now
+                self.entries[key] = {'size': size, 'fetched_at': fetched_at, 'last_access': fetched_at, 'hits': 0}
+                self._set_status(self.entries[key], metadata, html_content)
+                self.dirty = True
+            for key, entry in self.entries.items():
+                if 'status' not in entry:
+                    self._set_status(entry, {}, cache.get(key) or '')
+                    self.dirty = True
+
+    @staticmethod
+    def _set_status(entry, metadata, html_content):
+        """按元数据中的分类结果设置页面状态，元数据中没有时对页面做一次分类"""
+        if 'status' in metadata:
+            status, missing_key = metadata['status'], metadata.get('missing_key')
+        else:
+            status, missing_key = classify_page(html_content)
+        entry['status'] = status
+        if missing_key is not None:
+            entry['missing_key'] = missing_key
+
+    def record_access(self, key, now=None):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry['last_access'] = now or time.time()
+                entry['hits'] = entry.get('hits', 0) + 1
+            self.hits += 1
+            self.dirty = True
+
+    def record_write(self, key, size, fetched_at=None, now=None, count_miss=True, status=PAGE_VALID, missing_key=None):
+        """
+        登记新写入的页面
+
+        参数:
+        - count_miss: 是否计为一次未命中（下载），登记别名时为False
+        - status: 写入时分类得到的页面状态
+        - missing_key: 存根页面的<em>关键词
+        """
+        now = now or time.time()
+        with self._lock:
+            self.entries[key] = {'size': size, 'fetched_at': fetched_at or now, 'last_access': now, 'hits': 0,
+                                 'status': status}
+            if missing_key is not None:
+                self.entries[key]['missing_key'] = missing_key
+            if count_miss:
+                self.misses += 1
+            self.dirty = True
+
+    def record_validation(self, key, validated_at):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry['validated_at'] = validated_at
+                self.dirty = True
+
+    def remove(self, key):
+        with self._lock:
+            if self.entries.pop(key, None) is not None:
+                self.dirty = True
+
+    def keys_by_status(self, status):
+        """按写入时记录的状态查询页面key（排序）"""
+        return sorted(key for key, entry in self.entries.items() if entry.get('status') == status)
+
+    def total_size(self):
+        return sum(entry.get('size', 0) for entry in self.entries.values())
+
+    def save(self):
+        """把清单写回文件（先写临时文件再替换）"""
+        with self._lock:
+            if not self.dirty:
+                return
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.VERSION, 'hits': self.hits, 'misses': self.misses,
+                           'entries': self.entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+
+class GcReport:
+    """
+    一次缓存回收的结果
+    """
+
+    def __init__(self):
+        self.expired = []
+        self.evicted = []
+        # 随页面一起删除的别名
+        self.aliases = []
+        self.reclaimed_bytes = 0
+        self.disk_before = 0
+        self.disk_after = 0
+        self.dry_run = False
+
+    def report(self):
+        action = "将回收" if self.dry_run else "已回收"
+        lines = [
+            "缓存回收结果:",
+            f"过期页面: {len(self.expired)}，超出容量淘汰: {len(self.evicted)}，随页面删除的别名: {len(self.aliases)}",
+            f"{action}: {self.reclaimed_bytes / 1024:.1f} KB (按清单中的页面大小)",
+        ]
+        if not self.dry_run:
+            lines.append(f"磁盘占用: {self.disk_before / 1024 / 1024:.2f} MB -> {self.disk_after / 1024 / 1024:.2f} MB")
+        return "\n".join(lines)
+
+
+class ManagedCache(PageCache):
+    """
+    在任意缓存后端外加一层容量和过期策略
+
+    读取时在清单中记录访问时间，过期的页面视为未缓存；
+    写入后如果总大小超出上限，按策略淘汰页面。
+
+    参数:
+    - cache: 被管理的PageCache
+    - policy: CachePolicy，默认不限容量、不过期，只记录访问
+    - manifest_path: 清单路径，默认由缓存后端决定
+    """
+
+    def __init__(self, cache, policy=None, manifest_path=None):
+        super().__init__(cache.path)
+        self.cache = cache
+        self.name = cache.name
+        self.read_only = cache.read_only
+        self.policy = policy or CachePolicy()
+        self.manifest = CacheManifest(manifest_path or cache.manifest_path())
+        self.manifest.sync(cache)
+
+    def _expired(self, key, now=None):
+        if self.policy.ttl is None:
+            return False
+        # 别名随它指向的页面一起过期
+        entry = self.manifest.entries.get(self.cache.alias_target(key) or key)
+        return entry is not None and self.policy.expired(entry, now or time.time())
+
+    def _aliases(self):
+        """清单中的别名 {别名: 指向的页面key}"""
+        pages = set(self.cache.page_keys())
+        aliases = {key: self.cache.alias_target(key) for key in self.manifest.entries if key not in pages}
+        return {alias: key for alias, key in aliases.items() if key is not None}
+
+    def get(self, key):
+        if self._expired(key):
+            return None
+        html_content = self.cache.get(key)
+        if html_content is not None:
+            self.manifest.record_access(key)
+        return html_content
+
+    def get_many(self, keys):
+        pages = self.cache.get_many([key for key in keys if not self._expired(key)])
+        now = time.time()
+        for key in pages:
+            self.manifest.record_access(key, now)
+        return pages
+
+    def put(self, key, html_content, metadata):
+        self.cache.put(key, html_content, metadata)
+        metadata = metadata or {}
+        size = metadata.get('stored_size') or len(html_content.encode('utf-8'))
+        if 'status' in metadata:
+            status, missing_key = metadata['status'], metadata.get('missing_key')
+        else:
+            status, missing_key = classify_page(html_content)
+        self.manifest.record_write(key, size, metadata.get('fetched_at'), status=status, missing_key=missing_key)
+        if self.policy.max_bytes is not None and self.manifest.total_size() > self.policy.max_bytes:
+            # 刚写入的页面最后才考虑淘汰
+            self.gc(protect={key})
+
+    def keys(self):
+        now = time.time()
+        return [key for key in self.cache.keys() if not self._expired(key, now)]
+
+    def page_keys(self):
+        now = time.time()
+        return [key for key in self.cache.page_keys() if not self._expired(key, now)]
+
+    def alias_target(self, key):
+        return self.cache.alias_target(key)
+
+    def keys_by_status(self, status):
+        # 直接查询清单中写入时记录的状态，不读取页面
+        now = time.time()
+        return [key for key in self.manifest.keys_by_status(status) if not self._expired(key, now)]
+
+    def status_of(self, key):
+        """
+        查询页面写入时记录的状态
+
+        返回:
+        - PAGE_VALID、PAGE_MISSING或PAGE_EMPTY，清单中没有该页面时返回None
+        """
+        entry = self.manifest.entries.get(key)
+        return entry.get('status') if entry else None
+
+    def missing_pages(self):
+        """
+        列出所有存根页面及其<em>关键词
+
+        返回:
+        - {key: 关键词}，没有提取到关键词时为None
+        """
+        return {key: self.manifest.entries[key].get('missing_key') for key in self.keys_by_status(PAGE_MISSING)}
+
+    def __contains__(self, key):
+        return key in self.cache and not self._expired(key)
+
+    def get_metadata(self, key):
+        return self.cache.get_metadata(key)
+
+    def set_metadata(self, key, metadata):
+        self.cache.set_metadata(key, metadata)
+        if metadata.get('validated_at'):
+            # 重新验证确认内容未变后，页面重新计算有效期
+            self.manifest.record_validation(self.cache.alias_target(key) or key, metadata['validated_at'])
+
+    def delete(self, key):
+        return self._delete(key, [alias for alias, target in self._aliases().items() if target == key])
+
+    def _delete(self, key, aliases):
+        # 后端删除页面时会一并删除指向它的别名，清单中的别名条目也要去掉
+        deleted = self.cache.delete(key)
+        for removed_key in [key] + aliases:
+            self.manifest.remove(removed_key)
+        return deleted
+
+    def link(self, alias, key):
+        linked = self.cache.link(alias, key)
+        if linked:
+            entry = self.manifest.entries.get(key, {})
+            self.manifest.record_write(alias, 0, entry.get('fetched_at'), count_miss=False,
+                                       status=entry.get('status', PAGE_VALID), missing_key=entry.get('missing_key'))
+        return linked
+
+    def modified_time(self, key):
+        return self.cache.modified_time(key)
+
+    def disk_usage(self):
+        return self.cache.disk_usage()
+
+    def manifest_path(self):
+        return self.manifest.path
+
+    def gc(self, dry_run=False, protect=(), now=None):
+        """
+        删除过期页面，再按淘汰策略把总大小降到上限以内
+
+        只有页面本身参与过期和淘汰，通过别名的访问记在它指向的页面上，
+        页面被删除时指向它的别名一并删除。
+
+        参数:
+        - dry_run: 只计算要删除哪些页面，不实际删除
+        - protect: 本次不淘汰的key
+        - now: 计算过期和淘汰顺序的当前时间，默认time.time()
+
+        返回:
+        - GcReport
+        """
+        report = GcReport()
+        report.dry_run = dry_run
+        report.disk_before = self.cache.disk_usage()
+        now = now or time.time()
+        aliases = self._aliases()
+        aliases_of = {}
+        for alias, key in aliases.items():
+            aliases_of.setdefault(key, []).append(alias)
+        entries = {}
+        for key, entry in self.manifest.entries.items():
+            if key in aliases:
+                continue
+            last_access = [self.manifest.entries[alias].get('last_access') or 0 for alias in aliases_of.get(key, [])]
+            entries[key] = dict(entry, last_access=max([entry.get('last_access') or 0] + last_access))
+
+        for key, entry in entries.items():
+            if key not in protect and self.policy.expired(entry, now):
+                report.expired.append(key)
+        remaining = {key: entry for key, entry in entries.items() if key not in report.expired}
+
+        if self.policy.max_bytes is not None:
+            total = sum(entry.get('size', 0) for entry in remaining.values())
+            for key in self.policy.eviction_order(remaining):
+                if total <= self.policy.max_bytes:
+                    break
+                if key in protect:
+                    continue
+                report.evicted.append(key)
+                total -= remaining[key].get('size', 0)
+
+        for key in report.expired + report.evicted:
+            report.reclaimed_bytes += entries[key].get('size', 0)
+            report.aliases.extend(aliases_of.get(key, []))
+            if not dry_run:
+                self._delete(key, aliases_of.get(key, []))
+        if not dry_run:
+            self.manifest.save()
+        report.disk_after = self.cache.disk_usage() if not dry_run else report.disk_before
+        return report
+
+    def stats(self):
+        """
+        汇总缓存统计：大小、命中率和年龄分布
+
+        返回:
+        - 多行报告字符串
+        """
+        now = time.time()
+        entries = self.manifest.entries
+        lookups = self.manifest.hits + self.manifest.misses
+        hit_ratio = self.manifest.hits / lookups if lookups else 0.0
+        expired = sum(1 for entry in entries.values() if self.policy.expired(entry, now))
+
+        lines = [
+            f"缓存统计 ({self.cache.describe()}):",
+            self.policy.describe(),
+            f"页面: {len(entries)}，已过期: {expired}",
+            f"清单中的页面大小: {self.manifest.total_size() / 1024 / 1024:.2f} MB，"
+            f"实际磁盘占用: {self.cache.disk_usage() / 1024 / 1024:.2f} MB",
+            f"累计命中: {self.manifest.hits}，未命中(下载): {self.manifest.misses}，命中率: {hit_ratio:.1%}",
+        ]
+        for title, field in (("获取时间", 'fetched_at'), ("最近访问", 'last_access')):
+            counts = [0] * len(AGE_BUCKETS)
+            for entry in entries.values():
+                age = (now - (entry.get(field) or now)) / DAY
+                for i, (limit, _) in enumerate(AGE_BUCKETS):
+                    if limit is None or age < limit:
+                        counts[i] += 1
+                        break
+            buckets = "，".join(f"{label}: {count}" for (_, label), count in zip(AGE_BUCKETS, counts))
+            lines.append(f"{title}分布: {buckets}")
+        return "\n".join(lines)
+
+    def close(self):
+        if not self.read_only:
+            self.manifest.save()
+        self.cache.close()
+
+    def describe(self):
+        return self.cache.describe()
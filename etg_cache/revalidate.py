@@ -0,0 +1,137 @@
+import time
+
+from .metadata import build_metadata, conditional_headers, content_hash
+from .stores import DirectoryCache
+from .trim import is_trimmed
+
+
+class RevalidationReport:
+    """
+    一次缓存重新验证的统计结果
+    """
+
+    def __init__(self):
+        self.fresh = 0          # 条件请求返回304
+        self.unchanged = 0      # 返回200但内容哈希相同
+        self.changed = 0        # 内容有变化，已重新写入缓存
+        self.failed = 0
+        self.bytes_saved = 0
+        self.bytes_downloaded = 0
+        self.changed_keys = []
+        self.elapsed = 0.0
+
+    @property
+    def checked(self):
+        return self.fresh + self.unchanged + self.changed + self.failed
+
+    def report(self):
+        """
+        生成统计报告文本
+
+        返回:
+        - 多行报告字符串
+        """
+        lines = [
+            "缓存重新验证统计:",
+            f"检查页面: {self.checked}，用时: {self.elapsed:.2f} 秒",
+            f"确认未变化: {self.fresh + self.unchanged} (304: {self.fresh}，内容相同: {self.unchanged})",
+            f"已更新: {self.changed}，失败: {self.failed}",
+            f"节省下载: {self.bytes_saved / 1024:.1f} KB，实际下载: {self.bytes_downloaded / 1024:.1f} KB",
+        ]
+        if self.changed_keys:
+            lines.append(f"更新的页面: {', '.join(self.changed_keys)}")
+        return "\n".join(lines)
+
+
+def revalidate_page(cache, wiki_key, backend, report, retry_engine=None, trim=False):
+    """
+    用条件请求验证单个缓存页面，只在内容变化时重新写入
+
+    参数:
+    - cache: 缓存后端（PageCache）
+    - wiki_key: 页面的wiki_key
+    - backend: 支持条件请求的页面获取后端（HttpBackend）
+    - report: 累计结果的RevalidationReport
+    - retry_engine: 重试引擎（可选）
+    - trim: 是否只保存#page-content子树；缓存中的页面已经裁剪过时总是裁剪
+
+    返回:
+    - 'fresh'、'unchanged'、'changed'或'failed'
+    """
+    html_content = cache.get(wiki_key)
+    metadata = cache.get_metadata(wiki_key)
+    # 已裁剪的缓存继续以裁剪形式保存；没有元数据的旧缓存按页面本身判断
+    trim = trim or bool(metadata and metadata.get('trimmed')) or bool(html_content and is_trimmed(html_content))
+    if metadata is None and html_content is not None:
+        # 旧缓存没有元数据，先补一份，没有ETag时只能比较内容哈希
+        metadata = build_metadata(wiki_key, html_content, fetched_at=cache.modified_time(wiki_key))
+    headers = conditional_headers(metadata)
+
+    try:
+        if retry_engine:
+            page = retry_engine.call(backend.fetch_page, wiki_key, headers, description=f"验证页面 {wiki_key} ")
+        else:
+            page = backend.fetch_page(wiki_key, headers)
+    except Exception as e:
+        print(f"验证页面 {wiki_key} 失败: {e}")
+        report.failed += 1
+        return 'failed'
+
+    now = time.time()
+    if page.not_modified:
+        report.fresh += 1
+        report.bytes_saved += metadata.get('size', 0) if metadata else 0
+        metadata['validated_at'] = now
+        cache.set_metadata(wiki_key, metadata)
+        return 'fresh'
+
+    report.bytes_downloaded += len(page.html.encode('utf-8'))
+    if metadata and content_hash(page.html) == metadata.get('sha256'):
+        # 内容未变，只更新校验信息，下次就能用上304
+        report.unchanged += 1
+        refreshed = build_metadata(wiki_key, page.html, url=page.url, status_code=page.status_code,
+                                   headers=page.headers, backend=page.backend,
+                                   fetched_at=metadata.get('fetched_at'))
+        refreshed['validated_at'] = now
+        for field in ('trimmed', 'stored_size'):
+            if field in metadata:
+                refreshed[field] = metadata[field]
+        cache.set_metadata(wiki_key, refreshed)
+        return 'unchanged'
+
+    report.changed += 1
+    report.changed_keys.append(wiki_key)
+    cache.save(wiki_key, page.html, page, trim=trim)
+    return 'changed'
+
+
+def revalidate_cache(cache, backend, keys=None, retry_engine=None, trim=False):
+    """
+    重新验证缓存中的页面
+
+    参数:
+    - cache: 缓存后端（PageCache），传入目录路径时按目录缓存处理
+    - backend: 支持条件请求的页面获取后端（HttpBackend）
+    - keys: 要验证的wiki_key列表，默认验证全部缓存页面
+
+    只验证实际保存的页面：别名（物品key）指向的往往是存根页面之外的正确页面，
+    按别名请求只会得到存根，再写回缓存就会覆盖别名。传入的别名解析为它指向的页面，重复的只验证一次。
+    - retry_engine: 重试引擎（可选）
+    - trim: 有变化的页面是否只保存#page-content子树（与--trim-pages相同）
+
+    返回:
+    - RevalidationReport
+    """
+    report = RevalidationReport()
+    start = time.time()
+    if isinstance(cache, str):
+        cache = DirectoryCache(cache)
+    if keys is None:
+        keys = cache.page_keys()
+    else:
+        keys = list(dict.fromkeys(cache.alias_target(key) or key for key in keys))
+    for wiki_key in keys:
+        outcome = revalidate_page(cache, wiki_key, backend, report, retry_engine, trim)
+        print(f"验证 {wiki_key}: {outcome}")
+    report.elapsed = time.time() - start
+    return report
@@ -0,0 +1,762 @@
+import gzip
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+
+from .metadata import META_SUFFIX, content_hash, meta_path, read_metadata, write_metadata
+from .pages import list_cached_keys, page_path, page_status, prepare_cached_page, read_cached_page
+
+
+class PageCache:
+    """
+    页面缓存的存储后端基类
+
+    子类实现get/put/keys和元数据读写，save在此基础上统一处理元数据生成和裁剪。
+
+    参数:
+    - path: 缓存所在的目录或文件，默认使用子类的default_path
+    """
+    name = 'base'
+    default_path = None
+    # 只读后端不能写入新页面，缓存未命中时只能直接使用下载结果
+    read_only = False
+
+    def __init__(self, path=None):
+        self.path = path or self.default_path
+
+    def get(self, key):
+        """
+        读取页面
+
+        返回:
+        - 页面HTML内容，不存在时返回None
+        """
+        raise NotImplementedError
+
+    def put(self, key, html_content, metadata):
+        """按给定的元数据原样写入页面"""
+        raise NotImplementedError
+
+    def keys(self):
+        """返回排序后的所有页面key（含别名）"""
+        raise NotImplementedError
+
+    def page_keys(self):
+        """返回排序后实际保存了页面的key，不含别名"""
+        return self.keys()
+
+    def alias_target(self, key):
+        """key是别名时返回它指向的页面key，否则返回None"""
+        return None
+
+    def get_metadata(self, key):
+        """读取页面元数据，不存在时返回None"""
+        raise NotImplementedError
+
+    def set_metadata(self, key, metadata):
+        """更新页面元数据"""
+        raise NotImplementedError
+
+    def __contains__(self, key):
+        return self.get_metadata(key) is not None or key in self.keys()
+
+    def get_many(self, keys):
+        """
+        批量读取页面
+
+        返回:
+        - {key: 页面HTML}，不存在的key不出现在结果中
+        """
+        pages = {}
+        for key in keys:
+            html_content = self.get(key)
+            if html_content is not None:
+                pages[key] = html_content
+        return pages
+
+    def keys_by_status(self, status):
+        """
+        列出指定状态的页面key
+
+        参数:
+        - status: PAGE_VALID、PAGE_MISSING或PAGE_EMPTY
+
+        返回:
+        - 排序后的key列表
+        """
+        pages = self.get_many(self.keys())
+        return sorted(key for key, html_content in pages.items() if page_status(html_content) == status)
+
+    def save(self, key, html_content, page=None, trim=False):
+        """
+        把新获取的页面写入缓存，并生成元数据
+
+        参数:
+        - key: 页面的wiki_key
+        - html_content: 页面HTML内容
+        - page: 获取页面时的PageResponse（可选）
+        - trim: 是否只保存#page-content子树
+
+        返回:
+        - 写入的元数据字典
+        """
+        html_content, metadata = prepare_cached_page(key, html_content, page, trim)
+        self.put(key, html_content, metadata)
+        return metadata
+
+    def link(self, alias, key):
+        """
+        让alias指向key的页面，不支持别名的后端直接返回False
+
+        返回:
+        - 是否新建了别名
+        """
+        return False
+
+    def delete(self, key):
+        """
+        从缓存中删除页面及其元数据，支持别名的后端同时删除指向该页面的别名
+
+        返回:
+        - 是否删除了页面
+        """
+        raise NotImplementedError
+
+    def modified_time(self, key):
+        """页面写入缓存的时间，未知时返回None"""
+        return None
+
+    def manifest_path(self):
+        """缓存策略清单的路径：目录型缓存放在目录内，单文件缓存放在文件旁边"""
+        if os.path.isdir(self.path):
+            return os.path.join(self.path, 'manifest.json')
+        return self.path + '.manifest.json'
+
+    def disk_usage(self):
+        """缓存占用的磁盘空间（字节）"""
+        return 0
+
+    def close(self):
+        pass
+
+    def describe(self):
+        return f"{self.name} ({self.path})"
+
+
+class DirectoryCache(PageCache):
+    """
+    原有的目录缓存：每个页面一个<key>.html，旁边是<key>.meta.json元数据
+    """
+    name = 'dir'
+    default_path = 'cache'
+
+    def __init__(self, path=None):
+        super().__init__(path)
+        os.makedirs(self.path, exist_ok=True)
+
+    def get(self, key):
+        return read_cached_page(self.path, key)
+
+    def put(self, key, html_content, metadata):
+        with open(page_path(self.path, key), 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        if metadata is not None:
+            write_metadata(self.path, key, metadata)
+
+    def keys(self):
+        return list_cached_keys(self.path)
+
+    def __contains__(self, key):
+        return os.path.exists(page_path(self.path, key))
+
+    def get_metadata(self, key):
+        return read_metadata(self.path, key)
+
+    def set_metadata(self, key, metadata):
+        write_metadata(self.path, key, metadata)
+
+    def delete(self, key):
+        deleted = False
+        for path in (page_path(self.path, key), meta_path(self.path, key)):
+            try:
+                os.remove(path)
+                deleted = True
+            except FileNotFoundError:
+                pass
+        return deleted
+
+    def modified_time(self, key):
+        path = page_path(self.path, key)
+        return os.path.getmtime(path) if os.path.exists(path) else None
+
+    def disk_usage(self):
+        total = 0
+        for f in os.listdir(self.path):
+            if f.endswith('.html') or f.endswith(META_SUFFIX):
+                total += os.path.getsize(os.path.join(self.path, f))
+        return total
+
+
+class BlobStore(PageCache):
+    """
+    按内容寻址、压缩存储的页面缓存
+
+    页面正文以gzip压缩存放在blobs/<前两位>/<哈希>.html.gz，哈希是所存字节的SHA-256，
+    完全相同的页面只存一份，读取时得到的内容与写入的逐字节相同。
+    aliases.jsonl是只追加的别名表，记录每个物品key或wiki_key指向的正文和元数据，
+    读取时以最后一条为准。
+
+    参数:
+    - path: 存储目录
+    - compresslevel: gzip压缩级别
+    """
+    name = 'blob'
+    default_path = 'cache_store'
+    ALIAS_FILE = 'aliases.jsonl'
+
+    def __init__(self, path=None, compresslevel=6):
+        super().__init__(path)
+        self.compresslevel = compresslevel
+        self.blob_dir = os.path.join(self.path, 'blobs')
+        self.alias_path = os.path.join(self.path, self.ALIAS_FILE)
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.aliases = self._load_aliases()
+
+        # 统计信息
+        self.blobs_written = 0
+        self.blobs_reused = 0
+
+    def _load_aliases(self):
+        aliases = {}
+        if not os.path.exists(self.alias_path):
+            return aliases
+        with open(self.alias_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # 中断时写了一半的最后一行
+                    continue
+                if entry.get('deleted'):
+                    aliases.pop(entry['key'], None)
+                else:
+                    aliases[entry['key']] = self._entry(entry['blob'], entry.get('meta'), entry.get('alias_of'))
+        return aliases
+
+    @staticmethod
+    def _entry(blob, meta, alias_of=None):
+        entry = {'blob': blob, 'meta': meta}
+        if alias_of:
+            # 别名记录指向的key，读取时以该key的最新正文和元数据为准
+            entry['alias_of'] = alias_of
+        return entry
+
+    def _resolve(self, key):
+        """key的记录，别名解析到它指向的页面"""
+        entry = self.aliases.get(key)
+        if entry is not None and entry.get('alias_of') in self.aliases:
+            return self.aliases[entry['alias_of']]
+        return entry
+
+    def _append_alias(self, key, entry):
+        line = json.dumps(dict(entry, key=key), ensure_ascii=False)
+        with open(self.alias_path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+    def blob_path(self, blob):
+        return os.path.join(self.blob_dir, blob[:2], f"{blob}.html.gz")
+
+    def read_blob(self, blob):
+        with gzip.open(self.blob_path(blob), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def write_blob(self, html_content):
+        """
+        写入页面正文，逐字节相同的内容只保存一份
+
+        返回:
+        - 正文的哈希（即content_hash）
+        """
+        blob = content_hash(html_content)
+        path = self.blob_path(blob)
+        if os.path.exists(path):
+            self.blobs_reused += 1
+            return blob
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, 'wb', compresslevel=self.compresslevel) as f:
+            f.write(html_content.encode('utf-8'))
+        os.replace(tmp_path, path)
+        self.blobs_written += 1
+        return blob
+
+    def get(self, key):
+        entry = self._resolve(key)
+        if entry is None:
+            return None
+        return self.read_blob(entry['blob'])
+
+    def put(self, key, html_content, metadata):
+        blob = self.write_blob(html_content)
+        with self._lock:
+            entry = self._entry(blob, metadata)
+            self.aliases[key] = entry
+            self._append_alias(key, entry)
+
+    def keys(self):
+        return sorted(self.aliases)
+
+    def page_keys(self):
+        return sorted(key for key, entry in self.aliases.items() if not entry.get('alias_of'))
+
+    def alias_target(self, key):
+        entry = self.aliases.get(key)
+        return entry.get('alias_of') if entry else None
+
+    def __contains__(self, key):
+        return key in self.aliases
+
+    def get_metadata(self, key):
+        entry = self._resolve(key)
+        return entry['meta'] if entry else None
+
+    def set_metadata(self, key, metadata):
+        with self._lock:
+            key = self.alias_target(key) or key
+            entry = self._entry(self.aliases[key]['blob'], metadata)
+            self.aliases[key] = entry
+            self._append_alias(key, entry)
+
+    def link(self, alias, key):
+        """
+        让alias指向key的正文；alias已经存在时保持不变
+
+        返回:
+        - 是否新建了别名
+        """
+        with self._lock:
+            if alias in self.aliases or key not in self.aliases:
+                return False
+            key = self.alias_target(key) or key
+            entry = self._entry(self.aliases[key]['blob'], self.aliases[key]['meta'], key)
+            self.aliases[alias] = entry
+            self._append_alias(alias, entry)
+            return True
+
+    def delete(self, key):
+        """删除页面或别名；删除页面时指向它的别名一并删除，没有key再引用的正文文件也一并删除"""
+        with self._lock:
+            entry = self.aliases.pop(key, None)
+            if entry is None:
+                return False
+            removed = [key] + [alias for alias, other in self.aliases.items() if other.get('alias_of') == key]
+            for alias in removed[1:]:
+                del self.aliases[alias]
+            with open(self.alias_path, 'a', encoding='utf-8') as f:
+                for removed_key in removed:
+                    f.write(json.dumps({'key': removed_key, 'deleted': True}) + '\n')
+            if all(other['blob'] != entry['blob'] for other in self.aliases.values()):
+                try:
+                    os.remove(self.blob_path(entry['blob']))
+                except FileNotFoundError:
+                    pass
+            return True
+
+    def modified_time(self, key):
+        metadata = self.get_metadata(key)
+        return metadata.get('fetched_at') if metadata else None
+
+    def compact(self):
+        """重写别名表，只保留每个key的最新一条"""
+        with self._lock:
+            tmp_path = self.alias_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for key in sorted(self.aliases):
+                    f.write(json.dumps(dict(self.aliases[key], key=key), ensure_ascii=False) + '\n')
+            os.replace(tmp_path, self.alias_path)
+
+    def blob_count(self):
+        return len({entry['blob'] for entry in self.aliases.values()})
+
+    def disk_usage(self):
+        total = os.path.getsize(self.alias_path) if os.path.exists(self.alias_path) else 0
+        for root, _, files in os.walk(self.blob_dir):
+            total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+        return total
+
+    def describe(self):
+        return f"{self.name} ({self.path}，{len(self.aliases)} 个key，{self.blob_count()} 个正文)"
+
+
+class SqliteCache(PageCache):
+    """
+    单文件SQLite页面缓存
+
+    pages表保存页面HTML、页面状态（正常/“页面不存在”存根）和元数据，
+    aliases表保存别名到页面key的映射。页面状态在写入时计算，
+    查询存根页面或批量读取时不需要逐个打开文件。
+
+    参数:
+    - path: 数据库文件路径
+    """
+    name = 'sqlite'
+    default_path = 'cache.sqlite3'
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS pages (
+            key TEXT PRIMARY KEY,
+            html TEXT NOT NULL,
+            status TEXT NOT NULL,
+            sha256 TEXT,
+            fetched_at REAL,
+            metadata TEXT
+        );
+        CREATE INDEX IF NOT EXISTS pages_status ON pages(status);
+        CREATE TABLE IF NOT EXISTS aliases (
+            alias TEXT PRIMARY KEY,
+            key TEXT NOT NULL
+        );
+    """
+    # SQLite单条语句的参数个数有上限，批量查询时分块
+    BATCH_SIZE = 500
+
+    def __init__(self, path=None):
+        super().__init__(path)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        # 预取时会从多个线程写入，统一用锁串行化
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(self.SCHEMA)
+        self._lock = threading.Lock()
+
+    def _resolve(self, key):
+        row = self.conn.execute('SELECT key FROM aliases WHERE alias = ?', (key,)).fetchone()
+        return row[0] if row else key
+
+    def get(self, key):
+        with self._lock:
+            row = self.conn.execute('SELECT html FROM pages WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                row = self.conn.execute('SELECT html FROM pages WHERE key = ?', (self._resolve(key),)).fetchone()
+        return row[0] if row else None
+
+    def get_many(self, keys):
+        keys = list(keys)
+        pages = {}
+        with self._lock:
+            for i in range(0, len(keys), self.BATCH_SIZE):
+                batch = keys[i:i + self.BATCH_SIZE]
+                placeholders = ','.join('?' * len(batch))
+                pages.update(self.conn.execute(
+                    f'SELECT key, html FROM pages WHERE key IN ({placeholders})', batch))
+                aliased = self.conn.execute(
+                    f'SELECT a.alias, p.html FROM aliases a JOIN pages p ON p.key = a.key '
+                    f'WHERE a.alias IN ({placeholders})', batch)
+                for alias, html_content in aliased:
+                    pages.setdefault(alias, html_content)
+        return pages
+
+    def put(self, key, html_content, metadata):
+        metadata = metadata or {}
+        with self._lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO pages (key, html, status, sha256, fetched_at, metadata) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, html_content, metadata.get('status') or page_status(html_content), metadata.get('sha256'),
+                 metadata.get('fetched_at'), json.dumps(metadata, ensure_ascii=False)))
+
+    def keys(self):
+        with self._lock:
+            rows = self.conn.execute('SELECT key FROM pages UNION SELECT alias FROM aliases').fetchall()
+        return sorted(row[0] for row in rows)
+
+    def page_keys(self):
+        with self._lock:
+            rows = self.conn.execute('SELECT key FROM pages').fetchall()
+        return sorted(row[0] for row in rows)
+
+    def alias_target(self, key):
+        with self._lock:
+            row = self.conn.execute('SELECT key FROM aliases WHERE alias = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def keys_by_status(self, status):
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT key FROM pages WHERE status = ? '
+                'UNION SELECT a.alias FROM aliases a JOIN pages p ON p.key = a.key WHERE p.status = ?',
+                (status, status)).fetchall()
+        return sorted(row[0] for row in rows)
+
+    def __contains__(self, key):
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT 1 FROM pages WHERE key = ? UNION SELECT 1 FROM aliases WHERE alias = ?', (key, key)).fetchone()
+        return row is not None
+
+    def get_metadata(self, key):
+        with self._lock:
+            row = self.conn.execute('SELECT metadata FROM pages WHERE key = ?', (self._resolve(key),)).fetchone()
+        return json.loads(row[0]) if row and row[0] else None
+
+    def set_metadata(self, key, metadata):
+        with self._lock, self.conn:
+            self.conn.execute(
+                'UPDATE pages SET metadata = ?, sha256 = ?, fetched_at = ? WHERE key = ?',
+                (json.dumps(metadata, ensure_ascii=False), metadata.get('sha256'), metadata.get('fetched_at'),
+                 self._resolve(key)))
+
+    def link(self, alias, key):
+        with self._lock, self.conn:
+            if self.conn.execute('SELECT 1 FROM pages WHERE key = ? UNION SELECT 1 FROM aliases WHERE alias = ?',
+                                 (alias, alias)).fetchone():
+                return False
+            if not self.conn.execute('SELECT 1 FROM pages WHERE key = ?', (key,)).fetchone():
+                return False
+            self.conn.execute('INSERT INTO aliases (alias, key) VALUES (?, ?)', (alias, key))
+            return True
+
+    def delete(self, key):
+        """删除页面或别名；删除页面时指向它的别名一并删除"""
+        with self._lock, self.conn:
+            deleted = self.conn.execute('DELETE FROM aliases WHERE alias = ?', (key,)).rowcount
+            deleted += self.conn.execute('DELETE FROM pages WHERE key = ?', (key,)).rowcount
+            self.conn.execute('DELETE FROM aliases WHERE key = ?', (key,))
+        return deleted > 0
+
+    def modified_time(self, key):
+        with self._lock:
+            row = self.conn.execute('SELECT fetched_at FROM pages WHERE key = ?', (self._resolve(key),)).fetchone()
+        return row[0] if row else None
+
+    def disk_usage(self):
+        total = 0
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                total += os.path.getsize(self.path + suffix)
+        return total
+
+    def compact(self):
+        """合并WAL并回收空闲页"""
+        with self._lock:
+            self.conn.execute('VACUUM')
+            self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def describe(self):
+        with self._lock:
+            pages = self.conn.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+            aliases = self.conn.execute('SELECT COUNT(*) FROM aliases').fetchone()[0]
+        return f"{self.name} ({self.path}，{pages} 个页面，{aliases} 个别名)"
+
+
+class PackedArchive(PageCache):
+    """
+    内存映射的只读打包缓存
+
+    所有页面按UTF-8字节顺序拼接在一个文件中，末尾是按key索引偏移和长度的JSON。
+    文件格式: 头部(PACK_MAGIC + 索引偏移 + 索引长度) | 页面正文... | 索引
+
+    打开时只读取索引，页面通过mmap按需换入，读取单个页面不需要open/read系统调用，
+    多个进程打开同一个文件时共享操作系统的页面缓存。
+
+    参数:
+    - path: 打包文件路径
+    """
+    name = 'pack'
+    default_path = 'cache.pack'
+    read_only = True
+
+    PACK_MAGIC = b'ETGPACK1'
+    HEADER = struct.Struct('<8sQQ')
+
+    def __init__(self, path=None):
+        super().__init__(path)
+        self._file = open(self.path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_offset, index_length = self.HEADER.unpack_from(self._mmap, 0)
+        if magic != self.PACK_MAGIC:
+            raise ValueError(f"{self.path} 不是有效的打包缓存文件")
+        self.index = json.loads(self._mmap[index_offset:index_offset + index_length].decode('utf-8'))
+        self._view = memoryview(self._mmap)
+
+    def get_bytes(self, key):
+        """
+        取页面的UTF-8字节，不复制
+
+        返回:
+        - 指向映射内存的memoryview，不存在时返回None
+        """
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        return self._view[entry['offset']:entry['offset'] + entry['length']]
+
+    def get(self, key):
+        data = self.get_bytes(key)
+        # 直接从映射内存解码，不经过中间的bytes副本
+        return str(data, 'utf-8') if data is not None else None
+
+    def put(self, key, html_content, metadata):
+        raise RuntimeError(f"打包缓存 {self.path} 是只读的，请用 utils/cache_tool.py pack 重新生成")
+
+    def delete(self, key):
+        raise RuntimeError(f"打包缓存 {self.path} 是只读的，请用 utils/cache_tool.py pack 重新生成")
+
+    def set_metadata(self, key, metadata):
+        # 只读：元数据更新只在本进程内生效
+        if key in self.index:
+            self.index[key]['meta'] = metadata
+
+    def keys(self):
+        return sorted(self.index)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def get_metadata(self, key):
+        entry = self.index.get(key)
+        return entry.get('meta') if entry else None
+
+    def keys_by_status(self, status):
+        return sorted(key for key, entry in self.index.items() if entry.get('status') == status)
+
+    def modified_time(self, key):
+        metadata = self.get_metadata(key)
+        return metadata.get('fetched_at') if metadata else None
+
+    def disk_usage(self):
+        return os.path.getsize(self.path)
+
+    def close(self):
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # 还有调用方持有get_bytes返回的memoryview，交给垃圾回收释放
+            return
+        self._file.close()
+
+    def describe(self):
+        return f"{self.name} ({self.path}，{len(self.index)} 个页面)"
+
+
+def build_pack(source, path, keys=None):
+    """
+    把缓存中的页面打包成PackedArchive文件
+
+    内容相同的页面（例如别名）只写入一份，索引指向同一个偏移。
+
+    参数:
+    - source: 源PageCache
+    - path: 输出文件路径
+    - keys: 要打包的key，默认全部
+
+    返回:
+    - 打包的页面数
+    """
+    index = {}
+    offsets = {}
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(PackedArchive.HEADER.pack(PackedArchive.PACK_MAGIC, 0, 0))
+        for key in (source.keys() if keys is None else keys):
+            html_content = source.get(key)
+            if html_content is None:
+                continue
+            data = html_content.encode('utf-8')
+            digest = hashlib.sha256(data).hexdigest()
+            if digest not in offsets:
+                offsets[digest] = f.tell()
+                f.write(data)
+            metadata = source.get_metadata(key)
+            index[key] = {
+                'offset': offsets[digest],
+                'length': len(data),
+                'status': (metadata or {}).get('status') or page_status(html_content),
+                'meta': metadata,
+            }
+        index_offset = f.tell()
+        index_data = json.dumps(index, ensure_ascii=False).encode('utf-8')
+        f.write(index_data)
+        f.seek(0)
+        f.write(PackedArchive.HEADER.pack(PackedArchive.PACK_MAGIC, index_offset, len(index_data)))
+    os.replace(tmp_path, path)
+    return len(index)
+
+
+# 可用的缓存后端，名称到类的映射
+CACHE_BACKENDS = {
+    'dir': DirectoryCache,
+    'blob': BlobStore,
+    'sqlite': SqliteCache,
+    'pack': PackedArchive,
+}
+
+DEFAULT_CACHE_BACKEND = 'dir'
+
+
+def register_cache_backend(name, cache_class):
+    """
+    注册新的缓存后端
+
+    参数:
+    - name: 后端名称
+    - cache_class: PageCache的子类
+    """
+    CACHE_BACKENDS[name] = cache_class
+
+
+def create_page_cache(name=DEFAULT_CACHE_BACKEND, path=None, **kwargs):
+    """
+    按名称创建缓存后端
+
+    参数:
+    - name: 后端名称，见CACHE_BACKENDS
+    - path: 缓存路径，默认使用后端自己的默认路径
+    - kwargs: 传给后端构造函数的其他参数
+
+    返回:
+    - PageCache实例
+    """
+    if name not in CACHE_BACKENDS:
+        raise ValueError(f"未知的缓存后端: {name}，可选: {', '.join(CACHE_BACKENDS)}")
+    return CACHE_BACKENDS[name](path, **kwargs)
+
+
+def copy_pages(source, target, keys=None):
+    """
+    把页面和元数据从一个缓存后端复制到另一个
+
+    参数:
+    - source: 源PageCache
+    - target: 目标PageCache
+    - keys: 要复制的key，默认全部
+
+    返回:
+    - 复制的页面数
+    """
+    count = 0
+    for key in (source.keys() if keys is None else keys):
+        html_content = source.get(key)
+        if html_content is None:
+            continue
+        metadata = source.get_metadata(key)
+        if metadata is None:
+            # 旧缓存没有元数据，复制时补一份
+            _, metadata = prepare_cached_page(key, html_content)
+            fetched_at = source.modified_time(key)
+            if fetched_at is not None:
+                metadata['fetched_at'] = metadata['validated_at'] = fetched_at
+        target.put(key, html_content, metadata)
+        count += 1
+    return count
@@ -0,0 +1,80 @@
+import re
+
+from .metadata import extract_revision
+
+# 裁剪后页面的标记，读取时据此判断页面是否已经裁剪过
+TRIMMED_MARKER = '<meta name="etg-trimmed" content="1">'
+
+PAGE_CONTENT_START = re.compile(r'''<div\b[^>]*\bid\s*=\s*["']page-content["'][^>]*>''', re.IGNORECASE)
+TITLE_PATTERN = re.compile(r'<title>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+# 统计div嵌套时跳过注释、脚本和样式中的内容
+DIV_TOKEN_PATTERN = re.compile(
+    r'<!--.*?-->|<script\b.*?</script\s*>|<style\b.*?</style\s*>|<(/?)div\b[^>]*>',
+    re.IGNORECASE | re.DOTALL,
+)
+
+TRIMMED_TEMPLATE = (
+    '<!DOCTYPE html>\n'
+    '<html>\n<head>\n<meta charset="utf-8">\n'
+    + TRIMMED_MARKER + '\n'
+    '{meta}'
+    '<title>{title}</title>\n'
+    '</head>\n<body>\n{content}\n</body>\n</html>\n'
+)
+
+
+def is_trimmed(html_content):
+    """检查页面是否已经裁剪为只含#page-content的形式"""
+    return TRIMMED_MARKER in html_content[:512]
+
+
+def find_page_content(html_content):
+    """
+    在原始HTML中定位#page-content子树，不做完整解析
+
+    返回:
+    - (start, end)，即子树在字符串中的起止位置；找不到或div不配对时返回None
+    """
+    match = PAGE_CONTENT_START.search(html_content)
+    if not match:
+        return None
+    depth = 1
+    for token in DIV_TOKEN_PATTERN.finditer(html_content, match.end()):
+        if token.group(1) is None:
+            # 注释、脚本或样式
+            continue
+        depth += -1 if token.group(1) else 1
+        if depth == 0:
+            return match.start(), token.end()
+    return None
+
+
+def trim_page(html_content):
+    """
+    只保留页面的#page-content子树，以及标题、版本号和pageId
+
+    子树按原样切出，不经过解析和重新序列化，解析器看到的内容与原页面一致。
+
+    参数:
+    - html_content: wiki页面的完整HTML
+
+    返回:
+    - 裁剪后的HTML；页面已裁剪过时原样返回；无法定位#page-content时返回None
+    """
+    if is_trimmed(html_content):
+        return html_content
+    span = find_page_content(html_content)
+    if span is None:
+        return None
+
+    revision, page_id = extract_revision(html_content)
+    meta = ''
+    if revision is not None:
+        meta += f'<meta name="wiki-revision" content="{revision}">\n'
+    if page_id is not None:
+        meta += f'<meta name="wiki-page-id" content="{page_id}">\n'
+    title_match = TITLE_PATTERN.search(html_content)
+    title = title_match.group(1).strip() if title_match else ''
+
+    start, end = span
+    return TRIMMED_TEMPLATE.format(meta=meta, title=title, content=html_content[start:end])
@@ -1,7 +1,22 @@
 # 使etg_parser目录成为一个有效的Python包
 # 导出extract_item_tips模块中的函数
 from .extract_item_tips import get_page_content_selenium 
+from .driver_pool import DriverPool, configure_driver_pool, get_driver_pool, close_driver_pool
+from .fetch_backends import FetchBackend, HttpBackend, SeleniumBackend, create_fetch_backend
+from .retry import FetchError, RetryEngine, configure_retry_engine, get_retry_engine
+from .crawler import AsyncCrawler
 from .synergy_parser import extract_item_synergies
 from .item_parser import extract_item_description
+from .parsed_page import (PARSER_BACKENDS, DEFAULT_PARSER_BACKEND, ParsedPage, get_parser_backend, parse_page,
+                          set_parser_backend, get_partial_parse, set_partial_parse, parse_mode)
+from .stream_extractor import StreamingExtractor, extract_item_streaming, get_streaming, set_streaming
+from .extraction_cache import PARSER_VERSION, ExtractionCache, extract_item, extraction_mode
 
-__all__ = ['extract_item_description', 'extract_item_synergies', 'get_page_content_selenium']
\ No newline at end of file
+__all__ = ['extract_item_description', 'extract_item_synergies', 'get_page_content_selenium',
+           'DriverPool', 'configure_driver_pool', 'get_driver_pool', 'close_driver_pool',
+           'FetchBackend', 'HttpBackend', 'SeleniumBackend', 'create_fetch_backend',
+           'FetchError', 'RetryEngine', 'configure_retry_engine', 'get_retry_engine', 'AsyncCrawler',
+           'PARSER_VERSION', 'ExtractionCache', 'extract_item', 'ParsedPage', 'parse_page',
+           'PARSER_BACKENDS', 'DEFAULT_PARSER_BACKEND', 'get_parser_backend', 'set_parser_backend',
+           'get_partial_parse', 'set_partial_parse', 'parse_mode', 'StreamingExtractor', 'extract_item_streaming',
+           'get_streaming', 'set_streaming', 'extraction_mode']
@@ -0,0 +1,141 @@
+from bs4 import NavigableString, Tag
+from bs4.element import CData
+
+# 列表标签：process_content会先把它们从正文中取出，最后单独按“- ”格式输出
+LIST_TAGS = ('ul', 'ol')
+
+# get_text()默认拼接的字符串类型（不含注释、<script>/<style>中的字符串等），按类型精确匹配。
+# 在这里写明而不是读取Tag.interesting_string_types / Tag.MAIN_CONTENT_STRING_TYPES，
+# 前者4.10之前不存在（tag.interesting_string_types会被当成find()返回None），后者4.13才加入
+MAIN_CONTENT_STRING_TYPES = (NavigableString, CData)
+
+
+class ContentView:
+    """
+    不复制、不修改文档树地读取一个元素“替换图片之后”的内容
+
+    以前的做法是BeautifulSoup(str(element))复制一份元素，在副本上把图片替换为{item:...}占位符、
+    删掉或取出部分标签，再读取文本。这里在原始节点上一次遍历，按同样的规则实时给出替换后的子节点:
+    - 图片由image_placeholder给出占位符，返回None的图片被删除
+    - 直接包含（有占位符的）图片的<a>整个被替换为图片的占位符，<a>中的其他内容不再出现
+    - drop_tags中的标签被删除，replace_tags中的标签被替换为给定的字符串
+    - skip_lists为True时不进入<ul>/<ol>（相当于已经从副本中取出）
+
+    参数:
+    - image_placeholder: 函数，参数为<img>标签，返回占位符字符串或None
+    - drop_tags: 要删除的标签名
+    - replace_tags: {标签名: 替换成的字符串}
+    """
+
+    def __init__(self, image_placeholder, drop_tags=(), replace_tags=None):
+        self.image_placeholder = image_placeholder
+        self.drop_tags = drop_tags
+        self.replace_tags = replace_tags or {}
+
+    def link_placeholder(self, link):
+        """
+        <a>直接包含有占位符的图片时，返回替换<a>用的占位符，否则返回None
+
+        与在副本上逐个replace_with一致：第一张图片替换掉<a>后，同一个<a>中的第二张图片
+        再替换已经脱离文档树的<a>会出错，这里抛出同样的ValueError
+        """
+        placeholder = None
+        for child in link.contents:
+            if isinstance(child, Tag) and child.name == 'img':
+                image = self.image_placeholder(child)
+                if image is None:
+                    continue
+                if placeholder is not None:
+                    raise ValueError("Cannot replace one element with another when the "
+                                     "element to be replaced is not part of a tree.")
+                placeholder = image
+        return placeholder
+
+    def children(self, nodes, skip_lists=False):
+        """
+        给出一组节点替换之后的样子
+
+        参数:
+        - nodes: 原始节点列表（通常是某个元素的contents）
+        - skip_lists: 是否跳过<ul>/<ol>
+
+        返回:
+        - 生成器，依次给出原始节点或替换出来的NavigableString
+        """
+        for node in nodes:
+            if not isinstance(node, Tag):
+                yield node
+                continue
+            name = node.name
+            if name == 'img':
+                placeholder = self.image_placeholder(node)
+                if placeholder is not None:
+                    yield NavigableString(placeholder)
+                continue
+            if name == 'a':
+                placeholder = self.link_placeholder(node)
+                if placeholder is not None:
+                    yield NavigableString(placeholder)
+                    continue
+            if name in self.drop_tags or (skip_lists and name in LIST_TAGS):
+                continue
+            if name in self.replace_tags:
+                yield NavigableString(self.replace_tags[name])
+                continue
+            yield node
+
+    def strings(self, nodes, skip_lists=False):
+        """按文档顺序给出一组节点（含所有后代）替换之后的全部字符串"""
+        for node in self.children(nodes, skip_lists):
+            if isinstance(node, NavigableString):
+                yield node
+            else:
+                yield from self.strings(node.contents, skip_lists)
+
+    def join_text(self, nodes, types, strip=False, skip_lists=False):
+        """拼接一组节点替换之后的字符串，只取types中的字符串类型"""
+        strings = (s for s in self.strings(nodes, skip_lists) if type(s) in types)
+        if strip:
+            return ''.join(stripped for stripped in (s.strip() for s in strings) if stripped)
+        return ''.join(strings)
+
+    def get_text(self, tag, strip=False, skip_lists=False):
+        """
+        相当于在副本上调用tag.get_text(strip=strip)
+
+        与BeautifulSoup一样只拼接正文字符串（不含注释）；这里只用于正文中的段落和列表项，
+        不会直接读取<script>/<style>本身的文本
+        """
+        return self.join_text(tag.contents, MAIN_CONTENT_STRING_TYPES, strip, skip_lists)
+
+    def document_text(self, element, strip=False):
+        """相当于BeautifulSoup(str(element))处理之后整个副本文档的get_text(strip=strip)"""
+        return self.join_text([element], MAIN_CONTENT_STRING_TYPES, strip)
+
+    def string(self, node, skip_lists=False):
+        """
+        相当于在副本上读取node.string：只有一个子节点时返回其中唯一的字符串，否则返回None
+        """
+        if isinstance(node, NavigableString):
+            return node
+        children = list(self.children(node.contents, skip_lists))
+        if len(children) != 1:
+            return None
+        return self.string(children[0], skip_lists)
+
+    def find_all(self, nodes, names, stop_at=()):
+        """
+        相当于在副本上find_all(names)：按文档顺序给出替换之后仍然存在的指定标签
+
+        参数:
+        - nodes: 搜索范围内的顶层节点（包含在结果内）
+        - names: 要找的标签名
+        - stop_at: 不进入这些标签的内部
+        """
+        for node in self.children(nodes):
+            if not isinstance(node, Tag):
+                continue
+            if node.name in names:
+                yield node
+            if node.name not in stop_at:
+                yield from self.find_all(node.contents, names, stop_at)
@@ -0,0 +1,178 @@
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from .fetch_backends import build_page_url
+from .retry import get_retry_engine
+
+# 默认每个host每秒最多发起的请求数
+DEFAULT_REQUESTS_PER_SECOND = 2.0
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+class TokenBucket:
+    """
+    异步令牌桶，用来限制对同一个host的请求速率
+
+    参数:
+    - rate: 每秒补充的令牌数（即允许的平均请求数）
+    - capacity: 桶容量，允许的最大突发请求数，默认等于rate（至少为1）
+    """
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError("令牌桶速率必须大于0")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.waited = 0.0
+        self.acquired = 0
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """取出一个令牌，令牌不足时等待到补充为止"""
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                delay = (1 - self.tokens) / self.rate
+                self.waited += delay
+                await asyncio.sleep(delay)
+                self._refill()
+            self.tokens -= 1
+            self.acquired += 1
+
+
+class AsyncCrawler:
+    """
+    基于asyncio的并发页面抓取器
+
+    同一host共享一个令牌桶控制请求速率（每次尝试都要取令牌，包括重试），同时在途的请求数不超过max_concurrency。
+    实际的页面获取仍由同步的FetchBackend在线程池中完成。
+
+    参数:
+    - backend: 页面获取后端（FetchBackend实例）
+    - max_concurrency: 最大同时在途请求数
+    - requests_per_second: 每个host每秒允许的请求数
+    - burst: 令牌桶容量，默认等于requests_per_second
+    - retry_engine: 失败重试使用的RetryEngine，默认使用共享引擎
+    """
+
+    def __init__(self, backend, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 requests_per_second=DEFAULT_REQUESTS_PER_SECOND, burst=None, retry_engine=None):
+        self.backend = backend
+        self.retry_engine = retry_engine if retry_engine is not None else get_retry_engine()
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.buckets = {}
+
+        # 统计信息
+        self.fetched = 0
+        self.failed = 0
+        self.elapsed = 0.0
+        self.latencies = []
+
+    def _bucket_for(self, url):
+        host = urlparse(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.requests_per_second, self.burst)
+        return self.buckets[host]
+
+    def _rate_limited(self, bucket, loop):
+        """
+        包装backend.fetch_page：每次调用前在事件循环中从令牌桶取一个令牌
+
+        重试引擎在线程池中重试时也会经过这里，重试同样受每个host的限速约束
+        """
+        def fetch_page(*args):
+            asyncio.run_coroutine_threadsafe(bucket.acquire(), loop).result()
+            return self.backend.fetch_page(*args)
+        return fetch_page
+
+    async def _fetch_one(self, key, semaphore, executor, on_result):
+        url = build_page_url(key)
+        async with semaphore:
+            loop = asyncio.get_running_loop()
+            fetch_page = self._rate_limited(self._bucket_for(url), loop)
+            fetch = functools.partial(self.retry_engine.call, fetch_page, key, description=f"获取页面 {url} ")
+            start = time.monotonic()
+            try:
+                page = await loop.run_in_executor(executor, fetch)
+            except Exception as e:
+                print(f"并发获取 {url} 时出错: {e}")
+                page = None
+            self.latencies.append(time.monotonic() - start)
+
+        if page is not None:
+            self.fetched += 1
+        else:
+            self.failed += 1
+        if on_result:
+            on_result(key, page)
+        return key, page
+
+    async def crawl(self, keys, on_result=None):
+        """
+        并发获取所有页面
+
+        参数:
+        - keys: wiki_key或URL列表
+        - on_result: 每个页面完成时在事件循环线程中调用的回调 on_result(key, page)
+
+        返回:
+        - key到PageResponse的字典，失败的页面值为None
+        """
+        start = time.time()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            tasks = [self._fetch_one(key, semaphore, executor, on_result) for key in keys]
+            results = await asyncio.gather(*tasks)
+        self.elapsed += time.time() - start
+        return dict(results)
+
+    def run(self, keys, on_result=None):
+        """crawl的同步入口"""
+        return asyncio.run(self.crawl(keys, on_result))
+
+    def latency_percentile(self, percent):
+        """
+        单页耗时（含重试）的百分位数
+
+        参数:
+        - percent: 0~100
+
+        返回:
+        - 秒数，没有数据时为0
+        """
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def report(self):
+        """
+        生成抓取统计报告文本
+
+        返回:
+        - 多行报告字符串
+        """
+        total = self.fetched + self.failed
+        rate = total / self.elapsed if self.elapsed else 0.0
+        lines = [
+            "并发抓取统计:",
+            f"最大并发数: {self.max_concurrency}，每个host限速: {self.requests_per_second}/秒",
+            f"成功: {self.fetched}，失败: {self.failed}，用时: {self.elapsed:.2f} 秒 ({rate:.2f} 页/秒)",
+            f"单页耗时: p50 {self.latency_percentile(50):.2f} 秒，p95 {self.latency_percentile(95):.2f} 秒",
+        ]
+        for host, bucket in self.buckets.items():
+            lines.append(f"  {host}: 请求 {bucket.acquired} 次（含重试），限速等待 {bucket.waited:.2f} 秒")
+        return "\n".join(lines)
@@ -0,0 +1,332 @@
+import atexit
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+# 全局变量，存储ChromeDriver路径
+CHROME_DRIVER_PATH = None
+
+# 记录上次解析到的ChromeDriver路径，下次启动时直接使用，跳过webdriver-manager的下载检查
+DRIVER_PATH_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.chromedriver_path')
+
+# 默认会话池配置
+DEFAULT_POOL_SIZE = 1
+DEFAULT_MAX_PAGES = 100
+
+_driver_path_lock = threading.Lock()
+
+
+def _load_persisted_driver_path():
+    try:
+        with open(DRIVER_PATH_FILE, 'r', encoding='utf-8') as f:
+            path = f.read().strip()
+    except OSError:
+        return None
+    return path if path and os.path.exists(path) else None
+
+
+def _persist_driver_path(path):
+    try:
+        with open(DRIVER_PATH_FILE, 'w', encoding='utf-8') as f:
+            f.write(path)
+    except OSError as e:
+        print(f"保存ChromeDriver路径失败: {e}")
+
+
+def get_chrome_driver_path():
+    """
+    获取ChromeDriver路径
+
+    依次使用进程内缓存的路径、上次运行保存的路径，都不可用时才通过webdriver-manager下载
+
+    返回:
+    - ChromeDriver可执行文件路径
+    """
+    global CHROME_DRIVER_PATH
+    with _driver_path_lock:
+        if CHROME_DRIVER_PATH and os.path.exists(CHROME_DRIVER_PATH):
+            return CHROME_DRIVER_PATH
+        persisted = _load_persisted_driver_path()
+        if persisted:
+            print(f"使用已存在的ChromeDriver: {persisted}")
+            CHROME_DRIVER_PATH = persisted
+            return CHROME_DRIVER_PATH
+        print("首次运行，下载ChromeDriver...")
+        CHROME_DRIVER_PATH = ChromeDriverManager().install()
+        _persist_driver_path(CHROME_DRIVER_PATH)
+        return CHROME_DRIVER_PATH
+
+
+def create_chrome_driver():
+    """
+    启动一个新的无头Chrome浏览器
+
+    返回:
+    - WebDriver实例
+    """
+    options = Options()
+    options.add_argument('--headless')  # 无头模式
+    options.add_argument('--disable-gpu')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+
+    service = Service(get_chrome_driver_path())
+    return webdriver.Chrome(service=service, options=options)
+
+
+class DriverSession:
+    """
+    池中的一个浏览器会话，记录启动耗时和已处理的页面数
+    """
+
+    def __init__(self, session_id, driver, boot_time):
+        self.session_id = session_id
+        self.driver = driver
+        self.boot_time = boot_time
+        self.pages = 0
+
+    def is_alive(self):
+        """检查浏览器会话是否仍然可用"""
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception as e:
+            print(f"关闭浏览器会话 #{self.session_id} 时出错: {e}")
+
+
+class DriverPool:
+    """
+    可复用的WebDriver会话池
+
+    每个会话在处理完max_pages个页面后回收重建，
+    崩溃或健康检查失败的会话会被立即丢弃并按需重建。
+
+    参数:
+    - size: 同时存在的最大会话数
+    - max_pages: 单个会话最多处理的页面数，超过后回收
+    - driver_factory: 创建WebDriver的函数
+    """
+
+    def __init__(self, size=DEFAULT_POOL_SIZE, max_pages=DEFAULT_MAX_PAGES, driver_factory=create_chrome_driver):
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.driver_factory = driver_factory
+
+        self._idle = []
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self._closed = False
+
+        # 统计信息
+        self.retired_sessions = []
+        self.live_sessions = []
+        self.total_boot_time = 0.0
+        self.boots = 0
+        self.recycled = 0
+        self.crashed = 0
+
+    def _boot(self):
+        start = time.time()
+        driver = self.driver_factory()
+        boot_time = time.time() - start
+
+        with self._lock:
+            session = DriverSession(self._next_id, driver, boot_time)
+            self._next_id += 1
+            self.total_boot_time += boot_time
+            self.boots += 1
+            self.live_sessions.append(session)
+        print(f"启动浏览器会话 #{session.session_id}，耗时 {boot_time:.2f} 秒")
+        return session
+
+    def _retire(self, session, reason):
+        with self._lock:
+            if session in self.live_sessions:
+                self.live_sessions.remove(session)
+            self.retired_sessions.append(session)
+            if reason == 'crash':
+                self.crashed += 1
+            elif reason == 'recycle':
+                self.recycled += 1
+        session.quit()
+
+    def acquire(self):
+        """
+        取出一个健康的会话，没有空闲会话时启动新的浏览器
+
+        返回:
+        - DriverSession实例
+        """
+        if self._closed:
+            raise RuntimeError("WebDriver会话池已关闭")
+
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    session = self._idle.pop() if self._idle else None
+                if session is None:
+                    return self._boot()
+                if session.is_alive():
+                    return session
+                print(f"浏览器会话 #{session.session_id} 健康检查失败，重新启动")
+                self._retire(session, 'crash')
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, session, broken=False):
+        """
+        归还会话；损坏或达到页面上限的会话会被回收
+
+        参数:
+        - session: acquire返回的会话
+        - broken: 使用过程中是否发生了错误
+        """
+        try:
+            if broken and not session.is_alive():
+                print(f"浏览器会话 #{session.session_id} 已崩溃，丢弃")
+                self._retire(session, 'crash')
+            elif self._closed:
+                self._retire(session, None)
+            elif self.max_pages and session.pages >= self.max_pages:
+                print(f"浏览器会话 #{session.session_id} 已处理 {session.pages} 个页面，回收重建")
+                self._retire(session, 'recycle')
+            else:
+                with self._lock:
+                    self._idle.append(session)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def driver(self):
+        """
+        以上下文管理器的方式借用一个WebDriver，退出时自动归还
+
+        用法:
+            with pool.driver() as driver:
+                driver.get(url)
+        """
+        session = self.acquire()
+        broken = False
+        try:
+            yield session.driver
+        except Exception:
+            broken = True
+            raise
+        finally:
+            session.pages += 1
+            self.release(session, broken)
+
+    def close(self):
+        """关闭池中所有浏览器"""
+        self._closed = True
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for session in idle:
+            self._retire(session, None)
+
+    def stats(self):
+        """
+        汇总会话池统计信息
+
+        返回:
+        - 包含每个会话页面数、启动次数和节省启动时间的字典
+        """
+        with self._lock:
+            sessions = sorted(self.retired_sessions + self.live_sessions, key=lambda s: s.session_id)
+            total_pages = sum(s.pages for s in sessions)
+            avg_boot_time = self.total_boot_time / self.boots if self.boots else 0.0
+            return {
+                "sessions": {s.session_id: s.pages for s in sessions},
+                "total_pages": total_pages,
+                "boots": self.boots,
+                "recycled": self.recycled,
+                "crashed": self.crashed,
+                "total_boot_time": self.total_boot_time,
+                "avg_boot_time": avg_boot_time,
+                # 每复用一次会话就省下一次浏览器启动
+                "boot_time_saved": max(0, total_pages - self.boots) * avg_boot_time,
+            }
+
+    def report(self):
+        """
+        生成会话池统计报告文本
+
+        返回:
+        - 多行报告字符串
+        """
+        stats = self.stats()
+        lines = [
+            "WebDriver会话池统计:",
+            f"启动浏览器次数: {stats['boots']} (回收 {stats['recycled']}，崩溃 {stats['crashed']})",
+            f"处理页面总数: {stats['total_pages']}",
+        ]
+        for session_id, pages in stats['sessions'].items():
+            lines.append(f"  会话 #{session_id}: {pages} 个页面")
+        lines.append(f"平均启动耗时: {stats['avg_boot_time']:.2f} 秒")
+        lines.append(f"节省的启动时间: {stats['boot_time_saved']:.2f} 秒")
+        return "\n".join(lines)
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def configure_driver_pool(size=DEFAULT_POOL_SIZE, max_pages=DEFAULT_MAX_PAGES):
+    """
+    配置默认会话池，已有的默认池会先被关闭
+
+    参数:
+    - size: 最大会话数
+    - max_pages: 单个会话最多处理的页面数
+
+    返回:
+    - 新的默认DriverPool
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is not None:
+            _default_pool.close()
+        _default_pool = DriverPool(size=size, max_pages=max_pages)
+        return _default_pool
+
+
+def get_driver_pool(create=True):
+    """
+    获取进程内共享的默认会话池
+
+    参数:
+    - create: 默认池不存在时是否创建
+
+    返回:
+    - DriverPool实例，create为False且尚未创建时返回None
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None and create:
+            _default_pool = DriverPool()
+        return _default_pool
+
+
+def close_driver_pool():
+    """关闭默认会话池"""
+    pool = get_driver_pool(create=False)
+    if pool is not None:
+        pool.close()
+
+
+atexit.register(close_driver_pool)
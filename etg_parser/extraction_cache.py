@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import threading
+
+from .item_parser import extract_item_description
+from .parsed_page import ParsedPage, parse_mode
+from .stream_extractor import STREAM_MODE, extract_item_streaming, get_streaming
+from .synergy_parser import extract_item_synergies
+
+# 解析器版本：修改extract_item_description/extract_item_synergies的输出逻辑后必须加1，
+# 旧版本解析器的结果会全部失效
+PARSER_VERSION = 1
+
+# 默认的提取结果缓存文件
+EXTRACTION_CACHE_FILE = 'extraction_cache.json'
+
+
+def extraction_mode():
+    """
+    当前的提取方式：打开流式提取时为STREAM_MODE，否则为文档树的解析方式（见parse_mode）
+    """
+    return STREAM_MODE if get_streaming() else parse_mode()
+
+
+def extraction_key(html_content, wiki_key, item_name_cn, backend=None):
+    """
+    计算提取结果的缓存key
+
+    由页面内容哈希、wiki_key、中文名、解析器版本和提取方式（HTML解析后端、是否部分解析、是否流式提取）共同决定，
+    任何一项变化都会重新解析。
+
+    参数:
+    - html_content: 页面HTML内容
+    - wiki_key: 页面的wiki_key（用于匹配infobox）
+    - item_name_cn: 物品中文名（用于匹配infobox）
+    - backend: 提取方式名称（见extraction_mode），默认为当前的提取方式
+
+    返回:
+    - 十六进制哈希字符串
+    """
+    digest = hashlib.sha256(html_content.encode('utf-8')).hexdigest()
+    identity = json.dumps([digest, wiki_key, item_name_cn, PARSER_VERSION, backend or extraction_mode()],
+                          ensure_ascii=False)
+    return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+
+class ExtractionCache:
+    """
+    持久化的物品描述和联动提取结果
+
+    页面和解析器都没有变化时，重跑直接使用上次的提取结果，不再用BeautifulSoup解析页面。
+    文件中记录了解析器版本，版本不一致时整个文件作废。
+
+    参数:
+    - path: 缓存文件路径
+    """
+
+    def __init__(self, path=EXTRACTION_CACHE_FILE):
+        self.path = path
+        self.entries = {}
+        self.used = set()
+        self.dirty = False
+        self._lock = threading.Lock()
+
+        # 统计信息
+        self.hits = 0
+        self.misses = 0
+
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except ValueError:
+                # 写了一半的文件直接作废，重新解析即可
+                print(f"提取结果缓存 {path} 已损坏，忽略")
+                data = {}
+            if data.get('parser_version') == PARSER_VERSION:
+                self.entries = data.get('entries', {})
+            elif data:
+                print(f"提取结果缓存的解析器版本 {data.get('parser_version')} 与当前版本 {PARSER_VERSION} 不一致，全部重新解析")
+                self.dirty = True
+
+    def get(self, key):
+        """
+        读取提取结果
+
+        返回:
+        - (description, synergies)，没有缓存时返回None
+        """
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.used.add(key)
+        return entry['description'], entry['synergies']
+
+    def put(self, key, description, synergies):
+        with self._lock:
+            self.entries[key] = {'description': description, 'synergies': synergies}
+            self.used.add(key)
+            self.dirty = True
+
+    def save(self, prune=False):
+        """
+        把提取结果写回文件（先写临时文件再替换）
+
+        参数:
+        - prune: 为True时去掉本次运行没有用到的结果（页面已变化或物品已删除）
+        """
+        with self._lock:
+            if prune:
+                stale = [key for key in self.entries if key not in self.used]
+                for key in stale:
+                    del self.entries[key]
+                self.dirty = self.dirty or bool(stale)
+            if not self.dirty:
+                return
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'parser_version': PARSER_VERSION, 'entries': self.entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+    def report(self):
+        """
+        生成命中统计报告文本
+
+        返回:
+        - 多行报告字符串
+        """
+        lookups = self.hits + self.misses
+        hit_rate = self.hits / lookups if lookups else 0.0
+        return "\n".join([
+            f"提取结果缓存统计 ({self.path}，解析器版本 {PARSER_VERSION}，提取方式 {extraction_mode()}):",
+            f"查询: {lookups}，命中: {self.hits}，重新解析: {self.misses}，命中率: {hit_rate:.1%}",
+        ])
+
+
+def extract_item(html_content, wiki_key, item_name_cn, cache=None):
+    """
+    提取物品描述和联动，有提取结果缓存时优先使用缓存
+
+    参数:
+    - html_content: 页面HTML内容
+    - wiki_key: 页面的wiki_key
+    - item_name_cn: 物品中文名
+    - cache: ExtractionCache，为None时总是重新解析
+
+    返回:
+    - (description, synergies)，与extract_item_description和extract_item_synergies的返回值相同
+    """
+    key = None
+    if cache is not None:
+        key = extraction_key(html_content, wiki_key, item_name_cn)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    if get_streaming():
+        description, synergies = extract_item_streaming(html_content, wiki_key, item_name_cn)
+    else:
+        # 描述和联动共用一次解析
+        page = ParsedPage(html_content)
+        description = extract_item_description(page, wiki_key, item_name_cn)
+        synergies = extract_item_synergies(page)
+    if cache is not None:
+        cache.put(key, description, synergies)
+    return description, synergies
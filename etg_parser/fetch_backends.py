@@ -0,0 +1,256 @@
+import re
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .extract_item_tips import fetch_page_selenium
+from .retry import FetchError, http_status_kind
+
+WIKI_BASE_URL = 'https://etg-xd.wikidot.com/'
+
+# 解析器只需要#page-content中的静态内容
+PAGE_CONTENT_PATTERN = re.compile(r'''id\s*=\s*["']page-content["']''')
+
+
+def build_page_url(url_or_key):
+    """
+    把wiki_key补全为完整URL
+
+    参数:
+    - url_or_key: 完整的URL或者只是wiki_key
+
+    返回:
+    - 完整URL
+    """
+    if url_or_key.startswith('http'):
+        return url_or_key
+    return f"{WIKI_BASE_URL}{url_or_key}"
+
+
+def has_page_content(html_content):
+    """检查HTML中是否包含page-content元素"""
+    return bool(html_content) and PAGE_CONTENT_PATTERN.search(html_content) is not None
+
+
+class PageResponse:
+    """
+    一次页面获取的结果
+
+    参数:
+    - url: 请求的URL
+    - html: 页面HTML内容，条件请求命中304时为None
+    - status_code: HTTP状态码，浏览器获取时为None
+    - headers: 响应头（ETag、Last-Modified等）
+    - backend: 实际完成获取的后端名称
+    """
+
+    def __init__(self, url, html, status_code=None, headers=None, backend=None):
+        self.url = url
+        self.html = html
+        self.status_code = status_code
+        self.headers = dict(headers or {})
+        self.backend = backend
+
+    @property
+    def not_modified(self):
+        """条件请求确认页面未变化"""
+        return self.status_code == 304
+
+
+class FetchBackend:
+    """
+    页面获取后端的基类
+
+    子类实现fetch_page方法（或只实现fetch），并通过_count记录各种结果的命中次数
+    """
+    name = 'base'
+
+    def __init__(self):
+        self.hits = {}
+        self._hits_lock = threading.Lock()
+
+    def _count(self, outcome):
+        with self._hits_lock:
+            self.hits[outcome] = self.hits.get(outcome, 0) + 1
+
+    def fetch(self, url_or_key):
+        """
+        获取页面内容
+
+        参数:
+        - url_or_key: 完整的URL或者只是wiki_key
+
+        返回:
+        - 页面HTML内容
+
+        异常:
+        - 获取失败时抛出异常（FetchError或底层网络/浏览器异常），由重试引擎分类处理
+        """
+        return self.fetch_page(url_or_key).html
+
+    def fetch_page(self, url_or_key, headers=None):
+        """
+        获取页面及响应元数据
+
+        参数:
+        - url_or_key: 完整的URL或者只是wiki_key
+        - headers: 额外的请求头（如条件请求的If-None-Match），不支持的后端会忽略
+
+        返回:
+        - PageResponse实例
+        """
+        return PageResponse(build_page_url(url_or_key), self.fetch(url_or_key), backend=self.name)
+
+    def close(self):
+        """释放后端占用的资源"""
+        pass
+
+    def report(self):
+        """
+        生成命中统计报告文本
+
+        返回:
+        - 多行报告字符串
+        """
+        lines = [f"页面获取后端: {self.name}"]
+        if not self.hits:
+            lines.append("  未发起任何请求")
+        for outcome, count in sorted(self.hits.items()):
+            lines.append(f"  {outcome}: {count}")
+        return "\n".join(lines)
+
+
+class SeleniumBackend(FetchBackend):
+    """
+    使用无头浏览器获取页面，能处理需要JavaScript渲染的页面
+    """
+    name = 'selenium'
+
+    def __init__(self, pool=None):
+        super().__init__()
+        self.pool = pool
+
+    def fetch(self, url_or_key):
+        try:
+            html_content = fetch_page_selenium(url_or_key, pool=self.pool)
+        except Exception:
+            self._count('failed')
+            raise
+        self._count('selenium')
+        return html_content
+
+
+class HttpBackend(FetchBackend):
+    """
+    使用带连接池的keep-alive HTTP会话获取页面
+
+    响应中没有page-content元素时回退到fallback后端（默认Selenium）
+
+    参数:
+    - pool_size: 连接池大小
+    - timeout: 单次请求超时时间（秒）
+    - fallback: 回退使用的后端，传入False表示不回退
+    """
+    name = 'http'
+
+    def __init__(self, pool_size=10, timeout=15, fallback=None):
+        super().__init__()
+        self.timeout = timeout
+        self.fallback = SeleniumBackend() if fallback is None else fallback
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (etg-itemtips-cn)',
+            'Accept-Language': 'zh-CN,zh;q=0.9',
+        })
+
+    def fetch_page(self, url_or_key, headers=None):
+        url = build_page_url(url_or_key)
+        try:
+            response = self.session.get(url, timeout=self.timeout, headers=headers)
+        except requests.RequestException:
+            # 网络错误换成浏览器也无济于事，交给重试引擎
+            self._count('failed')
+            raise
+
+        if response.status_code == 304:
+            self._count('not_modified')
+            return PageResponse(url, None, 304, response.headers, self.name)
+
+        # 未声明字符集时requests会按ISO-8859-1解码，wiki页面实际是UTF-8
+        if 'charset' not in response.headers.get('Content-Type', '').lower():
+            response.encoding = 'utf-8'
+        # wikidot的“页面不存在”页面同样带有page-content，按原样返回，和Selenium行为一致
+        if has_page_content(response.text):
+            self._count('http')
+            return PageResponse(url, response.text, response.status_code, response.headers, self.name)
+
+        kind = http_status_kind(response.status_code)
+        if kind in ('throttled', 'server'):
+            self._count('failed')
+            raise FetchError(kind, f"HTTP {response.status_code}: {url}", response.status_code)
+
+        print(f"{url} 的响应中没有page-content (HTTP {response.status_code})")
+        if not self.fallback:
+            self._count('failed')
+            raise FetchError('no_content', f"响应中没有page-content: {url}", response.status_code)
+
+        print(f"回退到 {self.fallback.name} 获取 {url}")
+        try:
+            page = self.fallback.fetch_page(url)
+        except Exception:
+            self._count('failed')
+            raise
+        self._count('fallback')
+        return page
+
+    def close(self):
+        self.session.close()
+        if self.fallback:
+            self.fallback.close()
+
+    def report(self):
+        report = super().report()
+        if self.fallback and self.fallback.hits:
+            report += "\n" + self.fallback.report()
+        return report
+
+
+# 可用的后端，名称到类的映射
+FETCH_BACKENDS = {
+    'http': HttpBackend,
+    'selenium': SeleniumBackend,
+}
+
+DEFAULT_FETCH_BACKEND = 'http'
+
+
+def register_fetch_backend(name, backend_class):
+    """
+    注册新的页面获取后端
+
+    参数:
+    - name: 后端名称
+    - backend_class: FetchBackend的子类
+    """
+    FETCH_BACKENDS[name] = backend_class
+
+
+def create_fetch_backend(name=DEFAULT_FETCH_BACKEND, **kwargs):
+    """
+    按名称创建页面获取后端
+
+    参数:
+    - name: 后端名称，见FETCH_BACKENDS
+    - kwargs: 传给后端构造函数的参数
+
+    返回:
+    - FetchBackend实例
+    """
+    if name not in FETCH_BACKENDS:
+        raise ValueError(f"未知的页面获取后端: {name}，可选: {', '.join(FETCH_BACKENDS)}")
+    return FETCH_BACKENDS[name](**kwargs)
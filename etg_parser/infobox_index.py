@@ -0,0 +1,161 @@
+from collections import Counter
+from difflib import SequenceMatcher
+
+from bs4 import Tag
+
+# 模糊匹配的相似度阈值，SequenceMatcher.ratio()超过它才算找到了物品的infobox
+FUZZY_MATCH_THRESHOLD = 0.6
+
+# InfoboxIndex.find返回的匹配方式
+MATCH_EN = 'en'        # 英文名是标题的子串
+MATCH_CN = 'cn'        # 中文名是标题的子串
+MATCH_FUZZY = 'fuzzy'  # 相似度超过阈值
+
+
+def is_div_with_class(node, class_name):
+    """node是否为class中含class_name的div，比find_all('div', class_=...)的通用过滤快得多"""
+    return isinstance(node, Tag) and node.name == 'div' and class_name in node.get('class', ())
+
+
+def infobox_title(infobox):
+    """
+    infobox的标题：第一个div.title后代的文本，没有标题或标题为空时返回None
+    """
+    title_div = next((div for div in infobox.descendants if is_div_with_class(div, 'title')), None)
+    if title_div and title_div.text:
+        return title_div.text
+    return None
+
+
+class InfoboxTitle:
+    """
+    一个有标题的infobox，标题的小写形式只计算一次，字符计数在第一次模糊匹配时计算
+
+    参数:
+    - infobox: infobox-container元素
+    - title: 标题文本
+    """
+
+    def __init__(self, infobox, title):
+        self.infobox = infobox
+        self.title = title
+        self.lower = title.lower()
+        self._counts = None
+
+    @property
+    def counts(self):
+        if self._counts is None:
+            self._counts = Counter(self.lower)
+        return self._counts
+
+
+class TitleMatcher:
+    """
+    判断一个infobox标题是否属于某个物品，条件按顺序为
+    - 小写英文名是小写标题的子串
+    - 中文名是标题的子串
+    - 英文名或中文名与标题的相似度超过FUZZY_MATCH_THRESHOLD
+
+    参数:
+    - item_name_en_lower: 小写的物品英文名（下划线和横杠已替换为空格）
+    - item_name_cn: 物品中文名称（可选）
+    """
+
+    def __init__(self, item_name_en_lower, item_name_cn=None):
+        self.item_name_en_lower = item_name_en_lower
+        self.item_name_cn = item_name_cn
+        self.name_cn_lower = item_name_cn.lower() if item_name_cn else None
+        self._en_counts = self._cn_counts = None
+
+    def match(self, entry):
+        """
+        参数:
+        - entry: InfoboxTitle
+
+        返回:
+        - (匹配方式, 相似度)，匹配方式见MATCH_*，相似度只在模糊匹配时给出；不匹配时为(None, None)
+        """
+        if self.item_name_en_lower in entry.lower:
+            return MATCH_EN, None
+        if self.item_name_cn and self.item_name_cn in entry.title:
+            return MATCH_CN, None
+
+        if self._en_counts is None:
+            self._en_counts = Counter(self.item_name_en_lower)
+            self._cn_counts = Counter(self.name_cn_lower) if self.name_cn_lower else None
+        en_similarity = similarity(self.item_name_en_lower, self._en_counts, entry)
+        cn_similarity = similarity(self.name_cn_lower, self._cn_counts, entry) if self.name_cn_lower else 0
+        if en_similarity > FUZZY_MATCH_THRESHOLD or cn_similarity > FUZZY_MATCH_THRESHOLD:
+            return MATCH_FUZZY, max(en_similarity, cn_similarity)
+        return None, None
+
+
+class InfoboxIndex:
+    """
+    页面中所有infobox标题的索引，每个解析过的页面只建立一次（见ParsedPage.infobox_index）
+
+    查找规则与原来逐个infobox比较的做法相同：从最后一个infobox往前找，第一个满足TitleMatcher条件的胜出
+
+    为了少做SequenceMatcher的计算:
+    - 标题与名称完全相同的infobox一定满足子串条件，用哈希表找到最后一个这样的infobox，
+      只需要检查它后面的infobox
+    - ratio() = 2 * 匹配字符数 / 两个字符串的总长度，匹配字符数不会超过较短字符串的长度，
+      也不会超过两边共有的字符数，先用这两个上界排除不可能超过阈值的标题
+
+    参数:
+    - soup: 页面的BeautifulSoup对象
+    """
+
+    def __init__(self, soup):
+        self.infoboxes = [div for div in soup.find_all('div') if is_div_with_class(div, 'infobox-container')]
+        self.titles = []
+        # 小写标题 -> 最后一个这样标题的infobox在titles中的位置（用于英文名）
+        self.lower_positions = {}
+        # 标题原文 -> 最后一个这样标题的infobox在titles中的位置（用于中文名）
+        self.title_positions = {}
+        for infobox in self.infoboxes:
+            title = infobox_title(infobox)
+            if title:
+                entry = InfoboxTitle(infobox, title)
+                self.lower_positions[entry.lower] = len(self.titles)
+                self.title_positions[entry.title] = len(self.titles)
+                self.titles.append(entry)
+
+    def find(self, item_name_en_lower, item_name_cn=None):
+        """
+        查找物品的infobox
+
+        参数:
+        - item_name_en_lower: 小写的物品英文名（下划线和横杠已替换为空格）
+        - item_name_cn: 物品中文名称（可选）
+
+        返回:
+        - (infobox, 匹配方式, 相似度)，匹配方式见MATCH_*，相似度只在模糊匹配时给出；没找到时为(None, None, None)
+        """
+        # 完全相同的标题一定能匹配，更早的infobox不用再看
+        stop = self.lower_positions.get(item_name_en_lower, -1)
+        if item_name_cn:
+            stop = max(stop, self.title_positions.get(item_name_cn, -1))
+
+        matcher = TitleMatcher(item_name_en_lower, item_name_cn)
+        for position in range(len(self.titles) - 1, max(stop, 0) - 1, -1):
+            entry = self.titles[position]
+            match, score = matcher.match(entry)
+            if match:
+                return entry.infobox, match, score
+        return None, None, None
+
+
+def similarity(name, name_counts, entry):
+    """
+    名称与标题（都是小写）的SequenceMatcher相似度
+
+    上界已经不超过FUZZY_MATCH_THRESHOLD时不计算，直接返回0（这时实际相似度也不可能超过阈值）
+    """
+    total = len(name) + len(entry.lower)
+    if 2.0 * min(len(name), len(entry.lower)) / total <= FUZZY_MATCH_THRESHOLD:
+        return 0
+    common = sum((name_counts & entry.counts).values())
+    if 2.0 * common / total <= FUZZY_MATCH_THRESHOLD:
+        return 0
+    return SequenceMatcher(None, name, entry.lower).ratio()
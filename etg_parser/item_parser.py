@@ -1,61 +1,37 @@
 
-import re
+from bs4 import NavigableString,Tag
 
-from bs4 import BeautifulSoup,NavigableString,Tag
+from .content_walker import LIST_TAGS, ContentView
+from .infobox_index import MATCH_CN, MATCH_EN, MATCH_FUZZY
+from .parsed_page import parse_page
+from .text_normalizer import DESCRIPTION_CLEANUP, DESCRIPTION_SPACING
 
 def extract_item_description(html_content, item_name_en, item_name_cn=None):
     """
     从HTML内容中提取物品描述
     
     参数:
-    - html_content: 页面HTML内容
+    - html_content: 页面HTML内容，或已经解析过的ParsedPage（与其他提取函数共用一次解析）
     - item_name_en: 物品英文名称
     - item_name_cn: 物品中文名称（可选）
     
     返回:
     - 提取的描述文本
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # 找到所有infobox容器
-    all_infoboxes = soup.find_all('div', class_='infobox-container')
-    print(f"页面中找到 {len(all_infoboxes)} 个infobox容器")
+    index = parse_page(html_content).infobox_index
+    print(f"页面中找到 {len(index.infoboxes)} 个infobox容器")
     
     # 英文名统一小写，并将下划线和横杠替换为空格
     item_name_en_lower = item_name_en.lower().replace('_', ' ').replace('-', ' ')
     
-    # 倒序查找匹配的infobox
-    target_infobox = None
-    for infobox in reversed(all_infoboxes):
-        title_div = infobox.find('div', class_='title')
-        if title_div and title_div.text:
-            # 先尝试用英文名匹配
-            if item_name_en_lower in title_div.text.lower():
-                target_infobox = infobox
-                print(f"找到物品 '{item_name_en}' 的infobox")
-                break
-            # 如果提供了中文名，尝试用中文名匹配
-            elif item_name_cn and item_name_cn in title_div.text:
-                target_infobox = infobox
-                print(f"找到物品 '{item_name_cn}' 的infobox")
-                break
-            # 如果精确匹配失败，尝试模糊匹配
-            else:
-                from difflib import SequenceMatcher
-                
-                # 计算相似度
-                def similarity(a, b):
-                    return SequenceMatcher(None, a.lower(), b.lower()).ratio()
-                
-                title_text = title_div.text.lower()
-                en_similarity = similarity(item_name_en_lower, title_text)
-                cn_similarity = similarity(item_name_cn or "", title_text) if item_name_cn else 0
-                
-                # 如果相似度超过阈值(0.6)，认为找到了匹配
-                if en_similarity > 0.6 or cn_similarity > 0.6:
-                    target_infobox = infobox
-                    print(f"通过模糊匹配找到物品 '{item_name_en}' 的infobox，相似度: {max(en_similarity, cn_similarity):.2f}")
-                    break
+    # 倒序查找匹配的infobox：先尝试英文名和中文名，都不是标题的子串时再模糊匹配
+    target_infobox, match, similarity = index.find(item_name_en_lower, item_name_cn)
+    if match == MATCH_EN:
+        print(f"找到物品 '{item_name_en}' 的infobox")
+    elif match == MATCH_CN:
+        print(f"找到物品 '{item_name_cn}' 的infobox")
+    elif match == MATCH_FUZZY:
+        print(f"通过模糊匹配找到物品 '{item_name_en}' 的infobox，相似度: {similarity:.2f}")
     
     # 如果没找到，那直接打印并且return掉就行
     if not target_infobox:
@@ -73,10 +49,22 @@ def extract_item_description(html_content, item_name_en, item_name_cn=None):
             print(f"找到物品 '{item_name_en}' 的unlock")
 
     # 直接获取infobox和下一个目标元素之间的所有内容
-    all_content = ""
-    current = target_infobox.next_sibling
+    return describe_siblings(target_infobox.next_siblings, item_name_en, next_synergy)
+
+def describe_siblings(siblings, item_name_en, next_synergy=None):
+    """
+    把infobox后面的兄弟节点拼接为物品描述，遇到下一个div（联动容器、unlock等）为止
     
-    while current:
+    参数:
+    - siblings: infobox之后的兄弟节点，按文档顺序
+    - item_name_en: 物品英文名称（只用于打印）
+    - next_synergy: infobox之后的第一个联动容器或unlock（可选），遇到它时停止
+    
+    返回:
+    - 描述文本，没有内容时为空字符串
+    """
+    all_content = ""
+    for current in siblings:
         if next_synergy and current == next_synergy:
             break
         if getattr(current, 'name', None) == 'div':
@@ -145,7 +133,6 @@ def extract_item_description(html_content, item_name_en, item_name_cn=None):
                         if tt_text:
                             all_content += f"`{tt_text}`"
 
-        current = current.next_sibling
     if all_content:
         print(f"找到物品 '{item_name_en}' 的描述内容")
         return all_content
@@ -153,79 +140,55 @@ def extract_item_description(html_content, item_name_en, item_name_cn=None):
     print(f"未能找到物品 '{item_name_en}' 的描述")
     return ""
 
+def image_placeholder(img):
+    """
+    基础资源图片的占位符：alt中含.png时为{item:名称}，否则返回None（图片直接去掉）
+    """
+    img_alt = img.get('alt', '')
+    # 从alt属性中提取物品名称（去掉.png后缀）
+    if '.png' in img_alt:
+        item_name = img_alt.split('.png')[0].lower()
+        return f'{{item:{item_name}}}'
+    return None
+
 def process_content(element):
     """
     处理HTML元素，提取并格式化其内容
     
+    直接遍历原始节点，不复制也不修改文档树：图片替换为占位符，<ul>/<ol>跳过后在最后单独按列表格式输出
+    
     参数:
     - element: BeautifulSoup元素
     
     返回:
     - 处理后的文本内容
     """
-    # 复制一个元素副本用于处理
-    element_copy = BeautifulSoup(str(element), 'html.parser')
+    view = ContentView(image_placeholder)
+    # 把元素当作一个只含它自己的文档来处理，元素本身也可能被替换
+    top_level = list(view.children([element], skip_lists=True))
     
-    # 常见物品/资源的中文名称映射
-    # item_name_map = {
-    #     'Key.png': '钥匙',
-    #     'Money.png': '弹壳',
-    #     'Ammo.png': '弹药',
-    #     'Spread_Ammo.png': '散弹',
-    #     'Blank.png': '空弹',
-    #     'Heart.png': '心',
-    #     'Half_Heart.png': '半心',
-    #     'Armor.png': '护甲',
-    #     'Gnawed_Key.png': '被咬的钥匙',
-    #     'Rat_Chest.png': '老鼠宝箱',
-    # }
-    
-    # 处理基础资源的图片标签，替换为占位符
-    for img in element_copy.find_all('img'):
-        parent = img.parent
-        img_alt = img.get('alt', '')
-        
-        # 从alt属性中提取物品名称（去掉.png后缀）
-        if '.png' in img_alt:
-            item_name = img_alt.split('.png')[0].lower()
-            placeholder = f'{{item:{item_name}}}'
-            
-            # 替换图片标签为占位符
-            if parent and parent.name == 'a':
-                parent.replace_with(placeholder)
-            else:
-                img.replace_with(element_copy.new_string(placeholder))
-        else:
-            # 无法识别的图片直接移除
-            img.decompose()
-    
-    # 找到所有ul标签并临时移除，以免其内容被重复提取
-    ul_tags = []
-    for ul_tag in element_copy.find_all(['ul', 'ol']):
-        ul_copy = ul_tag.extract()  # 从DOM中移除，但保留引用
-        ul_tags.append(ul_copy)
-    
-    # 提取文本，保留换行符
+    # 提取文本，保留换行符（<ul>/<ol>先跳过，最后单独处理，以免其内容被重复提取）
     lines = []
 
     # 处理非ul/ol内容
-    for content in element_copy.contents:
+    for content in top_level:
+        string = view.string(content, skip_lists=True)
         if content.name == 'br':
             lines.append('\n')
         elif content.name == 'hr':
             continue  # 忽略水平线
-        elif content.string:
-            lines.append(content.string.strip())
+        elif string:
+            lines.append(string.strip())
         elif hasattr(content, 'find_all'):
             # 处理内部可能包含的<br>标签
             text = ''
-            for item in content.contents:
+            for item in view.children(content.contents, skip_lists=True):
                 if item.name == 'br':
                     text += '\n'
                 elif isinstance(item, str):
                     text += item.strip()
                 else:
-                    text += item.get_text(strip=True)
+                    text += view.get_text(item, strip=True, skip_lists=True)
             lines.append(text)
         elif content.get_text(strip=True):
             lines.append(content.get_text(strip=True))
@@ -233,26 +196,14 @@ def process_content(element):
     # 合并文本行并处理格式
     description = ''.join(lines).strip()
     
-    # 替换连续的换行符为单个换行符
-    description = re.sub(r'\n\s*\n+', '\n', description)
-    
-    # 处理常见的格式问题
-    # 在冒号后添加空格
-    description = re.sub(r'([：:])(?!\s)', r'\1 ', description)
-    
-    # 在数字和文字之间添加空格
-    description = re.sub(r'(\d)([级])(?!\s)', r'\1 \2', description)
-    
-    # 在句号后添加空格
-    description = re.sub(r'([。])(?!\s|$)', r'\1 ', description)
+    # 合并换行符，在冒号、句号后和“数字级”中间添加空格
+    description = DESCRIPTION_SPACING.sub(description)
     
-    # 然后处理之前移除的ul/ol列表
-    for ul_tag in ul_tags:
+    # 然后处理之前跳过的ul/ol列表（嵌套的列表在外层列表之后单独处理）
+    for ul_tag in view.find_all([element], LIST_TAGS):
         ul_text = []
-        for li in ul_tag.find_all('li'):
-            # 处理li标签内的图片 (已经在之前的代码处理过了)
-                
-            li_text = li.get_text(strip=True)
+        for li in view.find_all(ul_tag.contents, ('li',), stop_at=LIST_TAGS):
+            li_text = view.get_text(li, strip=True, skip_lists=True)
             if li_text:
                 ul_text.append(f"- {li_text}")
         
@@ -263,12 +214,7 @@ def process_content(element):
             else:  # 否则直接添加
                 description = "\n".join(ul_text)
     
-    # 最后的格式清理
-    # 移除多余的空格
-    description = re.sub(r' +', ' ', description)
-    # 确保句子之间有适当的空格
-    description = re.sub(r'([。！？])\s*([^\s])', r'\1 \2', description)
-    # 移除行首行尾的空白字符
-    description = re.sub(r'^\s+|\s+$', '', description, flags=re.MULTILINE)
+    # 最后的格式清理：合并空格，句子之间留一个空格，移除行首行尾的空白字符
+    description = DESCRIPTION_CLEANUP.sub(description)
     
     return description
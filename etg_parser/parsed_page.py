@@ -0,0 +1,150 @@
+import os
+
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+
+from etg_cache.trim import find_page_content
+
+from .infobox_index import InfoboxIndex
+
+# 可选的HTML解析后端：名称 -> BeautifulSoup的tree builder
+# html.parser是纯Python实现，不需要额外依赖；lxml是C实现，快得多，需要安装lxml
+PARSER_BACKENDS = {
+    'html.parser': 'html.parser',
+    'lxml': 'lxml',
+}
+DEFAULT_PARSER_BACKEND = 'html.parser'
+# 也可以用环境变量选择解析后端，命令行参数优先
+PARSER_BACKEND_ENV = 'ETG_HTML_PARSER'
+
+# 当前使用的解析后端，首次解析时按环境变量或DEFAULT_PARSER_BACKEND确定
+PARSER_BACKEND = None
+
+# 是否只解析#page-content区域（--partial-parse，或环境变量ETG_PARTIAL_PARSE=1）
+PARTIAL_PARSE_ENV = 'ETG_PARTIAL_PARSE'
+PARTIAL_PARSE = None
+
+
+def check_parser_backend(name):
+    """
+    检查解析后端是否可用
+
+    参数:
+    - name: 后端名称，见PARSER_BACKENDS
+
+    返回:
+    - name，不认识或没有安装对应的库时抛出ValueError
+    """
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"未知的HTML解析后端: {name}，可选: {', '.join(sorted(PARSER_BACKENDS))}")
+    if builder_registry.lookup(PARSER_BACKENDS[name]) is None:
+        raise ValueError(f"HTML解析后端 {name} 不可用，请先安装: pip install {name}")
+    return name
+
+
+def get_parser_backend():
+    """
+    获取当前的HTML解析后端名称，没有设置过时按环境变量ETG_HTML_PARSER确定
+    """
+    global PARSER_BACKEND
+    if PARSER_BACKEND is None:
+        PARSER_BACKEND = check_parser_backend(os.environ.get(PARSER_BACKEND_ENV) or DEFAULT_PARSER_BACKEND)
+    return PARSER_BACKEND
+
+
+def set_parser_backend(name):
+    """
+    按名称切换HTML解析后端
+
+    参数:
+    - name: 后端名称，见PARSER_BACKENDS
+    """
+    global PARSER_BACKEND
+    PARSER_BACKEND = check_parser_backend(name)
+    return PARSER_BACKEND
+
+
+def get_partial_parse():
+    """
+    是否只解析#page-content区域，没有设置过时按环境变量ETG_PARTIAL_PARSE确定
+    """
+    global PARTIAL_PARSE
+    if PARTIAL_PARSE is None:
+        PARTIAL_PARSE = os.environ.get(PARTIAL_PARSE_ENV, '') not in ('', '0')
+    return PARTIAL_PARSE
+
+
+def set_partial_parse(enabled):
+    """
+    打开或关闭部分解析
+
+    参数:
+    - enabled: 为True时只解析#page-content区域
+    """
+    global PARTIAL_PARSE
+    PARTIAL_PARSE = bool(enabled)
+    return PARTIAL_PARSE
+
+
+def parse_mode(backend=None, partial=None):
+    """
+    当前解析方式的名称，例如'html.parser'或'lxml+partial'，用于区分不同解析方式的提取结果
+    """
+    backend = backend or get_parser_backend()
+    partial = get_partial_parse() if partial is None else partial
+    return f"{backend}+partial" if partial else backend
+
+
+class ParsedPage:
+    """
+    解析过一次的页面
+
+    extract_item_description和extract_item_synergies都只读取文档树，不修改它，
+    所以同一个物品的两次提取可以共用一次解析的结果。
+    替换图片后的文本由content_walker.ContentView在原始节点上直接读取，不再复制片段重新解析。
+
+    部分解析时先在字符串中切出#page-content子树，只给这一段建立文档树，
+    导航、侧边栏和脚本都不解析。提取函数要找的infobox、联动容器和unlock都在这一子树内，
+    找不到完整的#page-content时仍解析整个页面。
+
+    参数:
+    - html_content: 页面HTML内容
+    - backend: 解析后端名称，默认为当前的解析后端
+    - partial: 是否只解析#page-content区域，默认按get_partial_parse()
+    """
+
+    def __init__(self, html_content, backend=None, partial=None):
+        self.html = html_content
+        self.backend = backend or get_parser_backend()
+        self.partial = get_partial_parse() if partial is None else partial
+        markup = html_content
+        if self.partial:
+            span = find_page_content(html_content)
+            if span is not None:
+                markup = html_content[span[0]:span[1]]
+            else:
+                self.partial = False
+        self.soup = BeautifulSoup(markup, PARSER_BACKENDS[self.backend])
+        self._infobox_index = None
+
+    @property
+    def infobox_index(self):
+        """页面中infobox标题的索引，第一次用到时建立"""
+        if self._infobox_index is None:
+            self._infobox_index = InfoboxIndex(self.soup)
+        return self._infobox_index
+
+
+def parse_page(page):
+    """
+    把页面HTML字符串解析为ParsedPage，已经是ParsedPage时直接返回
+
+    参数:
+    - page: 页面HTML内容或ParsedPage
+
+    返回:
+    - ParsedPage
+    """
+    if isinstance(page, ParsedPage):
+        return page
+    return ParsedPage(page)
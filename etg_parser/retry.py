@@ -0,0 +1,393 @@
+import random
+import threading
+import time
+
+import requests
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+
+class FetchError(Exception):
+    """
+    页面获取失败，kind表示错误类别，用于选择重试策略
+
+    参数:
+    - kind: 错误类别，见DEFAULT_POLICIES
+    - message: 错误描述
+    - status_code: HTTP状态码（如有）
+    """
+
+    def __init__(self, kind, message='', status_code=None):
+        super().__init__(message or kind)
+        self.kind = kind
+        self.status_code = status_code
+
+
+def classify_error(error):
+    """
+    把异常归类为重试策略使用的错误类别
+
+    参数:
+    - error: 捕获到的异常
+
+    返回:
+    - 错误类别字符串
+    """
+    if isinstance(error, FetchError):
+        return error.kind
+    if isinstance(error, (requests.Timeout, TimeoutException)):
+        return 'timeout'
+    if isinstance(error, requests.ConnectionError):
+        return 'connection'
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return http_status_kind(error.response.status_code)
+    if isinstance(error, WebDriverException):
+        return 'browser'
+    return 'other'
+
+
+def http_status_kind(status_code):
+    """
+    把HTTP状态码映射为错误类别
+
+    返回:
+    - 'throttled'、'server'、'client'，状态码正常时返回None
+    """
+    if status_code in (429, 503):
+        return 'throttled'
+    if status_code >= 500:
+        return 'server'
+    if status_code >= 400:
+        return 'client'
+    return None
+
+
+class RetryPolicy:
+    """
+    单个错误类别的重试策略：带抖动的指数退避
+
+    参数:
+    - max_retries: 最大重试次数
+    - base_delay: 第一次重试前的基础等待时间（秒）
+    - max_delay: 单次等待时间上限（秒）
+    - multiplier: 每次重试等待时间的增长倍数
+    """
+
+    def __init__(self, max_retries=3, base_delay=1.0, max_delay=30.0, multiplier=2.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+
+    def delay(self, attempt, rng=random):
+        """
+        计算第attempt次重试前的等待时间（从0开始计数）
+
+        使用full jitter：在[0, 指数退避上限]之间随机取值，避免并发请求同时重试
+        """
+        ceiling = min(self.max_delay, self.base_delay * (self.multiplier ** attempt))
+        return rng.uniform(0, ceiling)
+
+
+# 各错误类别的默认重试策略
+DEFAULT_POLICIES = {
+    # 被限流时退避得更久
+    'throttled': RetryPolicy(max_retries=5, base_delay=5.0, max_delay=120.0),
+    'server': RetryPolicy(max_retries=4, base_delay=2.0, max_delay=60.0),
+    'timeout': RetryPolicy(max_retries=3, base_delay=1.0, max_delay=30.0),
+    'connection': RetryPolicy(max_retries=3, base_delay=1.0, max_delay=30.0),
+    # 浏览器崩溃由会话池重建，很快就可以重试
+    'browser': RetryPolicy(max_retries=2, base_delay=0.5, max_delay=5.0),
+    # 页面结构异常或返回空内容，重试一次就够了
+    'no_content': RetryPolicy(max_retries=1, base_delay=1.0, max_delay=5.0),
+    'empty': RetryPolicy(max_retries=1, base_delay=1.0, max_delay=5.0),
+    # 4xx（404的“页面不存在”页面会被正常返回，不会到这里）重试也没有意义
+    'client': RetryPolicy(max_retries=0),
+    'other': RetryPolicy(max_retries=2, base_delay=1.0, max_delay=10.0),
+}
+
+# 这些错误说明wiki本身出了问题，计入熔断器
+SITE_FAILURE_KINDS = {'throttled', 'server', 'timeout', 'connection'}
+
+
+class CircuitBreaker:
+    """
+    熔断器：连续失败达到阈值后暂停所有请求一段时间
+
+    暂停结束后进入半开状态，只放行一个探测请求；探测成功则恢复，
+    失败则再次熔断并把暂停时间加倍（不超过max_cooldown）。
+
+    参数:
+    - failure_threshold: 触发熔断的连续失败次数
+    - cooldown: 初始暂停时间（秒）
+    - max_cooldown: 暂停时间上限（秒）
+    - sleep, clock: 等待和计时函数，测试时可以替换
+    """
+
+    def __init__(self, failure_threshold=5, cooldown=30.0, max_cooldown=300.0, sleep=time.sleep, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.sleep = sleep
+        self.clock = clock
+
+        self.state = 'closed'
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.trips = 0
+        self.paused_time = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        """请求前调用，熔断期间阻塞直到允许发出请求"""
+        while True:
+            with self._lock:
+                now = self.clock()
+                if self.state == 'closed':
+                    return
+                if self.state == 'open' and now >= self.open_until:
+                    self.state = 'half_open'
+                if self.state == 'half_open' and not self._probe_in_flight:
+                    self._probe_in_flight = True
+                    return
+                # 熔断中等到暂停结束；半开状态下等待探测请求的结果
+                wait = self.open_until - now if self.state == 'open' else 0.5
+            self.paused_time += wait
+            self.sleep(wait)
+
+    def record_success(self):
+        with self._lock:
+            if self.state != 'closed':
+                print("熔断器恢复，继续抓取")
+            self.state = 'closed'
+            self.consecutive_failures = 0
+            self.cooldown = self.base_cooldown
+            self._probe_in_flight = False
+
+    def record_failure(self, kind):
+        with self._lock:
+            if kind not in SITE_FAILURE_KINDS:
+                # 与站点状态无关的失败不影响熔断，但要释放探测名额
+                if self.state == 'half_open':
+                    self._probe_in_flight = False
+                return
+            self.consecutive_failures += 1
+            if self.state == 'half_open':
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                self._trip()
+            elif self.state == 'closed' and self.consecutive_failures >= self.failure_threshold:
+                self._trip()
+
+    def _trip(self):
+        self.state = 'open'
+        self.open_until = self.clock() + self.cooldown
+        self.trips += 1
+        self._probe_in_flight = False
+        print(f"wiki连续失败 {self.consecutive_failures} 次，暂停所有请求 {self.cooldown:.0f} 秒")
+
+
+class AIMDLimiter:
+    """
+    按观测到的延迟调整并发上限（加性增、乘性减）
+
+    延迟不超过target_latency时每次成功把上限增加 increase/当前上限（约每轮+increase），
+    延迟过高或失败时把上限乘以decrease。
+
+    参数:
+    - initial: 初始并发上限
+    - min_limit: 最小并发上限
+    - max_limit: 最大并发上限
+    - target_latency: 目标延迟（秒）
+    """
+
+    def __init__(self, initial=4, min_limit=1, max_limit=16, target_latency=3.0, increase=1.0, decrease=0.5):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.target_latency = target_latency
+        self.increase = increase
+        self.decrease = decrease
+
+        self.in_flight = 0
+        self.peak_limit = self.limit
+        self.lowest_limit = self.limit
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self, latency):
+        with self._cond:
+            if latency > self.target_latency:
+                self._decrease()
+            else:
+                self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+                self.peak_limit = max(self.peak_limit, self.limit)
+            self._cond.notify_all()
+
+    def on_failure(self):
+        with self._cond:
+            self._decrease()
+
+    def _decrease(self):
+        self.limit = max(self.min_limit, self.limit * self.decrease)
+        self.lowest_limit = min(self.lowest_limit, self.limit)
+
+
+class RetryEngine:
+    """
+    所有页面获取共用的重试引擎
+
+    按错误类别选择重试策略进行带抖动的指数退避，
+    通过熔断器在wiki持续出错时暂停整个抓取，并用AIMD调整并发上限。
+
+    参数:
+    - policies: 错误类别到RetryPolicy的字典，未给出的类别使用DEFAULT_POLICIES
+    - max_retries: 所有策略的重试次数上限，None表示不额外限制
+    - breaker: CircuitBreaker实例
+    - limiter: AIMDLimiter实例，None表示不限制并发
+    - sleep, clock, rng: 等待、计时和退避抖动用的函数与随机数生成器，测试时可以替换
+    """
+
+    def __init__(self, policies=None, max_retries=None, breaker=None, limiter=None, sleep=time.sleep, rng=None,
+                 clock=time.monotonic):
+        self.policies = dict(DEFAULT_POLICIES)
+        if policies:
+            self.policies.update(policies)
+        self.max_retries = max_retries
+        self.breaker = breaker if breaker is not None else CircuitBreaker(sleep=sleep, clock=clock)
+        self.limiter = limiter
+        self.sleep = sleep
+        self.clock = clock
+        self.rng = rng or random.Random()
+
+        # 统计信息
+        self.calls = 0
+        self.successes = 0
+        self.failures = 0
+        self.retries = {}
+        self.backoff_time = 0.0
+        self._stats_lock = threading.Lock()
+
+    def policy_for(self, kind):
+        return self.policies.get(kind, self.policies['other'])
+
+    def _attempt(self, fn, args):
+        self.breaker.before_request()
+        if self.limiter:
+            self.limiter.acquire()
+        start = self.clock()
+        try:
+            result = fn(*args)
+            if result is None:
+                raise FetchError('empty', '获取结果为空')
+        except Exception:
+            if self.limiter:
+                self.limiter.on_failure()
+            raise
+        else:
+            if self.limiter:
+                self.limiter.on_success(self.clock() - start)
+            return result
+        finally:
+            if self.limiter:
+                self.limiter.release()
+
+    def call(self, fn, *args, description=''):
+        """
+        调用fn(*args)，失败时按策略重试
+
+        fn返回None也视为失败（类别为'empty'）。
+
+        返回:
+        - fn的返回值
+
+        异常:
+        - 超过重试次数后抛出最后一次的异常
+        """
+        with self._stats_lock:
+            self.calls += 1
+        attempt = 0
+        while True:
+            try:
+                result = self._attempt(fn, args)
+            except Exception as e:
+                kind = classify_error(e)
+                self.breaker.record_failure(kind)
+                policy = self.policy_for(kind)
+                max_retries = policy.max_retries
+                if self.max_retries is not None:
+                    max_retries = min(max_retries, self.max_retries)
+                if attempt >= max_retries:
+                    with self._stats_lock:
+                        self.failures += 1
+                    raise
+                delay = policy.delay(attempt, self.rng)
+                with self._stats_lock:
+                    self.retries[kind] = self.retries.get(kind, 0) + 1
+                    self.backoff_time += delay
+                print(f"{description or '请求'}失败 ({kind}: {e})，{delay:.1f} 秒后第 {attempt + 1} 次重试")
+                self.sleep(delay)
+                attempt += 1
+            else:
+                self.breaker.record_success()
+                with self._stats_lock:
+                    self.successes += 1
+                return result
+
+    def report(self):
+        """
+        生成重试统计报告文本
+
+        返回:
+        - 多行报告字符串
+        """
+        lines = [
+            "重试统计:",
+            f"请求: {self.calls}，成功: {self.successes}，最终失败: {self.failures}",
+        ]
+        for kind, count in sorted(self.retries.items()):
+            lines.append(f"  {kind}: 重试 {count} 次")
+        lines.append(f"退避等待: {self.backoff_time:.2f} 秒")
+        lines.append(f"熔断次数: {self.breaker.trips}，熔断暂停: {self.breaker.paused_time:.2f} 秒")
+        if self.limiter:
+            lines.append(f"并发上限: 当前 {self.limiter.limit:.1f}，最高 {self.limiter.peak_limit:.1f}，最低 {self.limiter.lowest_limit:.1f}")
+        return "\n".join(lines)
+
+
+_default_engine = None
+_default_engine_lock = threading.Lock()
+
+
+def configure_retry_engine(**kwargs):
+    """
+    重新创建共享的重试引擎
+
+    参数:
+    - kwargs: 传给RetryEngine的参数
+
+    返回:
+    - 新的RetryEngine
+    """
+    global _default_engine
+    with _default_engine_lock:
+        _default_engine = RetryEngine(**kwargs)
+        return _default_engine
+
+
+def get_retry_engine():
+    """获取进程内共享的重试引擎，不存在时按默认配置创建"""
+    global _default_engine
+    with _default_engine_lock:
+        if _default_engine is None:
+            _default_engine = RetryEngine()
+        return _default_engine
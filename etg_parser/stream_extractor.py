@@ -0,0 +1,338 @@
+import os
+import re
+from collections import Counter, deque
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup, Tag
+from bs4.builder import HTMLParserTreeBuilder
+from bs4.dammit import EntitySubstitution
+from bs4.element import CData, Comment, Declaration, Doctype, NavigableString, ProcessingInstruction
+
+from .infobox_index import InfoboxTitle, TitleMatcher, infobox_title
+from .item_parser import describe_siblings
+from .synergy_parser import collect_synergies
+
+# 提取方式名称，用于区分流式提取和文档树提取的缓存结果（见extraction_cache.extraction_mode）
+STREAM_MODE = 'stream'
+
+# 是否用流式提取器（--stream-extract，或环境变量ETG_STREAM_EXTRACT=1）
+STREAMING_ENV = 'ETG_STREAM_EXTRACT'
+STREAMING = None
+
+# 每次交给HTMLParser的字符数，每块解析完就处理已经结束的联动容器
+CHUNK_SIZE = 64 * 1024
+
+# 与bs4的html.parser后端相同的建树规则：空元素、保留空白的标签、特殊字符串类型、多值属性
+TREE_BUILDER = HTMLParserTreeBuilder()
+
+_DECIMAL_REFERENCE = re.compile(r'^([0-9]+)(.*)')
+_HEX_REFERENCE = re.compile(r'^([0-9a-f]+)(.*)')
+
+
+def get_streaming():
+    """
+    是否用流式提取器，没有设置过时按环境变量ETG_STREAM_EXTRACT确定
+    """
+    global STREAMING
+    if STREAMING is None:
+        STREAMING = os.environ.get(STREAMING_ENV, '') not in ('', '0')
+    return STREAMING
+
+
+def set_streaming(enabled):
+    """
+    打开或关闭流式提取
+
+    参数:
+    - enabled: 为True时extract_item用extract_item_streaming提取
+    """
+    global STREAMING
+    STREAMING = bool(enabled)
+    return STREAMING
+
+
+def numeric_reference(number):
+    """
+    数字字符引用对应的字符，与BeautifulSoup的处理相同：
+    0、超出Unicode范围和代理项替换为U+FFFD，0x80-0x9F按Windows-1252解释，其余原样保留
+    """
+    if number == 0 or number > 0x10FFFF or 0xD800 <= number <= 0xDFFF:
+        return '�'
+    if 0x80 <= number <= 0x9F:
+        try:
+            return bytes([number]).decode('cp1252')
+        except UnicodeDecodeError:
+            pass
+    return chr(number)
+
+
+class OpenElement:
+    """
+    解析栈中一个尚未结束的元素
+
+    只有需要的元素才建立bs4的Tag（tag不为None），其余元素只记录名称，用来维持与完整解析相同的嵌套关系
+    """
+    __slots__ = ('name', 'tag', 'region', 'infobox', 'container')
+
+    def __init__(self, name, tag=None):
+        self.name = name
+        self.tag = tag
+        # 为True时tag是为了收集目标infobox之后的兄弟节点而建立的替身父元素
+        self.region = False
+        # 本元素是infobox-container时，它在所有infobox中的序号
+        self.infobox = None
+        # 本元素是联动容器时，它在等待队列中的记录
+        self.container = None
+
+
+class StreamingExtractor(HTMLParser):
+    """
+    不建立整个页面的文档树，在一次向前的解析中提取物品描述和联动
+
+    基于标准库HTMLParser的事件，按bs4 html.parser后端的规则维护一个只有标签名的元素栈
+    （空元素立即结束，结束标签弹出到最近的同名元素，只有空白的字符串合并为一个空格或换行），
+    只给以下部分建立bs4的Tag，其余内容解析后即丢弃:
+    - 每个infobox-container：结束时取标题与物品名比较，保留最后一个匹配的infobox
+    - 匹配的infobox之后的兄弟节点，直到下一个div
+    - 每个联动容器：结束后按文档顺序交给collect_synergies，处理完即释放
+
+    这些片段的结构与完整解析中的对应子树相同，所以描述和联动沿用extract_item_description和
+    extract_item_synergies的处理函数，结果一致。内存占用只与片段大小有关，与页面大小无关。
+
+    参数:
+    - item_name_en: 物品英文名称（通常是wiki_key）
+    - item_name_cn: 物品中文名称（可选）
+    """
+
+    def __init__(self, item_name_en, item_name_cn=None):
+        super().__init__(convert_charrefs=False)
+        self.item_name_en = item_name_en
+        self.matcher = TitleMatcher(item_name_en.lower().replace('_', ' ').replace('-', ' '), item_name_cn)
+        self.stack = [OpenElement(None)]
+        self.open_counts = Counter()
+        self.preserve_whitespace = 0
+        # 尚未结束的script/style等标签，其中的字符串用特殊的字符串类型
+        self.string_containers = []
+        self.current_data = []
+        # 最近建立的节点。新节点总是加在最内层的未结束元素中，它的前一个节点就是这个节点（与bs4建树时相同）
+        self.most_recent = None
+        # 已经结束的空元素，随后同名的结束标签被忽略（与bs4相同）
+        self.already_closed_empty_element = []
+
+        self.infobox_count = 0
+        # 最后一个匹配的infobox：(序号, Tag)
+        self.target = None
+        # 按开始顺序排列的联动容器记录[Tag, 是否已结束]，队首结束后才交出，保证与find_all的顺序相同
+        self.pending_containers = deque()
+        self.finished_containers = deque()
+        self.container_count = 0
+
+    # ---- 与bs4的BeautifulSoupHTMLParser相同的事件处理 ----
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs, handle_empty_element=False)
+        self.handle_endtag(tag, check_already_closed=False)
+
+    def handle_starttag(self, tag, attrs, handle_empty_element=True):
+        self.end_data()
+        attr_dict = {}
+        for key, value in attrs:
+            attr_dict[key] = '' if value is None else value
+        self.push(tag, attr_dict)
+        if handle_empty_element and tag in TREE_BUILDER.empty_element_tags:
+            self.handle_endtag(tag, check_already_closed=False)
+            self.already_closed_empty_element.append(tag)
+
+    def handle_endtag(self, tag, check_already_closed=True):
+        if check_already_closed and tag in self.already_closed_empty_element:
+            self.already_closed_empty_element.remove(tag)
+            return
+        self.end_data()
+        if not self.open_counts.get(tag):
+            return
+        while len(self.stack) > 1:
+            if self.pop().name == tag:
+                break
+
+    def handle_data(self, data):
+        self.current_data.append(data)
+
+    def handle_charref(self, name):
+        base, pattern = 10, _DECIMAL_REFERENCE
+        if name.startswith(('x', 'X')):
+            name, base, pattern = name[1:], 16, _HEX_REFERENCE
+        try:
+            self.handle_data(numeric_reference(int(name, base)))
+            return
+        except ValueError:
+            pass
+        match = pattern.search(name)
+        if match is None:
+            self.handle_data(name)
+        else:
+            self.handle_data(numeric_reference(int(match.group(1), base)))
+            self.handle_data(match.group(2))
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self.handle_data(character if character is not None else f'&{name}')
+
+    def handle_comment(self, data):
+        self.add_special_string(data, Comment)
+
+    def handle_decl(self, decl):
+        self.add_special_string(decl[len('DOCTYPE '):], Doctype)
+
+    def unknown_decl(self, data):
+        if data.upper().startswith('CDATA['):
+            self.add_special_string(data[len('CDATA['):], CData)
+        else:
+            self.add_special_string(data, Declaration)
+
+    def handle_pi(self, data):
+        self.add_special_string(data, ProcessingInstruction)
+
+    # ---- 元素栈 ----
+
+    def add_special_string(self, data, container_class):
+        self.end_data()
+        self.current_data.append(data)
+        self.end_data(container_class)
+
+    def end_data(self, container_class=None):
+        """与BeautifulSoup.endData相同：把累积的文本作为一个字符串加入当前元素（当前元素没有建立Tag时丢弃）"""
+        if not self.current_data:
+            return
+        data = ''.join(self.current_data)
+        self.current_data = []
+        parent = self.stack[-1].tag
+        if parent is None:
+            return
+        if not self.preserve_whitespace and not data.strip(BeautifulSoup.ASCII_SPACES):
+            data = '\n' if '\n' in data else ' '
+        if container_class is None:
+            container_class = NavigableString
+            if self.string_containers:
+                container_class = TREE_BUILDER.string_containers[self.string_containers[-1]]
+        self.attach(container_class(data), parent)
+
+    def attach(self, node, parent):
+        """
+        把新节点加为parent的最后一个子节点
+
+        parent是最内层的未结束元素，此前建立的节点都在它的子树中，所以只需要像bs4建树时那样
+        接在最近建立的节点后面，不需要Tag.append在任意位置插入时的链接修正
+        """
+        node.setup(parent, self.most_recent)
+        parent.contents.append(node)
+        self.most_recent = node
+
+    def push(self, name, attrs):
+        parent = self.stack[-1]
+        if parent.region and name == 'div':
+            # 目标infobox之后遇到了div，描述到此为止，后面的兄弟节点不再收集
+            parent.tag = None
+            parent.region = False
+
+        classes = attrs.get('class', '').split() if 'class' in attrs else ()
+        is_infobox = name == 'div' and 'infobox-container' in classes
+        is_container = name == 'div' and 'synergy-container' in classes
+
+        element = OpenElement(name)
+        if parent.tag is not None:
+            element.tag = Tag(None, TREE_BUILDER, name, attrs=attrs)
+            self.attach(element.tag, parent.tag)
+        elif is_infobox or is_container:
+            # 新片段的根节点，不与之前的片段相连，处理完的片段可以被释放
+            element.tag = Tag(None, TREE_BUILDER, name, attrs=attrs)
+            self.most_recent = element.tag
+        if is_infobox:
+            element.infobox = self.infobox_count
+            self.infobox_count += 1
+        if is_container:
+            element.container = [element.tag, False]
+            self.pending_containers.append(element.container)
+
+        self.stack.append(element)
+        self.open_counts[name] += 1
+        if name in TREE_BUILDER.preserve_whitespace_tags:
+            self.preserve_whitespace += 1
+        if name in TREE_BUILDER.string_containers:
+            self.string_containers.append(name)
+
+    def pop(self):
+        element = self.stack.pop()
+        self.open_counts[element.name] -= 1
+        if element.name in TREE_BUILDER.preserve_whitespace_tags:
+            self.preserve_whitespace -= 1
+        if element.name in TREE_BUILDER.string_containers:
+            self.string_containers.pop()
+        if element.infobox is not None:
+            self.infobox_closed(element)
+        if element.container is not None:
+            element.container[1] = True
+            while self.pending_containers and self.pending_containers[0][1]:
+                self.finished_containers.append(self.pending_containers.popleft()[0])
+        return element
+
+    def infobox_closed(self, element):
+        """infobox结束：标题匹配时成为新的目标，开始收集它后面的兄弟节点"""
+        title = infobox_title(element.tag)
+        if not title or not self.matcher.match(InfoboxTitle(element.tag, title))[0]:
+            return
+        # 嵌套的infobox后结束但先开始，按开始顺序比较才与倒序遍历find_all的结果一致
+        if self.target is not None and self.target[0] > element.infobox:
+            return
+        self.target = (element.infobox, element.tag)
+        parent = self.stack[-1]
+        if parent.tag is None:
+            # 父元素没有建立Tag：建一个替身，让infobox和它后面的兄弟节点挂在一起
+            parent.tag = Tag(None, TREE_BUILDER, parent.name or 'div')
+            parent.tag.append(element.tag)
+            parent.region = True
+
+    # ---- 对外接口 ----
+
+    def iter_synergy_containers(self, html_content, chunk_size=CHUNK_SIZE):
+        """
+        分块解析整个页面，按文档顺序依次给出结束的联动容器
+
+        参数:
+        - html_content: 页面HTML内容
+        - chunk_size: 每次交给HTMLParser的字符数
+        """
+        for start in range(0, len(html_content), chunk_size):
+            self.feed(html_content[start:start + chunk_size])
+            while self.finished_containers:
+                yield self.finished_containers.popleft()
+        self.close()
+        # 与BeautifulSoup相同：文档结束时关闭所有未结束的元素
+        self.end_data()
+        while len(self.stack) > 1:
+            self.pop()
+        while self.finished_containers:
+            yield self.finished_containers.popleft()
+
+    def description(self):
+        """页面解析完之后，目标infobox之后的描述"""
+        if self.target is None:
+            print(f"未能找到物品 '{self.item_name_en}' 的infobox")
+            return ""
+        return describe_siblings(self.target[1].next_siblings, self.item_name_en)
+
+
+def extract_item_streaming(html_content, item_name_en, item_name_cn=None):
+    """
+    用流式提取器提取物品描述和联动，结果与extract_item_description、extract_item_synergies相同
+
+    参数:
+    - html_content: 页面HTML内容
+    - item_name_en: 物品英文名称
+    - item_name_cn: 物品中文名称（可选）
+
+    返回:
+    - (description, synergies)
+    """
+    extractor = StreamingExtractor(item_name_en, item_name_cn)
+    synergies = collect_synergies(extractor.iter_synergy_containers(html_content))
+    return extractor.description(), synergies
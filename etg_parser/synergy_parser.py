@@ -1,25 +1,37 @@
 
-import re
-
-from bs4 import BeautifulSoup
+from .content_walker import ContentView
+from .parsed_page import parse_page
+from .text_normalizer import SYNERGY_CLEANUP
 
 def extract_item_synergies(html_content):
     """
     从HTML内容中提取物品的联动信息
     
     参数:
-    - html_content: 页面HTML内容
+    - html_content: 页面HTML内容，或已经解析过的ParsedPage（与其他提取函数共用一次解析）
     - item_key: 物品key
     
     返回:
     - 联动信息列表，每项包含 name(联动名称) 和 description(联动描述)
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
-    synergies = []
+    soup = parse_page(html_content).soup
     
     # 查找所有联动容器
     synergy_containers = soup.find_all('div', class_='synergy-container')
     print(f"找到 {len(synergy_containers)} 个联动容器")
+    return collect_synergies(synergy_containers)
+
+def collect_synergies(synergy_containers):
+    """
+    从联动容器中提取联动信息
+    
+    参数:
+    - synergy_containers: 联动容器（div.synergy-container），按文档顺序；可以是边解析边给出容器的生成器
+    
+    返回:
+    - 联动信息列表，每项包含 name(联动名称) 和 description(联动描述)
+    """
+    synergies = []
     
     # 首先查找传统格式的联动容器
     for i, container in enumerate(synergy_containers, 1):
@@ -68,9 +80,23 @@ def extract_item_synergies(html_content):
             print(f"处理联动 {i} 时出错: {e}")
     return synergies
 
+def synergy_image_placeholder(img):
+    """
+    联动描述中图片的占位符：有alt时为{item:key}，否则返回None
+    """
+    # 获取alt属性，通常包含物品名称
+    img_alt = img.get('alt', '')
+    if not img_alt:
+        return None
+    # 提取alt中的物品名称，通常是文件名（如 AKEY-47.png）
+    item_name = img_alt.replace('.png', '').strip()
+    # 标准化物品名称为key格式
+    normalized_key = item_name.lower().replace(' ', '_').replace('-', '')
+    return f"{{item:{normalized_key}}}"
+
 def process_synergy_content(element):
     """
-    处理联动内容，替换图片为占位符
+    处理联动内容，替换图片为占位符（有alt的图片，如果在链接内则替换整个链接）
     
     参数:
     - element: BeautifulSoup元素
@@ -81,42 +107,11 @@ def process_synergy_content(element):
     if not element:
         return ""
     
-    # 创建元素的副本以避免修改原始元素
-    element_copy = BeautifulSoup(str(element), 'html.parser')
-    
-    # 处理图片，将其替换为{item:key}格式
-    for img in element_copy.find_all('img'):
-        # 获取alt属性，通常包含物品名称
-        img_alt = img.get('alt', '')
-        
-        if img_alt:
-            # 提取alt中的物品名称，通常是文件名（如 AKEY-47.png）
-            item_name = img_alt.replace('.png', '').strip()
-            
-            # 标准化物品名称为key格式
-            normalized_key = item_name.lower().replace(' ', '_').replace('-', '')
-            
-            # 替换图片为占位符
-            placeholder = f"{{item:{normalized_key}}}"
-            
-            # 如果图片在链接内，替换整个链接
-            parent = img.parent
-            if parent and parent.name == 'a':
-                parent.replace_with(placeholder)
-            else:
-                img.replace_with(placeholder)
-    
-    # 处理<br>标签，替换为换行符
-    for br in element_copy.find_all('br'):
-        br.replace_with('\n')
-    
-    # 处理<hr>标签，移除
-    for hr in element_copy.find_all('hr'):
-        hr.decompose()
+    # 直接遍历原始节点，不复制元素：图片替换为占位符，<br>替换为换行符，<hr>去掉
+    view = ContentView(synergy_image_placeholder, drop_tags=('hr',), replace_tags={'br': '\n'})
     
     # 获取处理后的文本，清理空行和多余空格
-    text = element_copy.get_text()
-    text = re.sub(r'\n\s*\n', '\n', text)
-    text = re.sub(r'^\s+|\s+$', '', text, flags=re.MULTILINE)
+    text = view.document_text(element)
+    text = SYNERGY_CLEANUP.sub(text)
     
     return text
@@ -0,0 +1,142 @@
+import re
+
+# 原来逐条执行的格式规则：(正则, 替换, flags)，按顺序对整段文本各执行一次re.sub
+# 保留下来作为合并规则的参照，test/test_text_normalizer.py和utils/benchmark_normalizer.py用它们校验和计时
+
+# process_content在追加列表之前对正文执行的规则
+DESCRIPTION_SPACING_STEPS = [
+    (r'\n\s*\n+', '\n', 0),               # 替换连续的换行符为单个换行符
+    (r'([：:])(?!\s)', r'\1 ', 0),        # 在冒号后添加空格
+    (r'(\d)([级])(?!\s)', r'\1 \2', 0),   # 在数字和文字之间添加空格
+    (r'([。])(?!\s|$)', r'\1 ', 0),       # 在句号后添加空格
+]
+
+# process_content追加列表之后的最后清理
+DESCRIPTION_CLEANUP_STEPS = [
+    (r' +', ' ', 0),                                # 移除多余的空格
+    (r'([。！？])\s*([^\s])', r'\1 \2', 0),         # 确保句子之间有适当的空格
+    (r'^\s+|\s+$', '', re.MULTILINE),               # 移除行首行尾的空白字符
+]
+
+# process_synergy_content清理空行和多余空格
+SYNERGY_CLEANUP_STEPS = [
+    (r'\n\s*\n', '\n', 0),
+    (r'^\s+|\s+$', '', re.MULTILINE),
+]
+
+
+def apply_steps(text, steps):
+    """
+    按顺序逐条执行re.sub（原来的做法）
+
+    参数:
+    - text: 要处理的文本
+    - steps: [(正则, 替换, flags)]
+
+    返回:
+    - 处理后的文本
+    """
+    for pattern, replacement, flags in steps:
+        text = re.sub(pattern, replacement, text, flags=flags)
+    return text
+
+
+class TextNormalizer:
+    """
+    把多条替换规则合并成一个预编译的正则，一次从左到右的扫描完成全部替换
+
+    每条规则是(正则, 替换)，替换可以是re.sub模板（\\1、\\g<1>引用规则自己的分组）或常量字符串。
+    合并后各规则成为同一个正则的分支，在同一位置按列出的顺序尝试，所以只有规则之间互不影响时
+    （一条规则的替换结果不会改变另一条规则能否匹配）才与逐条执行re.sub的结果相同。
+
+    合并后的正则在每个位置都要依次尝试所有分支，比单条正则慢；给出starts_with时先用前向断言
+    检查当前字符，不可能开始匹配的位置只花一次字符类判断。
+
+    参数:
+    - rules: [(正则, 替换)]
+    - starts_with: 可选，所有规则的匹配可能开头的字符组成的字符类，例如r'\s'
+    """
+
+    def __init__(self, rules, starts_with=None):
+        branches = []
+        replacements = {}
+        group = 0
+        for pattern, replacement in rules:
+            group += 1
+            branches.append(f'({pattern})')
+            replacements[group] = compile_replacement(replacement, group)
+            group += re.compile(pattern).groups
+        pattern = '|'.join(branches)
+        if starts_with:
+            pattern = f'(?={starts_with})(?:{pattern})'
+        self.pattern = re.compile(pattern)
+        # 每个规则外层包着一个分组，它最后闭合，所以lastindex就是匹配到的规则的外层分组
+        self._replace = lambda m: replacements[m.lastindex](m)
+
+    def sub(self, text):
+        """
+        对文本执行全部规则
+
+        参数:
+        - text: 要处理的文本
+
+        返回:
+        - 处理后的文本
+        """
+        return self.pattern.sub(self._replace, text)
+
+
+def compile_replacement(template, offset=0):
+    """
+    把re.sub的替换模板转换为函数，避免每次匹配都用m.expand重新解析模板
+
+    参数:
+    - template: 替换模板，支持\\N、\\g<N>分组引用和\\n换行
+    - offset: 分组编号整体后移的数量（规则合并后其外层分组的编号）
+
+    返回:
+    - 函数，参数为匹配对象，返回替换后的字符串；没有参与匹配的分组替换为空字符串
+    """
+    parts = []
+    for literal, number, named_number, escape in re.findall(r'([^\\]+)|\\(\d+)|\\g<(\d+)>|\\(.)', template):
+        if literal:
+            parts.append(literal)
+        elif number or named_number:
+            parts.append(offset + int(number or named_number))
+        else:
+            parts.append({'n': '\n', 't': '\t', '\\': '\\'}[escape])
+    if all(isinstance(part, str) for part in parts):
+        constant = ''.join(parts)
+        return lambda m: constant
+    return lambda m: ''.join(part if isinstance(part, str) else (m.group(part) or '') for part in parts)
+
+
+# 含换行符、但不只是一个换行符的一段空白（从空白开头匹配时贪婪地取到空白结尾）
+WHITESPACE_AROUND_NEWLINE = r'[^\S\n]+\n\s*|\n\s+'
+
+# DESCRIPTION_SPACING_STEPS的四条规则分别从换行符、冒号、数字和句号开始匹配，互不重叠；
+# 第一条只把空白换成空白，不会改变后三条向后看到的“是否为空白”，所以原样合并
+DESCRIPTION_SPACING = TextNormalizer([
+    (pattern, replacement) for pattern, replacement, _ in DESCRIPTION_SPACING_STEPS
+], starts_with=r'[\n：:\d。]')
+
+# DESCRIPTION_CLEANUP_STEPS的三条规则会相互影响，这里按它们逐条执行的最终效果改写:
+# - 句末标点与其后第一个非空白字符之间只留一个空格（被用作\2的标点不再开始新的匹配）
+# - 开头和结尾的空白全部去掉
+# - 中间含换行的空白：最后一个换行符前面紧挨着换行符时整段去掉，否则只剩一个换行符
+#   （^\s+|\s+$逐条执行时恰好如此）
+# - 中间不含换行的空白：连续的空格合并为一个
+# 已经是单个换行符或单个空格的空白不用替换，规则不去匹配它们，省掉大部分替换函数的调用
+DESCRIPTION_CLEANUP = TextNormalizer([
+    (r'([。！？])\s*([^\s])', r'\1 \2'),
+    (r'\A\s+|\s+\Z', ''),
+    (r'\s*\n\n[^\S\n]*(?!\s)', ''),
+    (WHITESPACE_AROUND_NEWLINE, '\n'),
+    (r' {2,}', ' '),
+], starts_with=r'[。！？\s]')
+
+# SYNERGY_CLEANUP_STEPS逐条执行的效果：开头和结尾的空白去掉，中间含换行的空白只剩一个换行符
+SYNERGY_CLEANUP = TextNormalizer([
+    (r'\A\s+|\s+\Z', ''),
+    (WHITESPACE_AROUND_NEWLINE, '\n'),
+], starts_with=r'\s')
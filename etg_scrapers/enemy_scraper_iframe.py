@@ -5,52 +5,85 @@ import os
 import sys
 import json
 import time
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
+from concurrent.futures import ThreadPoolExecutor
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
 
 # 添加父目录到系统路径，以便导入etg_parser模块
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-def setup_driver():
+from etg_parser.driver_pool import configure_driver_pool, get_driver_pool
+from etg_parser.retry import FetchError, get_retry_engine
+
+# 要抓取的目标：类型 -> (iframe URL, 类型名称)
+TARGETS = {
+    'enemy': ("https://etgwikisearch.xd.cn/enemy", "敌人"),
+    'boss': ("https://etgwikisearch.xd.cn/boss", "Boss"),
+}
+
+# 项目块数量保持不变多久才认为页面渲染完成（秒）
+DOM_QUIET_PERIOD = 1.0
+DOM_POLL_INTERVAL = 0.25
+# 项目块最晚多久出现（秒）；JavaScript渲染较慢时列表可能在几秒后才出现，超过这个时间仍然没有才认为页面出错
+DOM_FIRST_RENDER_TIMEOUT = 5.0
+
+class dom_stable:
     """
-    设置并返回Selenium WebDriver
+    WebDriverWait的等待条件：匹配元素出现且数量在quiet_period内不再变化
     
-    返回:
-    - WebDriver实例
+    从第一次检查起过了first_render_timeout仍然没有匹配元素时，说明页面没有渲染出列表，
+    直接抛出FetchError('empty')，不再等到WebDriverWait超时，由重试引擎按'empty'策略处理
+    
+    参数:
+    - locator: (By, 选择器) 元组
+    - quiet_period: 数量保持不变的时间（秒）
+    - first_render_timeout: 等待匹配元素第一次出现的时间（秒）
+    - clock: 返回当前时间（秒）的函数，测试时可以替换
     """
-    # 设置Chrome选项
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")  # 无头模式
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    
-    # 设置WebDriver
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=chrome_options)
-    
-    return driver
+    
+    def __init__(self, locator, quiet_period=DOM_QUIET_PERIOD, first_render_timeout=DOM_FIRST_RENDER_TIMEOUT,
+                 clock=time.monotonic):
+        self.locator = locator
+        self.quiet_period = quiet_period
+        self.first_render_timeout = first_render_timeout
+        self.clock = clock
+        self.started = None
+        self.last_count = -1
+        self.stable_since = None
+    
+    def __call__(self, driver):
+        count = len(driver.find_elements(*self.locator))
+        now = self.clock()
+        if self.started is None:
+            self.started = now
+        if count != self.last_count:
+            self.last_count = count
+            self.stable_since = now
+            return False
+        if count == 0:
+            if now - self.started < self.first_render_timeout:
+                return False
+            raise FetchError('empty', f"{self.first_render_timeout:g} 秒内没有出现 {self.locator[1]}")
+        return now - self.stable_since >= self.quiet_period
 
-def get_iframe_content(url):
+def load_iframe(url, pool=None):
     """
-    直接访问iframe的URL获取内容
+    用会话池中的浏览器加载iframe页面，出错时抛出异常
     
     参数:
     - url: iframe的URL
+    - pool: 使用的WebDriver会话池，默认使用共享池
     
     返回:
     - iframe的HTML内容
     """
-    try:
-        # 设置WebDriver
-        driver = setup_driver()
-        
+    if pool is None:
+        pool = get_driver_pool()
+    
+    # 从会话池借用WebDriver
+    with pool.driver() as driver:
         # 获取iframe内容
         print(f"正在获取iframe内容: {url}")
         driver.get(url)
@@ -60,11 +93,27 @@ def get_iframe_content(url):
             EC.presence_of_element_located((By.TAG_NAME, "body"))
         )
         
-        # 给页面一些额外的时间来加载JavaScript内容
-        time.sleep(3)
+        # 等JavaScript渲染的项目块数量稳定下来，代替固定等待
+        WebDriverWait(driver, 20, poll_frequency=DOM_POLL_INTERVAL).until(
+            dom_stable((By.CSS_SELECTOR, "div.item-block"), first_render_timeout=DOM_FIRST_RENDER_TIMEOUT)
+        )
         
         # 获取页面源代码
-        iframe_content = driver.page_source
+        return driver.page_source
+
+def get_iframe_content(url, pool=None):
+    """
+    直接访问iframe的URL获取内容，失败时由共享的重试引擎退避重试
+    
+    参数:
+    - url: iframe的URL
+    - pool: 使用的WebDriver会话池，默认使用共享池
+    
+    返回:
+    - iframe的HTML内容
+    """
+    try:
+        iframe_content = get_retry_engine().call(load_iframe, url, pool, description=f"获取iframe {url} ")
         
         # 保存iframe源码供进一步分析
         filename = url.split('/')[-1] + '_source.html'
@@ -72,15 +121,10 @@ def get_iframe_content(url):
             f.write(iframe_content)
         print(f"iframe源码已保存到 {filename}，长度: {len(iframe_content)}")
         
-        # 关闭WebDriver
-        driver.quit()
-        
         return iframe_content
         
     except Exception as e:
         print(f"获取iframe内容时出错: {e}")
-        if 'driver' in locals():
-            driver.quit()
         return None
 
 def extract_mapping(html_content, type_name="敌人"):
@@ -142,49 +186,48 @@ def extract_mapping(html_content, type_name="敌人"):
 
 def main():
     """主函数"""
+    global DOM_FIRST_RENDER_TIMEOUT
     import argparse
     
     # 创建命令行参数解析器
     parser = argparse.ArgumentParser(description='获取敌人和Boss映射')
     parser.add_argument('--type', '-t', type=str, choices=['enemy', 'boss', 'all'], default='all',
                         help='要获取的映射类型: enemy(敌人), boss(Boss), all(全部) (默认: all)')
+    parser.add_argument('--parallel', action='store_true',
+                        help='同时获取敌人和Boss页面（使用两个浏览器会话）')
+    parser.add_argument('--first-render-timeout', type=float, default=DOM_FIRST_RENDER_TIMEOUT,
+                        help=f'等待项目块第一次出现的秒数，超过后按页面为空重试 (默认: {DOM_FIRST_RENDER_TIMEOUT:g})')
     
     # 解析命令行参数
     args = parser.parse_args()
+    DOM_FIRST_RENDER_TIMEOUT = args.first_render_timeout
     
-    # 创建总映射字典
-    mapping = {}
+    targets = ['enemy', 'boss'] if args.type == 'all' else [args.type]
     
-    # 根据类型获取映射
-    if args.type in ['enemy', 'all']:
-        print("开始获取敌人映射...")
-        enemy_iframe_url = "https://etgwikisearch.xd.cn/enemy"
-        enemy_content = get_iframe_content(enemy_iframe_url)
-        
-        if enemy_content:
-            # 提取敌人映射
-            enemy_mapping = extract_mapping(enemy_content, "敌人")
-            
-            # 添加到总映射
-            mapping.update(enemy_mapping)
-            print(f"\n提取了 {len(enemy_mapping)} 个敌人映射")
-        else:
-            print("未能获取敌人iframe内容")
+    # 所有目标共用一个会话池；默认只有一个浏览器，并行时每个目标一个
+    pool = configure_driver_pool(size=len(targets) if args.parallel else 1)
     
-    if args.type in ['boss', 'all']:
-        print("\n开始获取Boss映射...")
-        boss_iframe_url = "https://etgwikisearch.xd.cn/boss"
-        boss_content = get_iframe_content(boss_iframe_url)
-        
-        if boss_content:
-            # 提取Boss映射
-            boss_mapping = extract_mapping(boss_content, "Boss")
+    print(f"开始获取{'、'.join(TARGETS[t][1] for t in targets)}页面...")
+    urls = [TARGETS[t][0] for t in targets]
+    if args.parallel and len(urls) > 1:
+        with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+            contents = list(executor.map(lambda url: get_iframe_content(url, pool), urls))
+    else:
+        contents = [get_iframe_content(url, pool) for url in urls]
+    
+    # 创建总映射字典，按敌人、Boss的顺序合并
+    mapping = {}
+    for target, content in zip(targets, contents):
+        type_name = TARGETS[target][1]
+        if content:
+            # 提取映射
+            target_mapping = extract_mapping(content, type_name)
             
             # 添加到总映射
-            mapping.update(boss_mapping)
-            print(f"\n提取了 {len(boss_mapping)} 个Boss映射")
+            mapping.update(target_mapping)
+            print(f"\n提取了 {len(target_mapping)} 个{type_name}映射")
         else:
-            print("未能获取Boss iframe内容")
+            print(f"未能获取{type_name}iframe内容")
     
     # 保存总映射
     if mapping:
@@ -193,6 +236,10 @@ def main():
         print(f"\n总共提取了 {len(mapping)} 个映射，已保存到 enemy_mapping.json")
     else:
         print("\n未能提取任何映射")
+    
+    # 输出会话池统计
+    if pool.boots:
+        print("\n" + pool.report())
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -8,8 +8,20 @@ import re
 import time
 import random
 import logging
+import argparse
+import multiprocessing
+from collections import deque
 from tqdm import tqdm
-from etg_parser import extract_item_description, extract_item_synergies, get_page_content_selenium
+from etg_parser import get_page_content_selenium
+from etg_parser import PARSER_BACKENDS, extraction_mode, set_parser_backend, set_partial_parse, set_streaming
+from etg_parser import get_parser_backend, get_partial_parse, get_streaming
+from etg_parser import configure_driver_pool, get_driver_pool, close_driver_pool
+from etg_parser.fetch_backends import FETCH_BACKENDS, DEFAULT_FETCH_BACKEND, HttpBackend, create_fetch_backend
+from etg_parser.crawler import AsyncCrawler, DEFAULT_REQUESTS_PER_SECOND
+from etg_parser.retry import AIMDLimiter, configure_retry_engine, get_retry_engine
+from etg_parser.extraction_cache import EXTRACTION_CACHE_FILE, ExtractionCache, extract_item, extraction_key
+from etg_cache import (CACHE_BACKENDS, DEFAULT_CACHE_BACKEND, EVICTION_POLICIES, PAGE_VALID, CacheIndex, CachePolicy,
+                       ManagedCache, create_page_cache, revalidate_cache)
 import csv
 
 # 配置日志
@@ -25,11 +37,40 @@ logging.basicConfig(
 # 设置常量
 SAMPLE_FILE = 'itemtips-sample.tip'
 OUTPUT_FILE = 'itemtips-cn.tip'
+# 逐物品处理结果的追加日志，用于中断后续跑
+JOURNAL_FILE = 'itemtips_journal.jsonl'
+JOURNAL_FLUSH_EVERY = 20
 CACHE_DIR = 'cache'
 WIKI_BASE_URL = 'https://etg-xd.wikidot.com/'
 MAX_RETRIES = 3
 DELAY_MIN = 1
 DELAY_MAX = 3
+# WebDriver会话池配置：同时存在的浏览器数，以及每个浏览器处理多少页面后回收
+DRIVER_POOL_SIZE = 1
+DRIVER_MAX_PAGES = 100
+
+# 估算下载时间用的单页平均耗时（秒）
+ESTIMATED_SECONDS_PER_PAGE = 2.0
+
+# 当前使用的页面获取后端，首次获取页面时按DEFAULT_FETCH_BACKEND创建
+FETCH_BACKEND = None
+
+# 新下载的页面是否只保存#page-content子树（--trim-pages）
+TRIM_PAGES = False
+
+# 当前使用的页面缓存后端，首次读取缓存时按DEFAULT_CACHE_BACKEND创建
+PAGE_CACHE = None
+# 页面缓存的索引，首次查询时扫描一次缓存建立，所有调用方共用
+CACHE_INDEX = None
+# 物品描述和联动的提取结果缓存，为None时每次都重新解析页面（--no-extraction-cache）
+EXTRACTION_CACHE = None
+
+# 多进程处理物品（--jobs）时，工作进程中的只读参照表，由init_item_worker在进程启动时设置一次
+WORKER_CONTEXT = None
+# 工作进程中暂存要追加到记录文件的行，由主进程按物品顺序写入；为None时直接写文件
+REPORT_LINES = None
+# 多进程处理时每个工作进程最多排队的物品数，限制同时在途的页面内容
+ITEMS_IN_FLIGHT_PER_JOB = 4
 
 # 确保缓存目录存在
 if not os.path.exists(CACHE_DIR):
@@ -48,6 +89,77 @@ def normalize_key_for_url(key, key_to_wikikey=None):
     # 没有映射直接返回原始key
     return key
 
+def get_fetch_backend():
+    """
+    获取当前的页面获取后端，没有时创建默认后端
+    """
+    global FETCH_BACKEND
+    if FETCH_BACKEND is None:
+        FETCH_BACKEND = create_fetch_backend(DEFAULT_FETCH_BACKEND)
+    return FETCH_BACKEND
+
+def set_fetch_backend(name):
+    """
+    按名称切换页面获取后端
+    
+    参数:
+    - name: 后端名称，见etg_parser.fetch_backends.FETCH_BACKENDS
+    """
+    global FETCH_BACKEND
+    if FETCH_BACKEND is not None:
+        FETCH_BACKEND.close()
+    FETCH_BACKEND = create_fetch_backend(name)
+    logging.info(f"使用页面获取后端: {name}")
+    return FETCH_BACKEND
+
+def get_page_cache():
+    """
+    获取当前的页面缓存后端，没有时创建默认的目录缓存
+    """
+    global PAGE_CACHE
+    if PAGE_CACHE is None:
+        PAGE_CACHE = ManagedCache(create_page_cache(DEFAULT_CACHE_BACKEND, CACHE_DIR))
+    return PAGE_CACHE
+
+def set_page_cache(name, path=None, policy=None):
+    """
+    按名称切换页面缓存后端
+    
+    参数:
+    - name: 后端名称，见etg_cache.CACHE_BACKENDS
+    - path: 缓存路径，目录缓存默认为CACHE_DIR，其他后端使用各自的默认路径
+    - policy: 容量和过期策略（CachePolicy），默认不限容量、不过期，只在清单中记录访问
+    """
+    global PAGE_CACHE, CACHE_INDEX
+    if PAGE_CACHE is not None:
+        PAGE_CACHE.close()
+    CACHE_INDEX = None
+    if path is None and name == 'dir':
+        path = CACHE_DIR
+    PAGE_CACHE = ManagedCache(create_page_cache(name, path), policy)
+    logging.info(f"使用页面缓存: {PAGE_CACHE.describe()}，{PAGE_CACHE.policy.describe()}")
+    return PAGE_CACHE
+
+def get_cache_index():
+    """
+    获取当前页面缓存的索引，没有时扫描一次缓存建立
+    """
+    global CACHE_INDEX
+    if CACHE_INDEX is None:
+        CACHE_INDEX = CacheIndex(get_page_cache())
+        logging.info(f"建立缓存索引: {len(CACHE_INDEX)} 个页面，用时 {CACHE_INDEX.build_time:.3f} 秒")
+    return CACHE_INDEX
+
+def set_extraction_cache(path=EXTRACTION_CACHE_FILE):
+    """
+    打开提取结果缓存，path为None时关闭，之后每次都重新解析页面
+    """
+    global EXTRACTION_CACHE
+    EXTRACTION_CACHE = ExtractionCache(path) if path else None
+    if EXTRACTION_CACHE is not None:
+        logging.info(f"使用提取结果缓存: {path}，已有 {len(EXTRACTION_CACHE.entries)} 条结果")
+    return EXTRACTION_CACHE
+
 def load_itemtips_sample():
     """
     加载itemtips-sample.tip文件，创建各种映射
@@ -96,71 +208,221 @@ def load_key_to_wikikey_mapping(csv_path='invalid_pages.csv'):
                 mapping[key] = wikikey
     return mapping
 
-def get_page_content(key, key_to_wikikey=None, retry=0):
+def save_page_to_cache(wiki_key, html_content, page=None):
+    """
+    把页面内容写入缓存文件，同时记录元数据（获取时间、内容哈希、ETag等）
+    
+    参数:
+    - wiki_key: 页面的wiki_key，用作缓存文件名
+    - html_content: 页面HTML内容
+    - page: 获取页面时的PageResponse（可选）
+    
+    返回:
+    - 实际写入缓存的页面内容（启用TRIM_PAGES时为裁剪后的内容）
+    """
+    cache = get_page_cache()
+    if cache.read_only:
+        logging.warning(f"缓存 {cache.describe()} 是只读的，页面 {wiki_key} 不会被保存")
+        return html_content
+    metadata = cache.save(wiki_key, html_content, page, trim=TRIM_PAGES)
+    get_cache_index().add(wiki_key)
+    if metadata.get('trimmed'):
+        logging.debug(f"页面 {wiki_key} 已裁剪: {metadata['size']} -> {metadata['stored_size']} 字节")
+        return cache.get(wiki_key)
+    return html_content
+
+class FetchPlan:
+    """
+    处理前计算出的页面获取计划
+    
+    - item_wiki_keys: 物品key到最终wiki_key的映射
+    - items_by_wiki_key: wiki_key到使用它的物品key列表的映射
+    - fetch_keys: 去重后需要下载的wiki_key（保持物品顺序）
+    - cached_keys: 已有缓存的wiki_key
+    """
+    
+    def __init__(self):
+        self.item_wiki_keys = {}
+        self.items_by_wiki_key = {}
+        self.fetch_keys = []
+        self.cached_keys = []
+    
+    @property
+    def shared_wiki_keys(self):
+        """被多个物品共用的wiki_key"""
+        return {wiki_key: keys for wiki_key, keys in self.items_by_wiki_key.items() if len(keys) > 1}
+    
+    def estimate_seconds(self, max_concurrency=1, requests_per_second=DEFAULT_REQUESTS_PER_SECOND):
+        """
+        估算下载fetch_keys所需的时间
+        
+        受限于两者中较慢的一个：令牌桶速率，或并发数下的单页耗时
+        """
+        count = len(self.fetch_keys)
+        by_rate = count / requests_per_second if requests_per_second > 0 else 0
+        by_latency = count * ESTIMATED_SECONDS_PER_PAGE / max(1, max_concurrency)
+        return max(by_rate, by_latency)
+    
+    def summary(self, max_concurrency=1, requests_per_second=DEFAULT_REQUESTS_PER_SECOND):
+        """
+        生成计划摘要文本
+        """
+        shared = self.shared_wiki_keys
+        duplicate_items = sum(len(keys) - 1 for keys in shared.values())
+        lines = [
+            "页面获取计划:",
+            f"物品数: {len(self.item_wiki_keys)}，不同wiki_key: {len(self.items_by_wiki_key)} (共用同一页面而省去的查找: {duplicate_items})",
+            f"已缓存: {len(self.cached_keys)}，需要下载: {len(self.fetch_keys)}",
+        ]
+        if self.fetch_keys:
+            estimate = self.estimate_seconds(max_concurrency, requests_per_second)
+            lines.append(f"预计下载用时: {estimate:.0f} 秒 (并发 {max_concurrency}，限速 {requests_per_second}/秒)")
+        return "\n".join(lines)
+    
+    def details(self):
+        """
+        列出每个待下载页面及对应的物品
+        """
+        lines = []
+        for wiki_key in self.fetch_keys:
+            lines.append(f"  {WIKI_BASE_URL}{wiki_key} <- {', '.join(self.items_by_wiki_key[wiki_key])}")
+        for wiki_key, keys in self.shared_wiki_keys.items():
+            lines.append(f"  共用页面 {wiki_key}: {', '.join(keys)}")
+        return "\n".join(lines)
+
+def build_fetch_plan(sample_data, key_to_wikikey=None):
+    """
+    把所有物品解析到最终的wiki_key，用缓存索引判断是否已缓存，得到去重后的下载列表
+    
+    参数:
+    - sample_data: 原始sample数据
+    - key_to_wikikey: key到wikiKey的映射字典
+    
+    返回:
+    - FetchPlan
+    """
+    cached = get_cache_index()
+    plan = FetchPlan()
+    for key in sample_data['items'].keys():
+        wiki_key = normalize_key_for_url(key, key_to_wikikey)
+        plan.item_wiki_keys[key] = wiki_key
+        if wiki_key in plan.items_by_wiki_key:
+            plan.items_by_wiki_key[wiki_key].append(key)
+            continue
+        plan.items_by_wiki_key[wiki_key] = [key]
+        if wiki_key in cached:
+            plan.cached_keys.append(wiki_key)
+        else:
+            plan.fetch_keys.append(wiki_key)
+    return plan
+
+def prefetch_pages(wiki_keys, max_concurrency, requests_per_second=DEFAULT_REQUESTS_PER_SECOND):
+    """
+    并发获取一批页面并写入缓存，用令牌桶代替固定延迟控制请求速率
+    
+    参数:
+    - wiki_keys: 需要获取的wiki_key列表
+    - max_concurrency: 最大同时在途请求数
+    - requests_per_second: 每个host每秒允许的请求数
+    
+    返回:
+    - AsyncCrawler实例（包含统计信息）
+    """
+    def on_result(wiki_key, page):
+        if page is not None and page.html:
+            save_page_to_cache(wiki_key, page.html, page)
+        else:
+            logging.error(f"并发获取页面 {WIKI_BASE_URL}{wiki_key} 失败")
+    
+    logging.info(f"并发获取 {len(wiki_keys)} 个未缓存页面，最大并发 {max_concurrency}，限速 {requests_per_second}/秒")
+    crawler = AsyncCrawler(get_fetch_backend(), max_concurrency=max_concurrency,
+                           requests_per_second=requests_per_second, retry_engine=get_retry_engine())
+    crawler.run(wiki_keys, on_result)
+    logging.info(crawler.report())
+    return crawler
+
+def fetch_page(wiki_key):
+    """
+    通过页面获取后端下载页面，失败时由共享的重试引擎退避重试
+    
+    参数:
+    - wiki_key: 页面的wiki_key
+    
+    返回:
+    - PageResponse，超过重试次数时返回None
+    """
+    url = f"{WIKI_BASE_URL}{wiki_key}"
+    try:
+        return get_retry_engine().call(get_fetch_backend().fetch_page, wiki_key, description=f"获取页面 {url} ")
+    except Exception as e:
+        logging.error(f"获取页面 {url} 失败: {e}，已超过最大重试次数")
+        return None
+
+def get_page_content(key, key_to_wikikey=None):
     """
     获取物品的wiki页面内容，优先从缓存读取，没有再请求
     
     参数:
     - key: 物品key
     - key_to_wikikey: key到wikiKey的映射字典
-    - retry: 当前重试次数
     
     返回:
-    - 页面HTML内容
+    - 页面HTML内容，获取失败时返回None
     """
     # 先标准化key，得到wikiKey
     wiki_key = normalize_key_for_url(key, key_to_wikikey)
     
+    cache = get_page_cache()
+    index = get_cache_index()
     if wiki_key:
-        # 先检查标准化后的缓存文件
-        normalized_cache_file = os.path.join(CACHE_DIR, f"{wiki_key}.html")
-        if os.path.exists(normalized_cache_file):
-            logging.debug(f"从标准化缓存读取: {normalized_cache_file}")
-            with open(normalized_cache_file, 'r', encoding='utf-8') as f:
-                return f.read()
+        # 先通过索引检查标准化后的缓存
+        if index.lookup(wiki_key, requested=key):
+            logging.debug(f"从标准化缓存读取: {wiki_key}")
+            # 只读取，不写缓存：物品key到页面的别名只在 utils/cache_tool.py migrate/import 时按invalid_pages.csv建立
+            return cache.get(wiki_key)
         else:
             # 如果没有标准化后的缓存文件，直接获取内容并保存
             logging.info(f"获取标准化页面内容: {WIKI_BASE_URL}{wiki_key}")
-            html_content = get_page_content_selenium(wiki_key)
+            page = fetch_page(wiki_key)
+            html_content = page.html if page else None
             
             # 固定延迟1秒，避免请求过快
             time.sleep(1)
             # 保存到缓存，使用标准化的文件名
-            with open(normalized_cache_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            if html_content:
+                html_content = save_page_to_cache(wiki_key, html_content, page)
                 
             return html_content
 
-    # 再检查原始key的缓存文件
-    original_cache_file = os.path.join(CACHE_DIR, f"{key}.html")
-    if os.path.exists(original_cache_file):
-        logging.debug(f"从原始缓存读取: {original_cache_file}")
-        with open(original_cache_file, 'r', encoding='utf-8') as f:
-            return f.read()
+    # 再检查原始key的缓存
+    if index.lookup(key):
+        logging.debug(f"从原始缓存读取: {key}")
+        return cache.get(key)
     
-    try:
-        logging.info(f"获取页面内容: {WIKI_BASE_URL}{wiki_key}")
-        # 直接传递wiki_key给get_page_content_selenium
-        html_content = get_page_content_selenium(wiki_key)
-        
-        # 随机延迟，避免请求过快
-        delay = random.uniform(DELAY_MIN, DELAY_MAX)
-        time.sleep(delay)
+    logging.info(f"获取页面内容: {WIKI_BASE_URL}{key}")
+    page = fetch_page(key)
+    html_content = page.html if page else None
+    
+    # 随机延迟，避免请求过快
+    time.sleep(random.uniform(DELAY_MIN, DELAY_MAX))
+    
+    # 保存到缓存
+    if html_content:
+        html_content = save_page_to_cache(key, html_content, page)
         
-        # 保存到缓存，使用标准化的文件名
-        with open(normalized_cache_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-            
-        return html_content
-    except Exception as e:
-        if retry < MAX_RETRIES:
-            logging.warning(f"获取页面 {WIKI_BASE_URL}{wiki_key} 失败: {e}，第 {retry+1} 次重试")
-            # 增加延迟时间后重试
-            time.sleep(delay * 2 if 'delay' in locals() else 5)
-            return get_page_content(key, key_to_wikikey, retry + 1)
-        else:
-            logging.error(f"获取页面 {WIKI_BASE_URL}{wiki_key} 失败: {e}，已超过最大重试次数")
-            return None
+    return html_content
+
+def append_report_line(path, line):
+    """
+    向记录文件（未匹配的联动键、未解析的占位符）追加一行
+
+    在工作进程中先暂存到REPORT_LINES，随处理结果交给主进程，按物品顺序写入，与单进程运行的文件内容相同
+    """
+    if REPORT_LINES is not None:
+        REPORT_LINES.append((path, line))
+        return
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(f"{line}\n")
 
 def find_synergy_key(synergy_name, eng_name, synergy_name_to_key, synergy_cn_to_key,wiki_key):
     """
@@ -334,8 +596,7 @@ def find_synergy_key(synergy_name, eng_name, synergy_name_to_key, synergy_cn_to_
     
     # 记录找不到的键，确保文件存在并可写入
     try:
-        with open('unmatched_synergies.txt', 'a', encoding='utf-8') as f:
-            f.write(f"{wiki_key}: {synergy_name} => {standard_key}\n")
+        append_report_line('unmatched_synergies.txt', f"{wiki_key}: {synergy_name} => {standard_key}")
         logging.info(f"已记录未匹配的联动键: {synergy_name} => {standard_key}")
     except Exception as e:
         logging.error(f"记录未匹配的联动键时出错: {e}")
@@ -524,13 +785,279 @@ def replace_placeholders(text, sample_data, enemy_mapping=None):
             logging.warning(f"无法找到占位符 {orig_placeholder} 的对应中文名称，保留原样")
             # 在未处理的占位符文件中记录
             try:
-                with open('unresolved_placeholders.txt', 'a', encoding='utf-8') as f:
-                    f.write(f"{orig_placeholder}\n")
+                append_report_line('unresolved_placeholders.txt', orig_placeholder)
                 logging.info(f"已记录未解析的占位符: {orig_placeholder}")
             except Exception as e:
                 logging.error(f"记录未解析的占位符时出错: {e}")
     return text
 
+class ItemJournal:
+    """
+    物品处理结果的追加式日志(JSON Lines)
+    
+    每处理完一个物品追加一条记录，缓冲到flush_every条后写入磁盘。
+    程序中断后可以用load读出已完成的物品，跳过它们继续处理。
+    
+    参数:
+    - path: 日志文件路径
+    - flush_every: 每多少条记录写一次磁盘
+    - resume: 为True时读出已有记录（见recovered）并在其后追加，否则清空重写
+    """
+    
+    def __init__(self, path=JOURNAL_FILE, flush_every=JOURNAL_FLUSH_EVERY, resume=False):
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        self._buffer = []
+        self.recovered = self.load(path) if resume else []
+        # 只保留完整的记录重写一遍，去掉中断时写了一半的最后一行
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in self.recovered:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+    
+    @staticmethod
+    def load(path=JOURNAL_FILE):
+        """
+        读取日志中已完成的物品记录
+        
+        返回:
+        - 按写入顺序排列的记录列表，日志不存在时为空列表
+        """
+        records = []
+        if not os.path.exists(path):
+            return records
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # 中断时最后一行可能只写了一半，丢弃即可
+                    logging.warning(f"忽略日志 {path} 第 {line_no} 行的不完整记录")
+        return records
+    
+    def append(self, record):
+        self._buffer.append(record)
+        if len(self._buffer) >= self.flush_every:
+            self.flush()
+    
+    def flush(self):
+        """把缓冲的记录写入磁盘"""
+        if not self._buffer:
+            return
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for record in self._buffer:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._buffer = []
+
+def load_item_page(key, item_data, key_to_wikikey):
+    """
+    读取物品的页面，页面状态不正常时标记为不解析
+    
+    返回:
+    - 页面字典（key、wiki_key、name、html），不需要解析时html为None；页面获取失败时返回None
+    """
+    item_name_cn = item_data.get('name', key)
+    wiki_key = normalize_key_for_url(key, key_to_wikikey)
+    # 获取页面内容
+    html_content = get_page_content(key, key_to_wikikey)
+    if not html_content:
+        return None
+    
+    # 存根页面和空页面里没有物品信息，不交给解析器，直接按提取失败处理
+    status = get_page_cache().status_of(wiki_key)
+    if status is not None and status != PAGE_VALID:
+        logging.warning(f"物品 {key} 的页面 {wiki_key} 状态为 {status}，跳过解析")
+        html_content = None
+    return {"key": key, "wiki_key": wiki_key, "name": item_name_cn, "html": html_content}
+
+def extract_item_page(page, cache=None):
+    """
+    提取页面中的描述和联动（页面和解析器都没变时直接使用上次的提取结果）
+    
+    返回:
+    - (description, synergies)，不需要解析的页面为("", [])
+    """
+    if page["html"] is None:
+        return "", []
+    return extract_item(page["html"], page["wiki_key"], page["name"], cache)
+
+def build_item_record(page, item_data, description, synergies, sample_data, enemy_mapping,
+                      synergy_name_to_key, synergy_cn_to_key):
+    """
+    替换描述和联动中的占位符，查找联动键，生成物品记录
+    
+    返回:
+    - 物品记录字典（key、wiki_key、name、notes、synergies）
+    """
+    key = page["key"]
+    wiki_key = page["wiki_key"]
+    if not description:
+        logging.warning(f"物品 {key} 的描述提取失败，使用原始描述")
+        description = item_data.get('notes', '')
+    
+    # 替换物品描述中的占位符
+    description = replace_placeholders(description, sample_data, enemy_mapping)
+    
+    # 提取联动信息
+    synergy_records = []
+    for synergy in synergies:
+        synergy_name = synergy['name']
+        eng_name = synergy['eng_name']
+        # 查找联动键
+        synergy_key = find_synergy_key(synergy_name, eng_name, synergy_name_to_key, synergy_cn_to_key,wiki_key)
+        
+        # 替换联动描述中的占位符
+        synergy_desc = synergy['description']
+        synergy_desc = replace_placeholders(synergy_desc, sample_data, enemy_mapping)
+        
+        synergy_records.append({"key": synergy_key, "notes": synergy_desc})
+    
+    return {
+        "key": key,
+        "wiki_key": wiki_key,
+        "name": page["name"],
+        "notes": description,
+        "synergies": synergy_records,
+    }
+
+def process_item(key, item_data, sample_data, key_to_wikikey, enemy_mapping, synergy_name_to_key, synergy_cn_to_key):
+    """
+    处理单个物品：读取页面，提取描述和联动并替换占位符
+    
+    返回:
+    - 物品记录字典（key、wiki_key、name、notes、synergies），页面获取失败时返回None
+    """
+    page = load_item_page(key, item_data, key_to_wikikey)
+    if page is None:
+        return None
+    description, synergies = extract_item_page(page, EXTRACTION_CACHE)
+    return build_item_record(page, item_data, description, synergies, sample_data, enemy_mapping,
+                             synergy_name_to_key, synergy_cn_to_key)
+
+def init_item_worker(context, parser_backend, partial_parse, streaming):
+    """
+    工作进程的初始化函数：参照表和解析设置在进程启动时传入一次，之后每个任务只传页面
+    
+    参数:
+    - context: build_item_record需要的只读参照表（sample_data、enemy_mapping、两个联动映射）
+    - parser_backend, partial_parse, streaming: 主进程的解析设置
+    """
+    global WORKER_CONTEXT, REPORT_LINES
+    WORKER_CONTEXT = context
+    REPORT_LINES = []
+    set_parser_backend(parser_backend)
+    set_partial_parse(partial_parse)
+    set_streaming(streaming)
+
+def extract_item_in_worker(page, item_data, extraction):
+    """
+    在工作进程中提取并处理一个物品
+    
+    参数:
+    - page: load_item_page返回的页面字典
+    - item_data: 物品的sample数据
+    - extraction: 主进程在提取结果缓存中找到的(description, synergies)，没有时为None
+    
+    返回:
+    - (物品记录, 新提取的结果, 记录文件的行, 错误信息)，新提取的结果在使用缓存时为None
+    """
+    del REPORT_LINES[:]
+    try:
+        extracted = None
+        if extraction is None:
+            extraction = extracted = extract_item_page(page)
+        record = build_item_record(page, item_data, *extraction, **WORKER_CONTEXT)
+        return record, extracted, list(REPORT_LINES), None
+    except Exception as e:
+        return None, None, list(REPORT_LINES), str(e)
+
+def iter_item_results_parallel(items, jobs, key_to_wikikey, context):
+    """
+    用进程池处理物品，按items的顺序给出结果
+    
+    页面读取（可能需要下载、写缓存）和提取结果缓存的查询、写入都在主进程中按顺序进行，
+    工作进程只做解析和占位符替换。排队的物品不超过jobs * ITEMS_IN_FLIGHT_PER_JOB个，
+    最早提交的物品处理完才继续读取后面的页面。
+    
+    参数:
+    - items: [(key, item_data)]
+    - jobs: 工作进程数
+    - key_to_wikikey: key到wikiKey的映射字典
+    - context: 传给init_item_worker的只读参照表
+    
+    返回:
+    - 生成器，每项为(key, 物品记录, 错误信息)，页面获取失败时物品记录和错误信息都为None
+    """
+    initargs = (context, get_parser_backend(), get_partial_parse(), get_streaming())
+    with multiprocessing.Pool(jobs, initializer=init_item_worker, initargs=initargs) as pool:
+        pending = deque()
+        
+        def finish_oldest():
+            key, cache_key, result, error = pending.popleft()
+            if result is None:
+                return key, None, error
+            record, extracted, report_lines, error = result.get()
+            for path, line in report_lines:
+                append_report_line(path, line)
+            if extracted is not None and cache_key is not None:
+                EXTRACTION_CACHE.put(cache_key, *extracted)
+            return key, record, error
+        
+        for key, item_data in items:
+            if len(pending) >= jobs * ITEMS_IN_FLIGHT_PER_JOB:
+                yield finish_oldest()
+            try:
+                page = load_item_page(key, item_data, key_to_wikikey)
+            except Exception as e:
+                # 出错的物品也排队，等前面的物品给出结果后再报告
+                pending.append((key, None, None, str(e)))
+                continue
+            if page is None:
+                pending.append((key, None, None, None))
+                continue
+            extraction = cache_key = None
+            if page["html"] is not None and EXTRACTION_CACHE is not None:
+                cache_key = extraction_key(page["html"], page["wiki_key"], page["name"])
+                extraction = EXTRACTION_CACHE.get(cache_key)
+                if extraction is not None:
+                    # 命中缓存的页面不用再传给工作进程
+                    page["html"] = None
+            result = pool.apply_async(extract_item_in_worker, (page, item_data, extraction))
+            pending.append((key, cache_key, result, None))
+        while pending:
+            yield finish_oldest()
+
+def iter_item_results(items, key_to_wikikey, context):
+    """
+    在当前进程中逐个处理物品，结果格式与iter_item_results_parallel相同
+    """
+    for key, item_data in items:
+        try:
+            record = process_item(key, item_data, context['sample_data'], key_to_wikikey, context['enemy_mapping'],
+                                  context['synergy_name_to_key'], context['synergy_cn_to_key'])
+            yield key, record, None
+        except Exception as e:
+            yield key, None, str(e)
+
+def apply_item_record(record, items_data, synergies_data):
+    """
+    把物品记录合并到物品和联动数据中
+    """
+    items_data[record["key"]] = {
+        "name": record["name"],
+        "notes": record["notes"]
+    }
+    for synergy in record["synergies"]:
+        synergies_data[synergy["key"]] = {
+            "notes": synergy["notes"]
+        }
+
 def generate_tip_file(items_data, sample_data, output_file, key_to_wikikey):
     """
     生成最终的tip文件
@@ -598,95 +1125,211 @@ def generate_tip_file(items_data, sample_data, output_file, key_to_wikikey):
     logging.info(f"tip文件生成完成: {output_file}")
 
 
-def main():
-    start_time = time.time()
-    logging.info("开始生成中文物品提示文件...")
-    
-    # 初始化未匹配的联动键和未解析的占位符文件
-    with open('unmatched_synergies.txt', 'w', encoding='utf-8') as f:
-        f.write("# 未匹配的联动键\n")
+def revalidate_cached_pages():
+    """
+    用条件请求重新验证所有缓存页面，只重新下载有变化的页面
     
-    with open('unresolved_placeholders.txt', 'w', encoding='utf-8') as f:
-        f.write("# 未解析的占位符\n")
+    返回:
+    - RevalidationReport，缓存只读时返回None
+    """
+    cache = get_page_cache()
+    if cache.read_only:
+        logging.warning(f"缓存 {cache.describe()} 是只读的，跳过重新验证")
+        return None
+    backend = get_fetch_backend()
+    if not isinstance(backend, HttpBackend):
+        # 条件请求只有HTTP后端支持
+        logging.info("重新验证缓存需要HTTP后端，临时创建一个")
+        backend = HttpBackend(fallback=False)
+    logging.info("开始重新验证缓存页面...")
+    # 与下载新页面时一样按--trim-pages裁剪
+    report = revalidate_cache(cache, backend, retry_engine=get_retry_engine(), trim=TRIM_PAGES)
+    if backend is not FETCH_BACKEND:
+        backend.close()
+    logging.info(report.report())
+    print(report.report())
+    return report
+
+def cache_policy_from_args(args):
+    """
+    根据命令行参数生成缓存策略
     
-    # 加载sample数据和映射
-    sample_data, synergy_name_to_key, synergy_cn_to_key = load_itemtips_sample()
-    key_to_wikikey = load_key_to_wikikey_mapping()
+    返回:
+    - CachePolicy
+    """
+    max_bytes = int(args.cache_max_mb * 1024 * 1024) if args.cache_max_mb is not None else None
+    ttl = args.cache_ttl_days * 24 * 60 * 60 if args.cache_ttl_days is not None else None
+    return CachePolicy(max_bytes=max_bytes, ttl=ttl, eviction=args.cache_eviction)
 
-    # 加载敌人映射数据
-    enemy_mapping = {}
-    try:
-        enemy_mapping_path = os.path.join('etg_scrapers', 'enemy_mapping.json')
-        with open(enemy_mapping_path, 'r', encoding='utf-8') as f:
-            enemy_mapping = json.load(f)
-        logging.info(f"成功加载敌人映射数据，共 {len(enemy_mapping)} 个敌人")
-    except Exception as e:
-        logging.error(f"加载敌人映射数据失败: {e}")
+def parse_args(argv=None):
+    """
+    解析命令行参数
+    """
+    parser = argparse.ArgumentParser(description='生成中文物品提示文件')
+    parser.add_argument('--backend', type=str, choices=sorted(FETCH_BACKENDS), default=DEFAULT_FETCH_BACKEND,
+                        help=f'缓存未命中时使用的页面获取后端 (默认: {DEFAULT_FETCH_BACKEND})')
+    parser.add_argument('--max-concurrency', type=int, default=1,
+                        help='处理前批量获取未缓存页面时的最大同时请求数 (默认: 1，逐个获取)')
+    parser.add_argument('--rate', type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                        help=f'并发获取时每个host每秒的请求数上限 (默认: {DEFAULT_REQUESTS_PER_SECOND})')
+    parser.add_argument('--plan-only', action='store_true',
+                        help='只打印页面获取计划（去重后的下载列表和预计用时），不下载也不生成文件')
+    parser.add_argument('--resume', action='store_true',
+                        help=f'从 {JOURNAL_FILE} 中恢复上次中断前已处理的物品，只处理剩下的物品')
+    parser.add_argument('--journal-every', type=int, default=JOURNAL_FLUSH_EVERY,
+                        help=f'每处理多少个物品把结果写入日志一次 (默认: {JOURNAL_FLUSH_EVERY})')
+    parser.add_argument('--revalidate', action='store_true',
+                        help='处理前用条件请求(ETag/Last-Modified)检查缓存页面，只重新下载有变化的页面')
+    parser.add_argument('--cache-backend', type=str, choices=sorted(CACHE_BACKENDS), default=DEFAULT_CACHE_BACKEND,
+                        help=f'页面缓存后端 (默认: {DEFAULT_CACHE_BACKEND}，即 {CACHE_DIR}/ 目录)')
+    parser.add_argument('--cache-path', type=str, default=None,
+                        help='页面缓存路径 (默认: 各后端自己的默认路径)')
+    parser.add_argument('--cache-max-mb', type=float, default=None,
+                        help='页面缓存大小上限(MB)，写入后超出时按--cache-eviction淘汰 (默认: 不限)')
+    parser.add_argument('--cache-ttl-days', type=float, default=None,
+                        help='缓存页面的有效期(天)，过期页面会重新下载 (默认: 永不过期)')
+    parser.add_argument('--cache-eviction', type=str, choices=EVICTION_POLICIES, default='lru',
+                        help='超出容量时的淘汰顺序: lru=最久未访问，lrf=最早获取 (默认: lru)')
+    parser.add_argument('--no-extraction-cache', action='store_true',
+                        help=f'不使用 {EXTRACTION_CACHE_FILE} 中的提取结果，重新解析所有页面')
+    parser.add_argument('--html-parser', type=str, choices=sorted(PARSER_BACKENDS), default=None,
+                        help='解析页面用的HTML解析后端，lxml需要另外安装 (默认: 环境变量ETG_HTML_PARSER，否则为html.parser)')
+    parser.add_argument('--partial-parse', action='store_true',
+                        help='只给页面的#page-content区域建立文档树，不解析导航、侧边栏和脚本 (也可设置环境变量ETG_PARTIAL_PARSE=1)')
+    parser.add_argument('--trim-pages', action='store_true',
+                        help='新下载的页面只保存#page-content子树（已有缓存用 utils/trim_cache.py 迁移）')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='解析物品页面的进程数，0表示CPU核数；结果按物品顺序合并，与单进程相同 (默认: 1)')
+    parser.add_argument('--stream-extract', action='store_true',
+                        help='边解析边提取描述和联动，不建立整个页面的文档树 (也可设置环境变量ETG_STREAM_EXTRACT=1)')
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    global TRIM_PAGES
+    args = parse_args(argv)
+    TRIM_PAGES = args.trim_pages
+    start_time = time.time()
+    logging.info("开始生成中文物品提示文件...")
+    set_fetch_backend(args.backend)
+    set_page_cache(args.cache_backend, args.cache_path, cache_policy_from_args(args))
+    set_extraction_cache(None if args.no_extraction_cache else EXTRACTION_CACHE_FILE)
+    if args.html_parser:
+        set_parser_backend(args.html_parser)
+    if args.partial_parse:
+        set_partial_parse(True)
+    if args.stream_extract:
+        set_streaming(True)
+    logging.info(f"页面提取方式: {extraction_mode()}")
+    # 并发模式下由AIMD根据延迟在--max-concurrency以内调整实际并发数
+    limiter = None
+    if args.max_concurrency > 1:
+        limiter = AIMDLimiter(initial=args.max_concurrency, max_limit=args.max_concurrency)
+    configure_retry_engine(max_retries=MAX_RETRIES, limiter=limiter)
+    configure_driver_pool(size=max(DRIVER_POOL_SIZE, args.max_concurrency), max_pages=DRIVER_MAX_PAGES)
     
-    # 初始化计数器
-    total_items = len(sample_data['items'])
-    processed_items = 0
-    failed_items = 0
-    total_synergies = 0
+    # 初始化未匹配的联动键和未解析的占位符文件（只打印计划或续跑时保留上次的结果）
+    if not args.plan_only and not args.resume:
+        with open('unmatched_synergies.txt', 'w', encoding='utf-8') as f:
+            f.write("# 未匹配的联动键\n")
+        
+        with open('unresolved_placeholders.txt', 'w', encoding='utf-8') as f:
+            f.write("# 未解析的占位符\n")
     
+    # 只打印计划时也要经过下面的finally，关闭页面缓存并保存缓存清单
+    journal = None
     try:
+        # 加载sample数据和映射
+        sample_data, synergy_name_to_key, synergy_cn_to_key = load_itemtips_sample()
+        key_to_wikikey = load_key_to_wikikey_mapping()
+
+        # 加载敌人映射数据
+        enemy_mapping = {}
+        try:
+            enemy_mapping_path = os.path.join('etg_scrapers', 'enemy_mapping.json')
+            with open(enemy_mapping_path, 'r', encoding='utf-8') as f:
+                enemy_mapping = json.load(f)
+            logging.info(f"成功加载敌人映射数据，共 {len(enemy_mapping)} 个敌人")
+        except Exception as e:
+            logging.error(f"加载敌人映射数据失败: {e}")
+        
+        if args.plan_only:
+            plan = build_fetch_plan(sample_data, key_to_wikikey)
+            print(plan.summary(args.max_concurrency, args.rate))
+            details = plan.details()
+            if details:
+                print(details)
+            return
+        
+        if args.revalidate:
+            revalidate_cached_pages()
+        
+        # 先计算去重后的下载列表并一次性补齐缓存，后续处理全部从缓存读取
+        plan = build_fetch_plan(sample_data, key_to_wikikey)
+        logging.info(plan.summary(args.max_concurrency, args.rate))
+        if plan.fetch_keys:
+            prefetch_pages(plan.fetch_keys, args.max_concurrency, args.rate)
+        
+        # 初始化计数器
+        total_items = len(sample_data['items'])
+        processed_items = 0
+        failed_items = 0
+        total_synergies = 0
+        
+        # 续跑时先读出上次已完成的物品
+        journal = ItemJournal(JOURNAL_FILE, args.journal_every, resume=args.resume)
+        journaled = journal.recovered
+        
         # 物品数据
         items_data = {}
         synergies_data = {}
         
+        done_keys = set()
+        for record in journaled:
+            apply_item_record(record, items_data, synergies_data)
+            done_keys.add(record["key"])
+            processed_items += 1
+            total_synergies += len(record["synergies"])
+        if journaled:
+            logging.info(f"从 {JOURNAL_FILE} 恢复了 {len(done_keys)} 个已处理的物品")
+        
         # 处理所有物品
-        logging.info(f"开始处理 {total_items} 个物品...")
-        for key, item_data in tqdm(sample_data['items'].items(), desc="处理物品"):
-            try:
-                item_name_cn = item_data.get('name', key)
-                wiki_key = normalize_key_for_url(key, key_to_wikikey)
-                # 获取页面内容
-                html_content = get_page_content(key, key_to_wikikey)
-                if not html_content:
-                    logging.error(f"无法获取物品 {key} 的页面内容，跳过")
-                    failed_items += 1
-                    continue
-                
-                # 提取描述
-                description = extract_item_description(html_content, wiki_key, item_name_cn)
-                if not description:
-                    logging.warning(f"物品 {key} 的描述提取失败，使用原始描述")
-                    description = item_data.get('notes', '')
-                
-                # 替换物品描述中的占位符
-                description = replace_placeholders(description, sample_data, enemy_mapping)
-                
-                # 添加到物品数据
-                items_data[key] = {
-                    "name": item_name_cn,
-                    "notes": description
-                }
-                processed_items += 1
-                
-                # 提取联动信息
-                synergies = extract_item_synergies(html_content)
-                for synergy in synergies:
-                    synergy_name = synergy['name']
-                    eng_name = synergy['eng_name']
-                    # 查找联动键
-                    synergy_key = find_synergy_key(synergy_name, eng_name, synergy_name_to_key, synergy_cn_to_key,wiki_key)
-                    
-                    # 替换联动描述中的占位符
-                    synergy_desc = synergy['description']
-                    synergy_desc = replace_placeholders(synergy_desc, sample_data, enemy_mapping)
-                    
-                    synergies_data[synergy_key] = {
-                        "notes": synergy_desc
-                    }
-                    total_synergies += 1
-                
-                # 每处理100个物品，生成一次临时文件
-                if processed_items % 100 == 0:
-                    logging.info(f"已处理 {processed_items} / {total_items} 个物品")
-                    
-            except Exception as e:
-                logging.error(f"处理物品 {key} 时出错: {e}")
+        items = [(key, item_data) for key, item_data in sample_data['items'].items() if key not in done_keys]
+        context = {
+            'sample_data': sample_data,
+            'enemy_mapping': enemy_mapping,
+            'synergy_name_to_key': synergy_name_to_key,
+            'synergy_cn_to_key': synergy_cn_to_key,
+        }
+        jobs = args.jobs or os.cpu_count() or 1
+        if jobs > 1:
+            logging.info(f"开始处理 {len(items)} 个物品（{jobs} 个工作进程）...")
+            results = iter_item_results_parallel(items, jobs, key_to_wikikey, context)
+        else:
+            logging.info(f"开始处理 {len(items)} 个物品...")
+            results = iter_item_results(items, key_to_wikikey, context)
+        for key, record, error in tqdm(results, total=len(items), desc="处理物品"):
+            if error is not None:
+                logging.error(f"处理物品 {key} 时出错: {error}")
                 failed_items += 1
+                continue
+            if record is None:
+                logging.error(f"无法获取物品 {key} 的页面内容，跳过")
+                failed_items += 1
+                continue
+            
+            apply_item_record(record, items_data, synergies_data)
+            journal.append(record)
+            processed_items += 1
+            total_synergies += len(record["synergies"])
+            
+            # 每处理100个物品，输出一次进度（结果已经按--journal-every写入日志）
+            if processed_items % 100 == 0:
+                logging.info(f"已处理 {processed_items} / {total_items} 个物品")
+        
+        journal.flush()
+        if EXTRACTION_CACHE is not None:
+            # 完整跑完时顺便去掉用不到的旧结果；续跑时恢复的物品没有查询缓存，不能清理
+            EXTRACTION_CACHE.save(prune=not args.resume)
         
         # 将联动数据添加到物品数据中
         items_data["synergies"] = synergies_data
@@ -720,11 +1363,50 @@ def main():
         print(f"提取联动数: {total_synergies}")
         print(f"处理用时: {processing_time:.2f} 秒")
         print(f"生成的文件: {OUTPUT_FILE}")
+        
+        # 输出缓存索引命中情况
+        index_report = get_cache_index().report()
+        logging.info(index_report)
+        print(index_report)
+        
+        if EXTRACTION_CACHE is not None:
+            extraction_report = EXTRACTION_CACHE.report()
+            logging.info(extraction_report)
+            print(extraction_report)
+        
+        # 输出页面获取后端及命中次数
+        backend_report = get_fetch_backend().report()
+        logging.info(backend_report)
+        print(backend_report)
+        
+        # 发生过重试或失败时输出重试统计
+        retry_engine = get_retry_engine()
+        if retry_engine.retries or retry_engine.failures:
+            retry_report = retry_engine.report()
+            logging.info(retry_report)
+            print(retry_report)
+        
+        # 只有实际启动过浏览器时才输出会话池统计
+        driver_pool = get_driver_pool(create=False)
+        if driver_pool and driver_pool.boots:
+            pool_report = driver_pool.report()
+            logging.info(pool_report)
+            print(pool_report)
     
     except Exception as e:
         logging.error(f"程序执行出错: {e}")
     
     finally:
+        # 中断时也把缓冲中的结果写入日志，下次可以--resume
+        if journal is not None:
+            journal.flush()
+        if EXTRACTION_CACHE is not None:
+            EXTRACTION_CACHE.save()
+        if FETCH_BACKEND is not None:
+            FETCH_BACKEND.close()
+        if PAGE_CACHE is not None:
+            PAGE_CACHE.close()
+        close_driver_pool()
         logging.info("程序执行完成")
 
 if __name__ == "__main__":
@@ -0,0 +1,113 @@
+import os
+import sys
+
+import pytest
+
+# 将项目根目录添加到Python路径中
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etg_cache import BlobStore, CachePolicy, ManagedCache, SqliteCache
+from etg_cache.policy import DAY
+
+NOW = 1700000000.0
+
+
+def page(key):
+    # 每个页面大小相同，容量上限按页面数计算
+    return f'<html><body><div id="page-content"><p>{key:>10}</p></div></body></html>'
+
+
+PAGE_SIZE = len(page('a').encode('utf-8'))
+
+
+def make_cache(tmp_path, backend='blob', **policy):
+    if backend == 'sqlite':
+        cache = SqliteCache(str(tmp_path / 'cache.sqlite3'))
+    else:
+        cache = BlobStore(str(tmp_path / 'blob'))
+    return ManagedCache(cache, CachePolicy(**policy), str(tmp_path / 'manifest.json'))
+
+
+def add_page(cache, key, fetched_days_ago, accessed_days_ago):
+    """写入页面，并把获取时间和最近访问时间设为固定值（写入时还没有容量上限，不会触发回收）"""
+    cache.put(key, page(key), {'fetched_at': NOW - fetched_days_ago * DAY})
+    cache.manifest.entries[key]['last_access'] = NOW - accessed_days_ago * DAY
+
+
+def test_ttl_expiry(tmp_path, capsys):
+    """获取时间超过有效期的页面被删除，重新验证过的页面重新计算有效期"""
+    cache = make_cache(tmp_path, ttl=10 * DAY)
+    add_page(cache, 'old', 20, 0)
+    add_page(cache, 'fresh', 1, 5)
+    add_page(cache, 'revalidated', 20, 5)
+    cache.manifest.record_validation('revalidated', NOW - 2 * DAY)
+
+    report = cache.gc(now=NOW)
+    assert report.expired == ['old'] and report.evicted == []
+    assert report.reclaimed_bytes == PAGE_SIZE
+    assert cache.cache.keys() == ['fresh', 'revalidated']
+    assert sorted(cache.manifest.entries) == ['fresh', 'revalidated']
+
+
+@pytest.mark.parametrize('eviction, evicted', [('lru', ['c', 'a']), ('lrf', ['a', 'b'])])
+def test_eviction_order(tmp_path, eviction, evicted, capsys):
+    """超出容量时lru先淘汰最久未访问的页面，lrf先淘汰最早获取的页面"""
+    cache = make_cache(tmp_path, eviction=eviction)
+    add_page(cache, 'a', 30, 20)
+    add_page(cache, 'b', 20, 10)
+    add_page(cache, 'c', 10, 30)
+    add_page(cache, 'd', 5, 5)
+    cache.policy.max_bytes = 2 * PAGE_SIZE
+
+    report = cache.gc(now=NOW)
+    assert report.evicted == evicted and report.expired == []
+    assert cache.cache.keys() == sorted(set('abcd') - set(evicted))
+
+
+def test_dry_run_reports_without_deleting(tmp_path, capsys):
+    """dry-run只报告要删除的页面，缓存和清单都不变"""
+    cache = make_cache(tmp_path, ttl=10 * DAY)
+    add_page(cache, 'old', 20, 0)
+    add_page(cache, 'a', 5, 5)
+    add_page(cache, 'b', 1, 1)
+    cache.policy.max_bytes = PAGE_SIZE
+    entries = {key: dict(entry) for key, entry in cache.manifest.entries.items()}
+
+    report = cache.gc(dry_run=True, now=NOW)
+    assert report.expired == ['old'] and report.evicted == ['a']
+    assert report.reclaimed_bytes == 2 * PAGE_SIZE
+    assert cache.cache.keys() == ['a', 'b', 'old']
+    assert cache.manifest.entries == entries
+    assert "将回收" in report.report() and "磁盘占用" not in report.report()
+
+
+@pytest.mark.parametrize('backend', ['sqlite', 'blob'])
+def test_alias_follows_its_page(tmp_path, backend, capsys):
+    """别名不单独过期或淘汰：通过别名的访问算作页面的访问，页面被删除时别名一并删除"""
+    cache = make_cache(tmp_path, backend, ttl=10 * DAY)
+    add_page(cache, 'bee-hive', 5, 9)
+    add_page(cache, 'ammo_belt', 5, 5)
+    add_page(cache, 'old', 20, 0)
+    add_page(cache, 'stale', 20, 0)
+    assert cache.link('bee_hive', 'bee-hive')
+    assert cache.link('old_alias', 'old')
+    cache.manifest.entries['bee_hive']['last_access'] = NOW - 1 * DAY
+    cache.manifest.entries['old_alias']['last_access'] = NOW
+    cache.policy.max_bytes = 2 * PAGE_SIZE
+
+    report = cache.gc(now=NOW)
+    assert report.expired == ['old', 'stale']
+    assert report.evicted == []
+    assert report.aliases == ['old_alias']
+    assert sorted(cache.cache.keys()) == ['ammo_belt', 'bee-hive', 'bee_hive']
+    assert sorted(cache.manifest.entries) == ['ammo_belt', 'bee-hive', 'bee_hive']
+
+    # 页面只按自身大小计算，别名最近被访问过，所以淘汰的是ammo_belt而不是bee-hive
+    cache.policy.max_bytes = PAGE_SIZE
+    report = cache.gc(now=NOW)
+    assert report.evicted == ['ammo_belt'] and report.aliases == []
+    assert cache.cache.get('bee_hive') == page('bee-hive')
+
+    cache.delete('bee-hive')
+    assert cache.cache.keys() == [] and cache.manifest.entries == {}
+    cache.close()
@@ -0,0 +1,58 @@
+import os
+import sys
+
+import pytest
+
+# 将项目根目录添加到Python路径中
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etg_cache import BlobStore, DirectoryCache, copy_pages
+
+REPO_CACHE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache')
+
+
+def page(title, token, body):
+    return (f'<html><head><title>{title}</title></head><body><div id="top">{token}</div>'
+            f'<div id="page-content">{body}</div><div id="footer">{token}</div></body></html>')
+
+
+def assert_round_trip(source, store):
+    """每个key从store读出的页面与源缓存逐字节相同"""
+    keys = source.keys()
+    assert store.keys() == sorted(keys)
+    for key in keys:
+        assert store.get(key).encode('utf-8') == source.get(key).encode('utf-8'), key
+
+
+def test_blob_round_trip_keeps_page_frames(tmp_path):
+    """#page-content相同但页面框架不同的页面各自读回自己的内容"""
+    source = DirectoryCache(str(tmp_path / 'dir'))
+    pages = {
+        'bee_hive': page('Bee Hive', 'token-1', '<p>蜂巢</p>'),
+        'bee-hive': page('Bee Hive', 'token-2', '<p>蜂巢</p>'),
+        'ammo_belt': page('Ammo Belt', 'token-3', '<p>蜂巢</p>'),
+        'copy_of_ammo_belt': page('Ammo Belt', 'token-3', '<p>蜂巢</p>'),
+        'no_content': '<html><body>页面不存在</body></html>',
+    }
+    for key, html_content in pages.items():
+        source.save(key, html_content)
+
+    store = BlobStore(str(tmp_path / 'blob'))
+    assert copy_pages(source, store) == len(pages)
+    assert_round_trip(source, store)
+    # 只有逐字节相同的页面共用一份正文
+    assert store.blob_count() == len(pages) - 1
+    assert store.get_metadata('bee-hive')['sha256'] == source.get_metadata('bee-hive')['sha256']
+
+    # 重新打开后按别名表读取，结果不变
+    assert_round_trip(source, BlobStore(str(tmp_path / 'blob')))
+
+
+def test_blob_round_trip_repo_cache(tmp_path):
+    """仓库中的页面缓存迁移到blob后，每个key读回的页面逐字节相同"""
+    if not os.path.isdir(REPO_CACHE):
+        pytest.skip('没有页面缓存')
+    source = DirectoryCache(REPO_CACHE)
+    store = BlobStore(str(tmp_path / 'blob'))
+    copy_pages(source, store)
+    assert_round_trip(source, store)
@@ -0,0 +1,65 @@
+import logging
+import os
+import sys
+
+# 将项目根目录添加到Python路径中
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import generate_all_itemtips
+from etg_cache import DirectoryCache, ManagedCache, is_trimmed
+from etg_parser.crawler import AsyncCrawler
+from etg_parser.fetch_backends import PageResponse
+from etg_parser.retry import FetchError, RetryEngine
+
+
+class FlakyBackend:
+    """前failures次请求返回限流错误，之后正常返回"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def fetch_page(self, key, headers=None):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise FetchError('throttled', '429', status_code=429)
+        return PageResponse(key, '<html></html>', status_code=200)
+
+
+def test_every_retry_takes_a_token(capsys):
+    """重试同样从每个host的令牌桶取令牌"""
+    backend = FlakyBackend(failures=2)
+    engine = RetryEngine(sleep=lambda delay: None)
+    crawler = AsyncCrawler(backend, max_concurrency=1, requests_per_second=1000, retry_engine=engine)
+    results = crawler.run(['bee-hive'])
+
+    assert results['bee-hive'] is not None
+    assert backend.calls == 3
+    assert [bucket.acquired for bucket in crawler.buckets.values()] == [3]
+
+
+class PageBackend:
+    """每个key都返回同一个完整页面"""
+
+    def fetch_page(self, key, headers=None):
+        return PageResponse(key, '<html><head><title>x</title></head><body><div id="page-content"><p>蜂巢</p></div>'
+                                 '<div id="footer"></div></body></html>', status_code=200)
+
+
+def test_prefetch_trims_pages(tmp_path, monkeypatch, capsys):
+    """--trim-pages时并发预取的页面与逐个下载的页面一样裁剪后写入缓存"""
+    backend = PageBackend()
+    monkeypatch.setattr(generate_all_itemtips, 'PAGE_CACHE', ManagedCache(DirectoryCache(str(tmp_path / 'cache'))))
+    monkeypatch.setattr(generate_all_itemtips, 'CACHE_INDEX', None)
+    monkeypatch.setattr(generate_all_itemtips, 'FETCH_BACKEND', backend)
+    monkeypatch.setattr(generate_all_itemtips, 'TRIM_PAGES', True)
+    # 不写仓库中的itemtips_generation.log
+    logging.disable(logging.CRITICAL)
+    try:
+        generate_all_itemtips.prefetch_pages(['bee-hive'], max_concurrency=2, requests_per_second=1000)
+    finally:
+        logging.disable(logging.NOTSET)
+
+    cache = DirectoryCache(str(tmp_path / 'cache'))
+    assert is_trimmed(cache.get('bee-hive'))
+    assert cache.get_metadata('bee-hive')['trimmed']
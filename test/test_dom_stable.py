@@ -0,0 +1,70 @@
+import os
+import sys
+
+import pytest
+
+# 将项目根目录添加到Python路径中
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etg_parser.retry import FetchError, classify_error
+from etg_scrapers.enemy_scraper_iframe import DOM_FIRST_RENDER_TIMEOUT, dom_stable
+
+LOCATOR = ('css selector', 'div.item-block')
+
+
+class FakeDriver:
+    """每次查询依次返回counts中的元素数量，最后一个数量之后保持不变"""
+
+    def __init__(self, counts):
+        self.counts = list(counts)
+
+    def find_elements(self, by, value):
+        count = self.counts.pop(0) if len(self.counts) > 1 else self.counts[0]
+        return [object()] * count
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def poll(condition, driver, clock, times, interval=0.25):
+    """按interval轮询，返回每次的结果"""
+    results = []
+    for _ in range(times):
+        results.append(condition(driver))
+        clock.now += interval
+    return results
+
+
+def test_stable_after_quiet_period():
+    """数量变化后重新计时，保持quiet_period不变才算稳定"""
+    clock = FakeClock()
+    condition = dom_stable(LOCATOR, quiet_period=1.0, clock=clock)
+    results = poll(condition, FakeDriver([0, 3, 5, 5]), clock, 7)
+    assert results == [False, False, False, False, False, False, True]
+
+
+def test_zero_count_fails_after_first_render_timeout():
+    """一直没有元素时等到first_render_timeout后立即失败，不等到WebDriverWait超时"""
+    clock = FakeClock()
+    condition = dom_stable(LOCATOR, quiet_period=1.0, first_render_timeout=3.0, clock=clock)
+    driver = FakeDriver([0])
+    assert poll(condition, driver, clock, 12) == [False] * 12
+    with pytest.raises(FetchError) as excinfo:
+        condition(driver)
+    assert clock.now == 3.0
+    assert classify_error(excinfo.value) == 'empty'
+
+
+def test_late_first_render_is_waited_for():
+    """列表在quiet_period之后、first_render_timeout之内第一次出现时，按默认设置正常等待数量稳定"""
+    assert DOM_FIRST_RENDER_TIMEOUT >= 3.0
+    clock = FakeClock()
+    condition = dom_stable(LOCATOR, quiet_period=1.0, clock=clock)
+    # 2秒时才出现项目块，数量保持1秒后稳定
+    results = poll(condition, FakeDriver([0] * 8 + [4]), clock, 13)
+    assert results == [False] * 12 + [True]
@@ -0,0 +1,127 @@
+import json
+import logging
+import os
+import sys
+
+import pytest
+
+# 将项目根目录添加到Python路径中
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import generate_all_itemtips
+from generate_all_itemtips import ItemJournal
+
+# main()最后手动补名字的联动，记录中必须有它们
+FIXED_SYNERGIES = ['#FOSSILPHOENIX', '#REPLETE', '#SOULAIR', '#HOMINGBOMBS3']
+
+SAMPLE = {
+    'items': {key: {'name': f'{key}中文', 'notes': f'{key} notes'} for key in ['a', 'b', 'c', 'd', 'e']},
+    'synergies': {key: {'name': '', 'notes': 'sample'} for key in FIXED_SYNERGIES + ['#B']},
+}
+
+
+def record_for(key):
+    synergies = [{'key': f'#{key.upper()}', 'notes': f'{key} synergy'}]
+    if key == 'a':
+        synergies += [{'key': synergy_key, 'notes': f'{synergy_key} notes'} for synergy_key in FIXED_SYNERGIES]
+    return {'key': key, 'wiki_key': key, 'name': f'{key}中文', 'notes': f'{key} 描述', 'synergies': synergies}
+
+
+@pytest.fixture
+def fake_run(tmp_path, monkeypatch):
+    """
+    在临时目录中运行main()：不读取页面，每个物品直接返回固定的记录
+
+    返回:
+    - run(argv, crash_at=None)，返回本次处理过的物品key；crash_at处模拟Ctrl-C
+    """
+    monkeypatch.chdir(tmp_path)
+    # main()会替换模块中的缓存和后端，测试结束后恢复，不影响后面读取仓库缓存的测试
+    for name in ['PAGE_CACHE', 'CACHE_INDEX', 'EXTRACTION_CACHE', 'FETCH_BACKEND', 'TRIM_PAGES']:
+        monkeypatch.setattr(generate_all_itemtips, name, getattr(generate_all_itemtips, name))
+    # 不写仓库中的itemtips_generation.log
+    logging.disable(logging.CRITICAL)
+    monkeypatch.setattr(generate_all_itemtips, 'load_itemtips_sample', lambda: (SAMPLE, {}, {}))
+    monkeypatch.setattr(generate_all_itemtips, 'load_key_to_wikikey_mapping', lambda: {})
+    monkeypatch.setattr(generate_all_itemtips, 'build_fetch_plan', lambda *args: generate_all_itemtips.FetchPlan())
+
+    def run(argv, crash_at=None):
+        processed = []
+
+        def process_item(key, *args):
+            if key == crash_at:
+                raise KeyboardInterrupt
+            processed.append(key)
+            return record_for(key)
+
+        monkeypatch.setattr(generate_all_itemtips, 'process_item', process_item)
+        generate_all_itemtips.main(['--cache-path', str(tmp_path / 'cache'), '--no-extraction-cache',
+                                    '--journal-every', '1'] + argv)
+        return processed
+
+    yield run
+    logging.disable(logging.NOTSET)
+
+
+def read_output():
+    with open(generate_all_itemtips.OUTPUT_FILE, 'rb') as f:
+        return f.read()
+
+
+def test_truncated_last_line_is_dropped(tmp_path):
+    """中断时写了一半的最后一行被丢弃，续跑前重写的日志只保留完整记录"""
+    path = str(tmp_path / 'journal.jsonl')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(record_for('a'), ensure_ascii=False) + '\n')
+        f.write(json.dumps(record_for('b'), ensure_ascii=False) + '\n')
+        f.write('{"key": "c", "wiki_ke')
+
+    assert [record['key'] for record in ItemJournal.load(path)] == ['a', 'b']
+    journal = ItemJournal(path, resume=True)
+    assert [record['key'] for record in journal.recovered] == ['a', 'b']
+    journal.append(record_for('c'))
+    journal.flush()
+    assert [record['key'] for record in ItemJournal.load(path)] == ['a', 'b', 'c']
+
+
+def test_resume_skips_journaled_items_and_matches_fresh_run(fake_run, capsys):
+    """中断后续跑只处理剩下的物品，合并后的tip文件与一次跑完的结果逐字节相同"""
+    assert fake_run([]) == ['a', 'b', 'c', 'd', 'e']
+    fresh = read_output()
+    os.remove(generate_all_itemtips.OUTPUT_FILE)
+
+    with pytest.raises(KeyboardInterrupt):
+        fake_run([], crash_at='c')
+    assert [record['key'] for record in ItemJournal.load(generate_all_itemtips.JOURNAL_FILE)] == ['a', 'b']
+    assert not os.path.exists(generate_all_itemtips.OUTPUT_FILE)
+
+    assert fake_run(['--resume']) == ['c', 'd', 'e']
+    assert read_output() == fresh
+    assert [record['key'] for record in ItemJournal.load(generate_all_itemtips.JOURNAL_FILE)] == list(SAMPLE['items'])
+
+
+def test_run_without_resume_truncates_journal(fake_run, capsys):
+    """不加--resume时清空上次的日志，所有物品重新处理"""
+    with pytest.raises(KeyboardInterrupt):
+        fake_run([], crash_at='d')
+    assert len(ItemJournal.load(generate_all_itemtips.JOURNAL_FILE)) == 3
+
+    with pytest.raises(KeyboardInterrupt):
+        fake_run([], crash_at='b')
+    assert [record['key'] for record in ItemJournal.load(generate_all_itemtips.JOURNAL_FILE)] == ['a']
+
+
+def test_plan_only_saves_manifest_and_keeps_journal(fake_run, tmp_path, capsys):
+    """只打印计划时不改动上次的日志，退出前仍然关闭页面缓存并保存缓存清单"""
+    with pytest.raises(KeyboardInterrupt):
+        fake_run([], crash_at='c')
+    with open(generate_all_itemtips.JOURNAL_FILE, 'rb') as f:
+        journal = f.read()
+
+    # 清单中还没有的页面在打开缓存时登记，清单因此需要保存
+    (tmp_path / 'cache' / 'new_page.html').write_text('<html></html>', encoding='utf-8')
+    assert fake_run(['--plan-only']) == []
+    with open(tmp_path / 'cache' / 'manifest.json', 'r', encoding='utf-8') as f:
+        assert 'new_page' in json.load(f)['entries']
+    with open(generate_all_itemtips.JOURNAL_FILE, 'rb') as f:
+        assert f.read() == journal
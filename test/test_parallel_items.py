@@ -0,0 +1,79 @@
+import os
+import sys
+import time
+
+import pytest
+
+# 将项目根目录添加到Python路径中
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import generate_all_itemtips
+
+# 前面的物品解析得慢，后面的先处理完；bad解析时出错，unreachable读取页面时出错，missing没有页面
+ITEMS = [(key, {'name': f'{key}中文', 'notes': f'{key} notes'})
+         for key in ['slow', 'fast1', 'bad', 'slower', 'unreachable', 'fast2', 'missing', 'fast3']]
+DELAYS = {'slow': 0.3, 'slower': 0.5}
+
+
+def load_item_page(key, item_data, key_to_wikikey):
+    if key == 'unreachable':
+        raise ConnectionError(f'无法获取 {key}')
+    if key == 'missing':
+        return None
+    return {'key': key, 'wiki_key': key, 'name': item_data['name'], 'html': f'<p>{key}</p>'}
+
+
+def extract_item_page(page, cache=None):
+    time.sleep(DELAYS.get(page['key'], 0))
+    if page['key'] == 'bad':
+        raise ValueError(f"解析 {page['key']} 失败")
+    return f"{page['key']} 描述", []
+
+
+def build_item_record(page, item_data, description, synergies, sample_data, enemy_mapping,
+                      synergy_name_to_key, synergy_cn_to_key):
+    # 工作进程中写的记录行要按物品顺序出现在文件中
+    generate_all_itemtips.append_report_line('report.txt', f"{page['key']} {os.getpid()}")
+    return {'key': page['key'], 'wiki_key': page['wiki_key'], 'name': page['name'], 'notes': description,
+            'synergies': synergies}
+
+
+@pytest.fixture
+def patched(tmp_path, monkeypatch):
+    """替换页面读取和提取，工作进程由fork创建，继承这些替换"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(generate_all_itemtips, 'load_item_page', load_item_page)
+    monkeypatch.setattr(generate_all_itemtips, 'extract_item_page', extract_item_page)
+    monkeypatch.setattr(generate_all_itemtips, 'build_item_record', build_item_record)
+    monkeypatch.setattr(generate_all_itemtips, 'EXTRACTION_CACHE', None)
+    monkeypatch.setattr(generate_all_itemtips, 'ITEMS_IN_FLIGHT_PER_JOB', 1)
+    context = {'sample_data': {}, 'enemy_mapping': {}, 'synergy_name_to_key': {}, 'synergy_cn_to_key': {}}
+    return context
+
+
+def read_report():
+    """记录文件中每行的(物品key, 写入进程的pid)"""
+    with open('report.txt', 'r', encoding='utf-8') as f:
+        return [(key, int(pid)) for key, pid in (line.split() for line in f)]
+
+
+def test_parallel_results_match_serial_order(patched):
+    """快慢不一的物品按items的顺序合并，出错的物品报告各自的错误"""
+    serial = list(generate_all_itemtips.iter_item_results(ITEMS, {}, patched))
+    serial_report = read_report()
+    os.remove('report.txt')
+
+    parallel = list(generate_all_itemtips.iter_item_results_parallel(ITEMS, 2, {}, patched))
+    assert parallel == serial
+    parallel_report = read_report()
+    assert [key for key, _ in parallel_report] == [key for key, _ in serial_report]
+    # 记录行在工作进程中产生，由主进程按物品顺序写入
+    assert all(pid != os.getpid() for _, pid in parallel_report)
+
+    results = {key: (record, error) for key, record, error in parallel}
+    assert [key for key, _, _ in parallel] == [key for key, _ in ITEMS]
+    assert results['bad'] == (None, '解析 bad 失败')
+    assert results['unreachable'] == (None, '无法获取 unreachable')
+    assert results['missing'] == (None, None)
+    assert results['fast3'][0]['notes'] == 'fast3 描述'
+    assert [key for key, _ in serial_report] == ['slow', 'fast1', 'slower', 'fast2', 'fast3']
@@ -0,0 +1,141 @@
+import os
+import random
+import sys
+
+import pytest
+
+# 将项目根目录添加到Python路径中
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etg_parser.retry import DEFAULT_POLICIES, AIMDLimiter, CircuitBreaker, FetchError, RetryEngine
+
+
+class FakeClock:
+    """手动推进的时钟，sleep直接把时间往前拨"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def failing(kind, calls):
+    """总是以kind类错误失败的请求函数，调用次数记在calls中"""
+    def fetch():
+        calls.append(kind)
+        raise FetchError(kind)
+    return fetch
+
+
+def make_engine(clock, **kwargs):
+    return RetryEngine(sleep=clock.sleep, clock=clock, rng=random.Random(0), **kwargs)
+
+
+def test_breaker_open_half_open_closed(capsys):
+    """连续失败熔断，暂停结束后半开放行一个探测，探测成功恢复"""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=10.0, sleep=clock.sleep, clock=clock)
+    breaker.record_failure('server')
+    assert breaker.state == 'closed'
+    breaker.record_failure('timeout')
+    assert breaker.state == 'open' and breaker.trips == 1
+
+    # 熔断期间请求要等到暂停结束，之后进入半开状态
+    breaker.before_request()
+    assert clock.slept == [10.0]
+    assert breaker.state == 'half_open'
+
+    breaker.record_success()
+    assert breaker.state == 'closed' and breaker.consecutive_failures == 0
+    breaker.before_request()
+    assert clock.slept == [10.0]
+
+
+def test_breaker_failed_probe_doubles_cooldown(capsys):
+    """半开状态下探测失败再次熔断，暂停时间加倍但不超过上限"""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10.0, max_cooldown=15.0, sleep=clock.sleep, clock=clock)
+    breaker.record_failure('throttled')
+    breaker.before_request()
+    breaker.record_failure('server')
+    assert breaker.state == 'open' and breaker.cooldown == 15.0 and breaker.trips == 2
+    assert breaker.open_until == clock.now + 15.0
+
+    # 与站点无关的失败不触发熔断，只释放探测名额
+    breaker.before_request()
+    breaker.record_failure('client')
+    assert breaker.state == 'half_open'
+    breaker.before_request()
+    assert breaker.state == 'half_open'
+
+
+def test_aimd_bounds():
+    """成功时加性增长不超过上限，失败或延迟过高时乘性减小不低于下限"""
+    limiter = AIMDLimiter(initial=2, min_limit=1, max_limit=4, target_latency=1.0)
+    for _ in range(100):
+        limiter.on_success(0.1)
+    assert limiter.limit == 4 and limiter.peak_limit == 4
+
+    limiter.on_success(5.0)
+    assert limiter.limit == 2
+    for _ in range(10):
+        limiter.on_failure()
+    assert limiter.limit == 1 and limiter.lowest_limit == 1
+
+    limiter.on_success(0.1)
+    assert limiter.limit == 2
+
+
+@pytest.mark.parametrize('kind', sorted(DEFAULT_POLICIES))
+def test_retry_count_per_kind(kind, capsys):
+    """每类错误按各自策略重试，之后抛出最后一次的异常"""
+    clock = FakeClock()
+    engine = make_engine(clock, breaker=CircuitBreaker(failure_threshold=100, sleep=clock.sleep, clock=clock))
+    calls = []
+    with pytest.raises(FetchError):
+        engine.call(failing(kind, calls))
+    max_retries = DEFAULT_POLICIES[kind].max_retries
+    assert len(calls) == max_retries + 1
+    assert len(clock.slept) == max_retries
+    assert engine.retries.get(kind, 0) == max_retries
+    assert engine.failures == 1 and engine.successes == 0
+    # 退避时间不超过策略的上限
+    assert all(0 <= delay <= DEFAULT_POLICIES[kind].max_delay for delay in clock.slept)
+
+
+def test_engine_retry_cap(capsys):
+    """引擎的max_retries限制所有策略"""
+    clock = FakeClock()
+    engine = make_engine(clock, max_retries=1)
+    calls = []
+    with pytest.raises(FetchError):
+        engine.call(failing('throttled', calls))
+    assert len(calls) == 2
+
+
+def test_non_retryable_error_fails_immediately(capsys):
+    """4xx不重试、不等待，也不计入熔断"""
+    clock = FakeClock()
+    engine = make_engine(clock)
+    calls = []
+    with pytest.raises(FetchError):
+        engine.call(failing('client', calls))
+    assert calls == ['client']
+    assert clock.slept == []
+    assert engine.breaker.consecutive_failures == 0
+
+
+def test_retry_then_success(capsys):
+    """失败后重试成功返回结果，空结果按'empty'处理"""
+    clock = FakeClock()
+    engine = make_engine(clock)
+    results = iter([None, 'page'])
+    assert engine.call(lambda: next(results)) == 'page'
+    assert engine.retries == {'empty': 1}
+    assert engine.successes == 1
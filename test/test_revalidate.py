@@ -0,0 +1,80 @@
+import os
+import sys
+
+import pytest
+
+# 将项目根目录添加到Python路径中
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etg_cache import BlobStore, DirectoryCache, SqliteCache, is_trimmed, revalidate_cache, trim_page
+from etg_parser.fetch_backends import PageResponse
+
+REAL_PAGE = '<html><body><div id="page-content"><p>蜂巢 v1</p></div></body></html>'
+CHANGED_PAGE = '<html><body><div id="page-content"><p>蜂巢 v2</p></div></body></html>'
+STUB_PAGE = '<html><body><div id="page-content"><p>页面 <em>bee_hive</em> 不存在</p></div></body></html>'
+
+
+class FakeBackend:
+    """按wiki_key返回固定页面，记录请求过的key"""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+
+    def fetch_page(self, wiki_key, headers=None):
+        self.requested.append(wiki_key)
+        return PageResponse(f"https://example.invalid/{wiki_key}", self.pages[wiki_key], status_code=200)
+
+
+@pytest.fixture(params=['sqlite', 'blob'])
+def aliased_cache(request, tmp_path):
+    if request.param == 'sqlite':
+        cache = SqliteCache(str(tmp_path / 'cache.sqlite3'))
+    else:
+        cache = BlobStore(str(tmp_path / 'blob'))
+    cache.save('bee-hive', REAL_PAGE)
+    assert cache.link('bee_hive', 'bee-hive')
+    yield cache
+    cache.close()
+
+
+def test_alias_survives_revalidation(aliased_cache, capsys):
+    """别名不会被单独请求，页面更新后别名读到的也是新页面"""
+    backend = FakeBackend({'bee-hive': CHANGED_PAGE, 'bee_hive': STUB_PAGE})
+    report = revalidate_cache(aliased_cache, backend)
+
+    assert backend.requested == ['bee-hive']
+    assert report.changed == 1 and report.checked == 1
+    assert aliased_cache.alias_target('bee_hive') == 'bee-hive'
+    assert aliased_cache.get('bee_hive') == CHANGED_PAGE
+    assert aliased_cache.page_keys() == ['bee-hive']
+
+
+def test_explicit_alias_key_is_resolved(aliased_cache, capsys):
+    """直接传入别名时验证它指向的页面，同一页面只验证一次"""
+    backend = FakeBackend({'bee-hive': CHANGED_PAGE, 'bee_hive': STUB_PAGE})
+    revalidate_cache(aliased_cache, backend, keys=['bee_hive', 'bee-hive'])
+
+    assert backend.requested == ['bee-hive']
+    assert aliased_cache.get('bee_hive') == CHANGED_PAGE
+
+
+def test_trimmed_page_without_metadata_stays_trimmed(tmp_path, capsys):
+    """用trim_cache.py裁剪、还没有元数据的页面，内容变化后仍以裁剪形式保存"""
+    cache = DirectoryCache(str(tmp_path / 'cache'))
+    with open(tmp_path / 'cache' / 'bee-hive.html', 'w', encoding='utf-8') as f:
+        f.write(trim_page(REAL_PAGE))
+    assert cache.get_metadata('bee-hive') is None
+
+    report = revalidate_cache(cache, FakeBackend({'bee-hive': CHANGED_PAGE}))
+    assert report.changed == 1
+    assert cache.get('bee-hive') == trim_page(CHANGED_PAGE)
+    assert cache.get_metadata('bee-hive')['trimmed']
+
+
+def test_trim_option_applies_to_changed_pages(tmp_path, capsys):
+    """指定trim时（--trim-pages），有变化的页面和新下载的页面一样裁剪后保存"""
+    cache = DirectoryCache(str(tmp_path / 'cache'))
+    cache.save('bee-hive', REAL_PAGE)
+    revalidate_cache(cache, FakeBackend({'bee-hive': CHANGED_PAGE}), trim=True)
+    assert is_trimmed(cache.get('bee-hive'))
@@ -0,0 +1,66 @@
+import contextlib
+import io
+import os
+import sys
+
+# 将项目根目录添加到Python路径中
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etg_parser import ParsedPage, extract_item_description, extract_item_streaming, extract_item_synergies
+from etg_parser.stream_extractor import StreamingExtractor
+from etg_parser.synergy_parser import collect_synergies
+
+
+def synergy(cn, en, tips):
+    return (f'<div class="synergy-container"><div class="foldable-list-container">'
+            f'<span class="cn" data-title="{cn}">{cn}</span><br>\n<span class="en" data-title="{en}">{en}</span><br>\n'
+            f'<a href="javascript:;">+</a></div>'
+            f'<div class="tips">{tips}</div></div>')
+
+
+PAGE = f"""<!DOCTYPE html>
+<html><head><title>x</title><script>var a = "<div class='infobox-container'>";</script></head>
+<body><div id="page-content">
+<div class="infobox-container"><div class="title">Other Gun</div></div>
+<p>不相关的描述</p>
+{synergy('别的联动', 'Other', '<p>无关</p>')}
+<div class="outer">
+  <div class="infobox-container"><div class="title">Test Gun 测试枪</div><table><tr><td>1</td></tr></table></div>
+  射速提升：10。&amp; 伤害&#x2B;1级<br/>
+  <a href="/x"><img alt="Other_Gun.png" src="a.png"></a>  换行
+
+  <tt>   预格式   </tt><img alt="bullet.png">
+  <div class="unlock">解锁</div>
+  {synergy('联动一', 'Synergy One', '<p>射速：<b>提升</b>&#128;。</p><ul><li>一</li><li>二</li></ul>')}
+</div>
+{synergy('联动二', '{$en-title}', '<p>只有中文<img alt="Casey.png"></p>')}
+</div></body></html>
+"""
+
+
+def extract_both(html_content, item_name_en, item_name_cn=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        page = ParsedPage(html_content)
+        dom = (extract_item_description(page, item_name_en, item_name_cn), extract_item_synergies(page))
+        stream = extract_item_streaming(html_content, item_name_en, item_name_cn)
+    return dom, stream
+
+
+def test_stream_matches_dom():
+    """流式提取与文档树提取的描述和联动完全一致"""
+    for name_en, name_cn in [('test_gun', None), ('test-gun', '测试枪'), ('missing', None), ('other_gun', None)]:
+        dom, stream = extract_both(PAGE, name_en, name_cn)
+        assert stream == dom, name_en
+    dom, _ = extract_both(PAGE, 'test_gun')
+    assert dom[0] and len(dom[1]) == 3
+
+
+def test_small_chunks():
+    """分块边界落在标签、字符引用中间时结果不变"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        page = ParsedPage(PAGE)
+        expected = (extract_item_description(page, 'test_gun'), extract_item_synergies(page))
+        for chunk_size in (1, 7, 64):
+            extractor = StreamingExtractor('test_gun')
+            synergies = collect_synergies(extractor.iter_synergy_containers(PAGE, chunk_size))
+            assert (extractor.description(), synergies) == expected, chunk_size
@@ -0,0 +1,52 @@
+import os
+import random
+import sys
+
+# 将项目根目录添加到Python路径中
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etg_parser.text_normalizer import (DESCRIPTION_CLEANUP, DESCRIPTION_CLEANUP_STEPS, DESCRIPTION_SPACING,
+                                        DESCRIPTION_SPACING_STEPS, SYNERGY_CLEANUP, SYNERGY_CLEANUP_STEPS,
+                                        TextNormalizer, apply_steps)
+
+NORMALIZERS = [
+    (DESCRIPTION_SPACING, DESCRIPTION_SPACING_STEPS),
+    (DESCRIPTION_CLEANUP, DESCRIPTION_CLEANUP_STEPS),
+    (SYNERGY_CLEANUP, SYNERGY_CLEANUP_STEPS),
+]
+
+# 规则关心的字符：各种标点、数字和“级”、普通文字、各种空白
+ALPHABET = ['。', '！', '？', '：', ':', '1', '级', 'a', '-', '{', ' ', ' ', '\n', '\n', '\t', '　', '\xa0']
+
+
+def test_known_cases():
+    """几个逐条执行时结果不直观的例子"""
+    cases = [
+        '攻击力：10。射速提升',
+        '1级\n\n\n2级：x',
+        '提升。\n- 列表项。\n- 列表项！',
+        '。。。x',
+        'a  \n  b',
+        'a\n\nb',
+        'a \n \nb',
+        '\n  开头和结尾  \n',
+        '',
+    ]
+    for text in cases:
+        for normalizer, steps in NORMALIZERS:
+            assert normalizer.sub(text) == apply_steps(text, steps), repr(text)
+
+
+def test_random_texts_match_sequential_rules():
+    """随机文本上，合并后的规则与逐条执行re.sub的结果完全一致"""
+    rng = random.Random(20240601)
+    for _ in range(20000):
+        text = ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 16)))
+        for normalizer, steps in NORMALIZERS:
+            assert normalizer.sub(text) == apply_steps(text, steps), repr(text)
+
+
+def test_group_references_are_renumbered():
+    """合并后规则内部的分组引用仍然指向规则自己的分组"""
+    normalizer = TextNormalizer([(r'(a)(b)', r'\2\1'), (r'(c)', r'[\g<1>]'), (r'd', '\n')])
+    assert normalizer.sub('abcd') == 'ba[c]\n'
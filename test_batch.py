@@ -6,7 +6,8 @@ import codecs
 import os
 import logging
 from etg_parser.extract_item_tips import extract_item_description, extract_item_synergies, get_page_content_selenium
-from generate_all_itemtips import load_itemtips_sample, find_synergy_key, replace_placeholders, normalize_key_for_url
+from generate_all_itemtips import (load_itemtips_sample, find_synergy_key, replace_placeholders, normalize_key_for_url,
+                                   get_cache_index, get_page_cache, save_page_to_cache)
 
 # 配置日志
 logging.basicConfig(
@@ -37,12 +38,9 @@ def get_page_content(key):
     返回:
     - 页面HTML内容
     """
-    cache_file = os.path.join(CACHE_DIR, f"{key}.html")
-    
-    # 如果缓存存在，直接返回缓存内容
-    if os.path.exists(cache_file):
-        with open(cache_file, 'r', encoding='utf-8') as f:
-            return f.read()
+    # 如果缓存存在，直接返回缓存内容（通过共享的缓存索引判断，不逐个探测文件）
+    if get_cache_index().lookup(key):
+        return get_page_cache().get(key)
     
     # 构建URL
     url_key = normalize_key_for_url(key)
@@ -53,8 +51,8 @@ def get_page_content(key):
         html_content = get_page_content_selenium(url)
         
         # 保存到缓存
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        if html_content:
+            save_page_to_cache(key, html_content)
             
         return html_content
     except Exception as e:
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+离线抓取基准测试
+
+启动本地模拟wiki服务器，用指定的后端、并发数和限速抓取缓存中的页面，
+统计吞吐量、延迟、重试和熔断情况。可以设置最低成功率和吞吐量作为回归检查。
+"""
+
+import argparse
+import os
+import sys
+
+# 添加父目录到系统路径，以便导入etg_parser模块
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etg_parser.crawler import AsyncCrawler, DEFAULT_REQUESTS_PER_SECOND
+from etg_parser.driver_pool import close_driver_pool, configure_driver_pool
+from etg_parser.fetch_backends import FETCH_BACKENDS, HttpBackend, create_fetch_backend
+from etg_parser.retry import AIMDLimiter, CircuitBreaker, RetryEngine
+from etg_cache import content_hash, list_cached_keys
+from utils.mock_wiki_server import MockWikiConfig, MockWikiServer
+
+CACHE_DIR = 'cache'
+
+
+def create_backend(name, max_concurrency):
+    """
+    创建基准测试使用的后端；HTTP后端不回退到浏览器，便于单独测量
+    """
+    if name == 'http':
+        return HttpBackend(pool_size=max(10, max_concurrency), fallback=False)
+    if name == 'selenium':
+        configure_driver_pool(size=max_concurrency)
+    return create_fetch_backend(name)
+
+
+def run_benchmark(keys, backend_name='http', max_concurrency=4, requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+                  config=None, cache_dir=CACHE_DIR, breaker_cooldown=5.0, verify=True):
+    """
+    对模拟服务器运行一次抓取
+
+    参数:
+    - keys: 要抓取的wiki_key列表
+    - backend_name: 页面获取后端名称
+    - max_concurrency: 最大并发数
+    - requests_per_second: 每个host的限速
+    - config: MockWikiConfig故障注入配置
+    - cache_dir: 模拟服务器提供页面的目录
+    - breaker_cooldown: 熔断暂停时间（秒），基准测试中通常比正式抓取短
+    - verify: 是否校验抓到的页面和缓存内容一致
+
+    返回:
+    - (crawler, retry_engine, server, mismatched_keys)
+    """
+    server = MockWikiServer(cache_dir, config).start()
+    backend = create_backend(backend_name, max_concurrency)
+    limiter = AIMDLimiter(initial=max_concurrency, max_limit=max_concurrency) if max_concurrency > 1 else None
+    retry_engine = RetryEngine(breaker=CircuitBreaker(cooldown=breaker_cooldown), limiter=limiter)
+    crawler = AsyncCrawler(backend, max_concurrency=max_concurrency,
+                           requests_per_second=requests_per_second, retry_engine=retry_engine)
+    mismatched = []
+    try:
+        results = crawler.run([server.base_url + key for key in keys])
+        if verify:
+            for key in keys:
+                page = results.get(server.base_url + key)
+                if page is None or page.html is None:
+                    continue
+                with open(os.path.join(cache_dir, f"{key}.html"), 'r', encoding='utf-8') as f:
+                    expected = f.read()
+                # 浏览器返回的是渲染后的DOM，只对HTTP后端做逐字节比较
+                if backend_name == 'http' and content_hash(page.html) != content_hash(expected):
+                    mismatched.append(key)
+    finally:
+        backend.close()
+        server.stop()
+        close_driver_pool()
+    return crawler, retry_engine, server, mismatched
+
+
+def main():
+    parser = argparse.ArgumentParser(description='用本地模拟wiki服务器测试抓取性能')
+    parser.add_argument('--backend', type=str, choices=sorted(FETCH_BACKENDS), default='http',
+                        help='页面获取后端 (默认: http)')
+    parser.add_argument('--cache-dir', type=str, default=CACHE_DIR, help=f'模拟服务器提供页面的目录 (默认: {CACHE_DIR})')
+    parser.add_argument('--limit', type=int, default=0, help='只抓取前N个页面 (默认: 全部)')
+    parser.add_argument('--max-concurrency', type=int, default=8, help='最大并发数 (默认: 8)')
+    parser.add_argument('--rate', type=float, default=50.0, help='客户端每秒请求数上限 (默认: 50)')
+    parser.add_argument('--latency', type=float, default=0.05, help='服务器基础延迟，秒 (默认: 0.05)')
+    parser.add_argument('--jitter', type=float, default=0.05, help='服务器随机附加延迟上限，秒 (默认: 0.05)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='服务器随机返回5xx的概率 (默认: 0)')
+    parser.add_argument('--throttle-rps', type=float, default=0.0, help='服务器限流阈值，每秒请求数 (默认: 0，不限流)')
+    parser.add_argument('--seed', type=int, default=1, help='故障注入的随机数种子 (默认: 1)')
+    parser.add_argument('--breaker-cooldown', type=float, default=5.0, help='熔断暂停时间，秒 (默认: 5)')
+    parser.add_argument('--min-success-rate', type=float, default=0.0, help='成功率低于该值时以非零状态退出 (0~1)')
+    parser.add_argument('--min-throughput', type=float, default=0.0, help='吞吐量(页/秒)低于该值时以非零状态退出')
+    args = parser.parse_args()
+
+    keys = list_cached_keys(args.cache_dir)
+    if args.limit:
+        keys = keys[:args.limit]
+    if not keys:
+        print(f"{args.cache_dir} 中没有可用的页面")
+        sys.exit(1)
+
+    config = MockWikiConfig(args.latency, args.jitter, args.error_rate, args.throttle_rps, args.seed)
+    print(f"基准测试: 后端 {args.backend}，页面 {len(keys)}，并发 {args.max_concurrency}，限速 {args.rate}/秒")
+    crawler, retry_engine, server, mismatched = run_benchmark(
+        keys, args.backend, args.max_concurrency, args.rate, config, args.cache_dir, args.breaker_cooldown)
+
+    print()
+    print(crawler.report())
+    print(retry_engine.report())
+    print(server.stats.report())
+    if mismatched:
+        print(f"内容不一致的页面: {', '.join(mismatched)}")
+
+    total = crawler.fetched + crawler.failed
+    success_rate = crawler.fetched / total if total else 0.0
+    throughput = total / crawler.elapsed if crawler.elapsed else 0.0
+    print(f"\n成功率: {success_rate:.1%}，吞吐量: {throughput:.2f} 页/秒")
+
+    failed_checks = []
+    if success_rate < args.min_success_rate:
+        failed_checks.append(f"成功率 {success_rate:.1%} 低于 {args.min_success_rate:.1%}")
+    if throughput < args.min_throughput:
+        failed_checks.append(f"吞吐量 {throughput:.2f} 低于 {args.min_throughput:.2f} 页/秒")
+    if mismatched:
+        failed_checks.append(f"{len(mismatched)} 个页面内容不一致")
+    if failed_checks:
+        print("基准检查未通过: " + "；".join(failed_checks))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+比较合并后的文本规则（etg_parser.text_normalizer）与原来逐条执行re.sub的用时，并检查结果是否一致
+
+先提取缓存页面，记录描述和联动在格式处理之前的原始文本，再在这些文本上反复计时:
+- spacing: process_content在追加列表之前的规则
+- cleanup: process_content最后的清理
+- synergy: process_synergy_content的清理
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+# 添加父目录到系统路径，以便导入etg_parser和etg_cache模块
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etg_cache import CACHE_BACKENDS, PAGE_VALID, ManagedCache, create_page_cache
+from etg_parser import ParsedPage, extract_item_description, extract_item_synergies, item_parser, synergy_parser
+from etg_parser import text_normalizer
+
+
+class RecordingNormalizer:
+    """记录传给规则的每段原始文本，结果照常返回"""
+
+    def __init__(self, normalizer):
+        self.normalizer = normalizer
+        self.inputs = []
+
+    def sub(self, text):
+        self.inputs.append(text)
+        return self.normalizer.sub(text)
+
+
+def collect_inputs(pages):
+    """
+    提取全部页面，返回各组规则收到的原始文本
+
+    返回:
+    - {'spacing': [...], 'cleanup': [...], 'synergy': [...]}
+    """
+    recorders = {
+        'spacing': (item_parser, 'DESCRIPTION_SPACING'),
+        'cleanup': (item_parser, 'DESCRIPTION_CLEANUP'),
+        'synergy': (synergy_parser, 'SYNERGY_CLEANUP'),
+    }
+    originals = {name: getattr(module, attr) for name, (module, attr) in recorders.items()}
+    for name, (module, attr) in recorders.items():
+        setattr(module, attr, RecordingNormalizer(originals[name]))
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for wiki_key, html_content in pages.items():
+                page = ParsedPage(html_content)
+                extract_item_description(page, wiki_key)
+                extract_item_synergies(page)
+        return {name: getattr(module, attr).inputs for name, (module, attr) in recorders.items()}
+    finally:
+        for name, (module, attr) in recorders.items():
+            setattr(module, attr, originals[name])
+
+
+def best_time(func, texts, repeat):
+    """对全部文本执行func，重复repeat次，返回最快一次的用时（秒）"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            func(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='比较合并后的文本规则与逐条执行re.sub的用时')
+    parser.add_argument('--cache-backend', type=str, choices=sorted(CACHE_BACKENDS), default='dir',
+                        help='页面缓存后端 (默认: dir)')
+    parser.add_argument('--cache-path', type=str, default=None, help='页面缓存路径 (默认: 后端的默认路径)')
+    parser.add_argument('--limit', type=int, default=None, help='只使用前N个页面 (默认: 全部正常页面)')
+    parser.add_argument('--repeat', type=int, default=20, help='每组文本重复计时的次数，取最快一次 (默认: 20)')
+    args = parser.parse_args()
+
+    cache = ManagedCache(create_page_cache(args.cache_backend, args.cache_path))
+    keys = cache.keys_by_status(PAGE_VALID)[:args.limit]
+    pages = cache.get_many(keys)
+    cache.close()
+    print(f"提取 {len(pages)} 个页面，记录格式处理之前的文本...")
+    inputs = collect_inputs(pages)
+
+    normalizers = {
+        'spacing': (text_normalizer.DESCRIPTION_SPACING, text_normalizer.DESCRIPTION_SPACING_STEPS),
+        'cleanup': (text_normalizer.DESCRIPTION_CLEANUP, text_normalizer.DESCRIPTION_CLEANUP_STEPS),
+        'synergy': (text_normalizer.SYNERGY_CLEANUP, text_normalizer.SYNERGY_CLEANUP_STEPS),
+    }
+    mismatched = 0
+    total_steps = total_combined = 0.0
+    for name, (normalizer, steps) in normalizers.items():
+        texts = inputs[name]
+        different = sum(1 for text in texts if normalizer.sub(text) != text_normalizer.apply_steps(text, steps))
+        mismatched += different
+        steps_time = best_time(lambda text: text_normalizer.apply_steps(text, steps), texts, args.repeat)
+        combined_time = best_time(normalizer.sub, texts, args.repeat)
+        total_steps += steps_time
+        total_combined += combined_time
+        print(f"{name:>8}: {len(texts)} 段文本，逐条 {len(steps)} 次re.sub {steps_time * 1000:.2f} ms，"
+              f"合并后一次扫描 {combined_time * 1000:.2f} ms（快 {steps_time / combined_time:.1f} 倍），"
+              f"结果不同 {different} 段")
+    print(f"{'合计':>8}: {total_steps * 1000:.2f} ms -> {total_combined * 1000:.2f} ms")
+    if mismatched:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+在缓存页面上比较完整解析和部分解析（只解析#page-content）的用时和峰值内存
+
+对每种解析后端分别报告:
+- 解析全部页面的总用时
+- 单个页面解析时的平均和最大峰值内存（tracemalloc）
+- 部分解析的提取结果与完整解析是否一致
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+# 添加父目录到系统路径，以便导入etg_parser和etg_cache模块
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etg_cache import CACHE_BACKENDS, PAGE_VALID, ManagedCache, create_page_cache
+from etg_parser import PARSER_BACKENDS, ParsedPage, extract_item_description, extract_item_synergies, parse_mode
+from etg_parser.parsed_page import check_parser_backend
+
+
+def time_parse(pages, backend, partial):
+    """解析全部页面，返回总用时（秒）"""
+    start = time.perf_counter()
+    for html_content in pages.values():
+        ParsedPage(html_content, backend, partial)
+    return time.perf_counter() - start
+
+
+def measure_peak(pages, backend, partial):
+    """
+    逐个页面解析并记录峰值内存
+
+    返回:
+    - (平均峰值, 最大峰值)，单位为字节
+    """
+    peaks = []
+    tracemalloc.start()
+    for html_content in pages.values():
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        page = ParsedPage(html_content, backend, partial)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+        del page
+    tracemalloc.stop()
+    return sum(peaks) / len(peaks), max(peaks)
+
+
+def extract(html_content, wiki_key, backend, partial):
+    with contextlib.redirect_stdout(io.StringIO()):
+        page = ParsedPage(html_content, backend, partial)
+        return extract_item_description(page, wiki_key), extract_item_synergies(page)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='比较完整解析和部分解析的用时和峰值内存')
+    parser.add_argument('--backends', nargs='+', choices=sorted(PARSER_BACKENDS), default=sorted(PARSER_BACKENDS),
+                        metavar='BACKEND', help='要测试的解析后端 (默认: 全部)')
+    parser.add_argument('--cache-backend', type=str, choices=sorted(CACHE_BACKENDS), default='dir',
+                        help='页面缓存后端 (默认: dir)')
+    parser.add_argument('--cache-path', type=str, default=None, help='页面缓存路径 (默认: 后端的默认路径)')
+    parser.add_argument('--limit', type=int, default=None, help='只使用前N个页面 (默认: 全部正常页面)')
+    parser.add_argument('--skip-check', action='store_true', help='不检查部分解析的提取结果是否与完整解析一致')
+    args = parser.parse_args()
+
+    backends = []
+    for backend in args.backends:
+        try:
+            backends.append(check_parser_backend(backend))
+        except ValueError as e:
+            print(f"跳过: {e}")
+
+    cache = ManagedCache(create_page_cache(args.cache_backend, args.cache_path))
+    keys = cache.keys_by_status(PAGE_VALID)[:args.limit]
+    pages = cache.get_many(keys)
+    cache.close()
+    total_size = sum(len(html_content.encode('utf-8')) for html_content in pages.values())
+    print(f"页面: {len(pages)}，共 {total_size / 1024 / 1024:.1f} MB")
+
+    for backend in backends:
+        results = {}
+        for partial in (False, True):
+            elapsed = time_parse(pages, backend, partial)
+            mean_peak, max_peak = measure_peak(pages, backend, partial)
+            results[partial] = elapsed
+            print(f"{parse_mode(backend, partial):>20}: 用时 {elapsed:.2f} 秒 ({elapsed / len(pages) * 1000:.1f} ms/页)，"
+                  f"峰值内存 平均 {mean_peak / 1024 / 1024:.1f} MB，最大 {max_peak / 1024 / 1024:.1f} MB")
+        if results[True]:
+            print(f"{'':>20}  部分解析快 {results[False] / results[True]:.1f} 倍")
+
+        if not args.skip_check:
+            mismatched = [key for key, html_content in pages.items()
+                          if extract(html_content, key, backend, False) != extract(html_content, key, backend, True)]
+            if mismatched:
+                print(f"{'':>20}  提取结果不一致的页面 ({len(mismatched)}): {', '.join(mismatched)}")
+            else:
+                print(f"{'':>20}  提取结果与完整解析一致")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+页面缓存管理工具
+
+子命令:
+- migrate: 把页面和元数据从一种缓存后端复制到另一种（例如目录缓存 -> 内容寻址存储）
+- import: 把目录格式的缓存导入指定后端
+- export: 把指定后端的缓存导出为目录格式（每个页面一个HTML文件和元数据文件）
+- pack: 把缓存打包成内存映射的只读文件，用于全量重跑和基准测试
+- stats: 显示缓存大小、命中率和页面年龄分布
+- gc: 删除过期页面，并按容量上限淘汰页面
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+
+# 添加父目录到系统路径，以便导入etg_cache模块
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etg_cache import (CACHE_BACKENDS, EVICTION_POLICIES, CachePolicy, ManagedCache, PackedArchive, build_pack,
+                       copy_pages, create_page_cache)
+
+ALIASES_CSV = 'invalid_pages.csv'
+
+
+def load_item_aliases(csv_path):
+    """
+    从invalid_pages.csv读取物品key到wiki_key的映射
+
+    返回:
+    - {物品key: 标准化后的wiki_key}
+    """
+    aliases = {}
+    if not os.path.exists(csv_path):
+        return aliases
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            wiki_key = row['正确htmlKey'].strip()
+            if wiki_key:
+                # 与generate_all_itemtips.normalize_key_for_url的标准化保持一致
+                aliases[row['项目ID']] = wiki_key.replace('_', '-').lower()
+    return aliases
+
+
+def read_all(cache):
+    """读取缓存中的所有页面，返回(页面数, 用时)"""
+    start = time.time()
+    keys = cache.keys()
+    for key in keys:
+        cache.get(key)
+    return len(keys), time.time() - start
+
+
+def migrate(args):
+    source = create_page_cache(args.source, args.source_path)
+    target = create_page_cache(args.target, args.target_path)
+    print(f"迁移 {source.describe()} -> {target.name} ({target.path})")
+
+    start = time.time()
+    copied = copy_pages(source, target)
+    linked = 0
+    aliases = load_item_aliases(args.aliases) if args.aliases else {}
+    for item_key, wiki_key in aliases.items():
+        if target.link(item_key, wiki_key):
+            linked += 1
+    if hasattr(target, 'compact'):
+        target.compact()
+    print(f"复制页面: {copied}，新增物品别名: {linked}，用时 {time.time() - start:.2f} 秒")
+
+    before, after = source.disk_usage(), target.disk_usage()
+    ratio = after / before if before else 0.0
+    print(f"磁盘占用: {before / 1024 / 1024:.1f} MB -> {after / 1024 / 1024:.1f} MB ({ratio:.1%})")
+    print(f"目标缓存: {target.describe()}")
+
+    for cache in (source, target):
+        count, elapsed = read_all(cache)
+        print(f"读取全部 {count} 个页面 [{cache.name}]: {elapsed:.2f} 秒")
+    source.close()
+    target.close()
+
+
+def pack(args):
+    source = create_page_cache(args.source, args.source_path)
+    target_path = args.target_path or PackedArchive.default_path
+    print(f"打包 {source.describe()} -> {target_path}")
+
+    start = time.time()
+    count = build_pack(source, target_path)
+    print(f"打包页面: {count}，用时 {time.time() - start:.2f} 秒")
+
+    archive = PackedArchive(target_path)
+    before, after = source.disk_usage(), archive.disk_usage()
+    print(f"磁盘占用: {before / 1024 / 1024:.1f} MB -> {after / 1024 / 1024:.1f} MB")
+    for cache in (source, archive):
+        count, elapsed = read_all(cache)
+        print(f"读取全部 {count} 个页面 [{cache.name}]: {elapsed:.2f} 秒")
+    source.close()
+    archive.close()
+
+
+def open_managed_cache(args):
+    """按命令行参数打开带容量和过期策略的缓存"""
+    max_bytes = int(args.max_mb * 1024 * 1024) if args.max_mb is not None else None
+    ttl = args.ttl_days * 24 * 60 * 60 if args.ttl_days is not None else None
+    policy = CachePolicy(max_bytes=max_bytes, ttl=ttl, eviction=args.eviction)
+    return ManagedCache(create_page_cache(args.backend, args.path), policy)
+
+
+def stats(args):
+    cache = open_managed_cache(args)
+    print(cache.stats())
+    cache.close()
+
+
+def gc(args):
+    cache = open_managed_cache(args)
+    if cache.read_only:
+        print(f"{cache.describe()} 是只读的，无法回收")
+        cache.close()
+        sys.exit(1)
+    print(cache.policy.describe())
+    report = cache.gc(dry_run=args.dry_run)
+    print(report.report())
+    if args.verbose:
+        for key in report.expired:
+            print(f"  过期: {key}")
+        for key in report.evicted:
+            print(f"  淘汰: {key}")
+        for key in report.aliases:
+            print(f"  别名: {key}")
+    cache.close()
+
+
+def add_policy_arguments(subparser):
+    subparser.add_argument('--backend', choices=sorted(CACHE_BACKENDS), default='dir', help='缓存后端 (默认: dir)')
+    subparser.add_argument('--path', default=None, help='缓存路径 (默认: 后端的默认路径)')
+    subparser.add_argument('--max-mb', type=float, default=None, help='缓存大小上限(MB) (默认: 不限)')
+    subparser.add_argument('--ttl-days', type=float, default=None, help='页面有效期(天) (默认: 永不过期)')
+    subparser.add_argument('--eviction', choices=EVICTION_POLICIES, default='lru',
+                           help='淘汰顺序: lru=最久未访问，lrf=最早获取 (默认: lru)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='页面缓存管理工具')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    migrate_parser = subparsers.add_parser('migrate', help='在缓存后端之间复制页面和元数据')
+    migrate_parser.add_argument('--from', dest='source', choices=sorted(CACHE_BACKENDS), default='dir',
+                                help='源缓存后端 (默认: dir)')
+    migrate_parser.add_argument('--from-path', dest='source_path', default=None, help='源缓存路径')
+    migrate_parser.add_argument('--to', dest='target', choices=sorted(CACHE_BACKENDS), default='blob',
+                                help='目标缓存后端 (默认: blob)')
+    migrate_parser.add_argument('--to-path', dest='target_path', default=None, help='目标缓存路径')
+    migrate_parser.add_argument('--aliases', default=ALIASES_CSV,
+                                help=f'物品key到wiki_key的映射，迁移时写入别名表 (默认: {ALIASES_CSV})')
+    migrate_parser.set_defaults(func=migrate)
+
+    import_parser = subparsers.add_parser('import', help='把目录格式的缓存导入指定后端')
+    import_parser.add_argument('--to', dest='target', choices=sorted(CACHE_BACKENDS), default='sqlite',
+                               help='目标缓存后端 (默认: sqlite)')
+    import_parser.add_argument('--to-path', dest='target_path', default=None, help='目标缓存路径')
+    import_parser.add_argument('--from-path', dest='source_path', default=None, help='源缓存目录 (默认: cache)')
+    import_parser.add_argument('--aliases', default=ALIASES_CSV,
+                               help=f'物品key到wiki_key的映射，导入时写入别名表 (默认: {ALIASES_CSV})')
+    import_parser.set_defaults(func=migrate, source='dir')
+
+    export_parser = subparsers.add_parser('export', help='把指定后端的缓存导出为目录格式')
+    export_parser.add_argument('--from', dest='source', choices=sorted(CACHE_BACKENDS), default='sqlite',
+                               help='源缓存后端 (默认: sqlite)')
+    export_parser.add_argument('--from-path', dest='source_path', default=None, help='源缓存路径')
+    export_parser.add_argument('--to-path', dest='target_path', required=True, help='导出的目标目录')
+    # 别名在目录格式中导出为独立的页面文件
+    export_parser.set_defaults(func=migrate, target='dir', aliases=None)
+
+    pack_parser = subparsers.add_parser('pack', help='把缓存打包成内存映射的只读文件')
+    pack_parser.add_argument('--from', dest='source', choices=sorted(CACHE_BACKENDS), default='dir',
+                             help='源缓存后端 (默认: dir)')
+    pack_parser.add_argument('--from-path', dest='source_path', default=None, help='源缓存路径')
+    pack_parser.add_argument('--to-path', dest='target_path', default=None,
+                             help=f'打包文件路径 (默认: {PackedArchive.default_path})')
+    pack_parser.set_defaults(func=pack)
+
+    stats_parser = subparsers.add_parser('stats', help='显示缓存大小、命中率和页面年龄分布')
+    add_policy_arguments(stats_parser)
+    stats_parser.set_defaults(func=stats)
+
+    gc_parser = subparsers.add_parser('gc', help='删除过期页面，并按容量上限淘汰页面')
+    add_policy_arguments(gc_parser)
+    gc_parser.add_argument('--dry-run', action='store_true', help='只列出会被删除的页面，不实际删除')
+    gc_parser.add_argument('-v', '--verbose', action='store_true', help='列出每个被删除的页面')
+    gc_parser.set_defaults(func=gc)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,14 @@
+import argparse
 import json
 import os
-import re
 import csv
 import codecs
+import sys
+
+# 添加父目录到系统路径，以便导入etg_cache模块
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etg_cache import CACHE_BACKENDS, PAGE_EMPTY, ManagedCache, create_page_cache
 
 def convert_to_filename(item_id):
     """将item_id转换为可能的文件名格式"""
@@ -12,44 +18,36 @@ def convert_to_filename(item_id):
     filename = filename.replace(' ', '_')
     return filename
 
-def is_invalid_page(html_content):
-    """检查HTML内容是否表明页面不存在"""
-    # 检查是否包含"你想访问的页面"和"不存在"这两个关键词
-    if "你想访问的页面" in html_content and "不存在" in html_content:
-        # 尝试提取<em>标签中的内容
-        match = re.search(r'<em>(.*?)</em>', html_content)
-        if match:
-            return True, match.group(1)
-        return True, None
-    return False, None
-
 def main():
+    parser = argparse.ArgumentParser(description='找出缓存中的“页面不存在”页面，输出到invalid_pages.csv')
+    parser.add_argument('--cache-backend', type=str, choices=sorted(CACHE_BACKENDS), default='dir',
+                        help='页面缓存后端 (默认: dir)')
+    parser.add_argument('--cache-path', type=str, default=None, help='页面缓存路径 (默认: 后端的默认路径)')
+    args = parser.parse_args()
+
     # 读取itemtips-sample.tip文件
     with open('itemtips-sample.tip', 'r', encoding='utf-8') as f:
         tip_data = json.load(f)
     
-    # 获取cache目录下的所有html文件
-    cache_dir = 'cache'
-    cache_files = [f for f in os.listdir(cache_dir) if f.endswith('.html')]
+    # 页面状态在写入缓存时已经分类并记录在缓存清单中，这里只查询清单，不再读取页面
+    cache = ManagedCache(create_page_cache(args.cache_backend, args.cache_path))
+    cache_keys = cache.keys()
     
-    print(f"Cache目录中共有 {len(cache_files)} 个HTML文件")
+    print(f"Cache目录中共有 {len(cache_keys)} 个HTML文件")
     print(f"itemtips-sample.tip中共有 {len(tip_data['items'])} 个物品")
     print("=" * 50)
     
-    # 检查每个HTML文件是否有效
     invalid_pages = []
-    for html_file in cache_files:
-        file_path = os.path.join(cache_dir, html_file)
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                is_invalid, key = is_invalid_page(content)
-                if is_invalid:
-                    item_id = html_file.replace('.html', '')
-                    item_name = tip_data['items'].get(item_id, {}).get('name', '未知')
-                    invalid_pages.append((html_file, item_id, item_name, key))
-        except Exception as e:
-            print(f"读取文件 {html_file} 时出错: {e}")
+    for item_id, key in cache.missing_pages().items():
+        item_name = tip_data['items'].get(item_id, {}).get('name', '未知')
+        invalid_pages.append((f"{item_id}.html", item_id, item_name, key))
+    empty_keys = cache.keys_by_status(PAGE_EMPTY)
+    cache.close()
+    
+    if empty_keys:
+        print(f"发现 {len(empty_keys)} 个空页面或获取失败的页面（删除后重新运行即可重新下载）:")
+        for item_id in empty_keys:
+            print(f"  {item_id}")
     
     # 打印无效页面
     if invalid_pages:
@@ -1,5 +1,12 @@
+import argparse
 import json
 import os
+import sys
+
+# 添加父目录到系统路径，以便导入etg_cache模块
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etg_cache import CACHE_BACKENDS, create_page_cache
 
 def convert_to_filename(item_id):
     """将item_id转换为可能的文件名格式"""
@@ -10,13 +17,20 @@ def convert_to_filename(item_id):
     return filename
 
 def main():
+    parser = argparse.ArgumentParser(description='找出在缓存中没有对应页面的物品')
+    parser.add_argument('--cache-backend', type=str, choices=sorted(CACHE_BACKENDS), default='dir',
+                        help='页面缓存后端 (默认: dir)')
+    parser.add_argument('--cache-path', type=str, default=None, help='页面缓存路径 (默认: 后端的默认路径)')
+    args = parser.parse_args()
+
     # 读取itemtips-sample.tip文件
     with open('itemtips-sample.tip', 'r', encoding='utf-8') as f:
         tip_data = json.load(f)
     
-    # 获取cache目录下的所有html文件
-    cache_files = os.listdir('cache')
-    cache_files = [f.replace('.html', '') for f in cache_files if f.endswith('.html')]
+    # 获取缓存中的所有页面key
+    cache = create_page_cache(args.cache_backend, args.cache_path)
+    cache_files = set(cache.keys())
+    cache.close()
     
     print(f"Cache目录中共有 {len(cache_files)} 个HTML文件")
     print(f"itemtips-sample.tip中共有 {len(tip_data['items'])} 个物品")
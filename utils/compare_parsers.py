@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+用两种HTML解析后端分别提取缓存中所有页面的描述和联动，报告结果不同的页面
+
+切换默认解析后端或升级解析库之前先运行一遍，确认生成的tip文件不会因此变化。
+后端也可以是stream（流式提取器，见etg_parser.stream_extractor），用来检查它与文档树提取的结果一致。
+有差异时以非零状态退出，可以作为回归检查。
+"""
+
+import argparse
+import codecs
+import contextlib
+import csv
+import io
+import json
+import os
+import sys
+import time
+
+# 添加父目录到系统路径，以便导入etg_parser和etg_cache模块
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etg_cache import CACHE_BACKENDS, PAGE_VALID, ManagedCache, create_page_cache
+from etg_parser import (PARSER_BACKENDS, ParsedPage, extract_item_description, extract_item_streaming,
+                        extract_item_synergies)
+from etg_parser.parsed_page import check_parser_backend
+from etg_parser.stream_extractor import STREAM_MODE
+
+SAMPLE_FILE = 'itemtips-sample.tip'
+ALIASES_CSV = 'invalid_pages.csv'
+
+
+def load_page_names(sample_file=SAMPLE_FILE, aliases_csv=ALIASES_CSV):
+    """
+    找出每个页面对应的物品中文名，用于匹配infobox
+
+    返回:
+    - {wiki_key: 物品中文名}，多个物品指向同一页面时取第一个
+    """
+    aliases = {}
+    if os.path.exists(aliases_csv):
+        with open(aliases_csv, 'r', encoding='utf-8-sig', newline='') as f:
+            for row in csv.DictReader(f):
+                wiki_key = row['正确htmlKey'].strip()
+                if wiki_key:
+                    # 与generate_all_itemtips.normalize_key_for_url的标准化保持一致
+                    aliases[row['项目ID']] = wiki_key.replace('_', '-').lower()
+    with codecs.open(sample_file, 'r', encoding='utf-8-sig') as f:
+        items = json.load(f)['items']
+    names = {}
+    for key, item in items.items():
+        names.setdefault(aliases.get(key, key), item.get('name', key))
+    return names
+
+
+def extract_with(html_content, wiki_key, item_name_cn, backend):
+    """
+    用指定的解析后端（或STREAM_MODE表示流式提取）提取一个页面
+
+    返回:
+    - (description, synergies, 用时)
+    """
+    start = time.time()
+    # 提取函数会逐条打印匹配过程，这里不需要
+    with contextlib.redirect_stdout(io.StringIO()):
+        if backend == STREAM_MODE:
+            description, synergies = extract_item_streaming(html_content, wiki_key, item_name_cn)
+        else:
+            page = ParsedPage(html_content, backend)
+            description = extract_item_description(page, wiki_key, item_name_cn)
+            synergies = extract_item_synergies(page)
+    return description, synergies, time.time() - start
+
+
+def first_difference(a, b):
+    """返回两个字符串第一个不同位置附近的片段"""
+    i = next((i for i, (x, y) in enumerate(zip(a, b)) if x != y), min(len(a), len(b)))
+    start = max(0, i - 20)
+    return repr(a[start:i + 40]), repr(b[start:i + 40])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='比较两种HTML解析后端在所有缓存页面上的提取结果')
+    parser.add_argument('--backends', nargs=2, choices=sorted(PARSER_BACKENDS) + [STREAM_MODE],
+                        default=['html.parser', 'lxml'], metavar='BACKEND',
+                        help=f'要比较的两个解析后端，{STREAM_MODE}为流式提取 (默认: html.parser lxml)')
+    parser.add_argument('--cache-backend', type=str, choices=sorted(CACHE_BACKENDS), default='dir',
+                        help='页面缓存后端 (默认: dir)')
+    parser.add_argument('--cache-path', type=str, default=None, help='页面缓存路径 (默认: 后端的默认路径)')
+    parser.add_argument('--keys', nargs='*', default=None, help='只比较这些页面 (默认: 缓存中的所有正常页面)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='打印每个差异的具体内容')
+    args = parser.parse_args()
+
+    backend_a, backend_b = args.backends
+    for backend in args.backends:
+        if backend == STREAM_MODE:
+            continue
+        try:
+            check_parser_backend(backend)
+        except ValueError as e:
+            print(e)
+            sys.exit(2)
+
+    names = load_page_names()
+    cache = ManagedCache(create_page_cache(args.cache_backend, args.cache_path))
+    keys = args.keys if args.keys is not None else cache.keys_by_status(PAGE_VALID)
+    print(f"比较 {backend_a} 和 {backend_b}，共 {len(keys)} 个页面 ({cache.describe()})")
+
+    timings = {backend_a: 0.0, backend_b: 0.0}
+    differences = []
+    for wiki_key in keys:
+        html_content = cache.get(wiki_key)
+        if html_content is None:
+            print(f"缓存中没有页面 {wiki_key}，跳过")
+            continue
+        item_name_cn = names.get(wiki_key)
+        desc_a, syn_a, elapsed_a = extract_with(html_content, wiki_key, item_name_cn, backend_a)
+        desc_b, syn_b, elapsed_b = extract_with(html_content, wiki_key, item_name_cn, backend_b)
+        timings[backend_a] += elapsed_a
+        timings[backend_b] += elapsed_b
+
+        parts = []
+        if desc_a != desc_b:
+            parts.append('描述')
+        if syn_a != syn_b:
+            parts.append('联动')
+        if not parts:
+            continue
+        differences.append(wiki_key)
+        print(f"{wiki_key}: {'和'.join(parts)}不同")
+        if args.verbose:
+            if desc_a != desc_b:
+                snippet_a, snippet_b = first_difference(desc_a, desc_b)
+                print(f"  {backend_a}: {snippet_a}")
+                print(f"  {backend_b}: {snippet_b}")
+            if syn_a != syn_b:
+                print(f"  {backend_a}: {json.dumps(syn_a, ensure_ascii=False)}")
+                print(f"  {backend_b}: {json.dumps(syn_b, ensure_ascii=False)}")
+    cache.close()
+
+    for backend, elapsed in timings.items():
+        print(f"{backend}: 解析和提取用时 {elapsed:.2f} 秒")
+    if differences:
+        print(f"有 {len(differences)} 个页面的提取结果不同")
+        sys.exit(1)
+    print("所有页面的提取结果一致")
+
+
+if __name__ == "__main__":
+    main()
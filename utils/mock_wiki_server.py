@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+本地模拟wiki服务器
+
+把cache/目录下的HTML按wikidot的URL格式(/<wiki_key>)提供出来，
+可以注入延迟、随机错误和限流，用于在没有网络的机器上测试和调优抓取流程。
+"""
+
+import argparse
+import email.utils
+import hashlib
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+CACHE_DIR = 'cache'
+
+# wikidot“页面不存在”页面的最小结构，和真实缓存中的存根页面一致
+MISSING_PAGE_TEMPLATE = (
+    '<html><head><meta charset="utf-8"></head><body>'
+    '<div id="page-content"><p>你想访问的页面 <em>{key}</em> 不存在。</p></div>'
+    '</body></html>'
+)
+
+
+class MockWikiConfig:
+    """
+    模拟服务器的故障注入配置
+
+    参数:
+    - latency: 每个请求的基础延迟（秒）
+    - jitter: 在基础延迟上随机增加的最大时间（秒）
+    - error_rate: 随机返回500/503的概率(0~1)
+    - throttle_rps: 每秒允许的请求数，超出返回429，0表示不限流
+    - seed: 随机数种子，便于复现
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, throttle_rps=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rps = throttle_rps
+        self.rng = random.Random(seed)
+
+
+class MockWikiStats:
+    """模拟服务器收到的请求统计"""
+
+    def __init__(self):
+        self.requests = 0
+        self.served = 0
+        self.not_modified = 0
+        self.missing = 0
+        self.errors = 0
+        self.throttled = 0
+        self.max_in_flight = 0
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+    def report(self):
+        return "\n".join([
+            "模拟wiki服务器统计:",
+            f"请求: {self.requests}，返回页面: {self.served}，304: {self.not_modified}，不存在: {self.missing}",
+            f"注入错误: {self.errors}，限流(429): {self.throttled}，最大同时请求: {self.max_in_flight}",
+        ])
+
+
+class MockWikiHandler(BaseHTTPRequestHandler):
+    server_version = 'MockWikidot/1.0'
+
+    def log_message(self, format, *args):
+        # 基准测试时不打印每个请求
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _throttled(self):
+        config = self.server.config
+        if not config.throttle_rps:
+            return False
+        with self.server.bucket_lock:
+            now = time.monotonic()
+            elapsed = now - self.server.bucket_updated
+            self.server.bucket_tokens = min(config.throttle_rps, self.server.bucket_tokens + elapsed * config.throttle_rps)
+            self.server.bucket_updated = now
+            if self.server.bucket_tokens < 1:
+                return True
+            self.server.bucket_tokens -= 1
+            return False
+
+    def _send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body and self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_GET(self):
+        stats = self.server.stats
+        config = self.server.config
+        with stats.lock:
+            stats.requests += 1
+            stats.in_flight += 1
+            stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+        try:
+            self._handle(stats, config)
+        finally:
+            with stats.lock:
+                stats.in_flight -= 1
+
+    do_HEAD = do_GET
+
+    def _handle(self, stats, config):
+        if self._throttled():
+            with stats.lock:
+                stats.throttled += 1
+            self._send(429, b'Too Many Requests', {'Retry-After': '1'})
+            return
+
+        delay = config.latency + (config.rng.uniform(0, config.jitter) if config.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        if config.error_rate and config.rng.random() < config.error_rate:
+            with stats.lock:
+                stats.errors += 1
+            self._send(config.rng.choice([500, 503]), b'Internal Server Error')
+            return
+
+        wiki_key = unquote(urlparse(self.path).path).strip('/') or 'start'
+        page_file = os.path.join(self.server.cache_dir, f"{wiki_key}.html")
+        if '/' in wiki_key or not os.path.isfile(page_file):
+            with stats.lock:
+                stats.missing += 1
+            body = MISSING_PAGE_TEMPLATE.format(key=wiki_key).encode('utf-8')
+            self._send(404, body, {'Content-Type': 'text/html; charset=utf-8'})
+            return
+
+        with open(page_file, 'rb') as f:
+            body = f.read()
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        last_modified = email.utils.formatdate(os.path.getmtime(page_file), usegmt=True)
+        if self.headers.get('If-None-Match') == etag:
+            with stats.lock:
+                stats.not_modified += 1
+            self._send(304, headers={'ETag': etag, 'Last-Modified': last_modified})
+            return
+
+        with stats.lock:
+            stats.served += 1
+        self._send(200, body, {
+            'Content-Type': 'text/html; charset=utf-8',
+            'ETag': etag,
+            'Last-Modified': last_modified,
+        })
+
+
+class MockWikiServer(ThreadingHTTPServer):
+    """
+    以wikidot URL格式提供缓存页面的本地HTTP服务器
+
+    参数:
+    - cache_dir: 提供页面的缓存目录
+    - config: MockWikiConfig故障注入配置
+    - host, port: 监听地址，port为0时自动选择空闲端口
+    """
+    daemon_threads = True
+
+    def __init__(self, cache_dir=CACHE_DIR, config=None, host='127.0.0.1', port=0, verbose=False):
+        super().__init__((host, port), MockWikiHandler)
+        self.cache_dir = cache_dir
+        self.config = config or MockWikiConfig()
+        self.stats = MockWikiStats()
+        self.verbose = verbose
+        self.bucket_tokens = self.config.throttle_rps
+        self.bucket_updated = time.monotonic()
+        self.bucket_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        """在后台线程中启动服务器"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止服务器"""
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='以wikidot URL格式提供cache/中的页面，可注入延迟、错误和限流')
+    parser.add_argument('--cache-dir', type=str, default=CACHE_DIR, help=f'页面目录 (默认: {CACHE_DIR})')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='监听地址 (默认: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000, help='监听端口 (默认: 8000)')
+    parser.add_argument('--latency', type=float, default=0.0, help='每个请求的基础延迟，秒 (默认: 0)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='随机附加延迟上限，秒 (默认: 0)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='随机返回500/503的概率 (默认: 0)')
+    parser.add_argument('--throttle-rps', type=float, default=0.0, help='每秒允许的请求数，超出返回429 (默认: 0，不限流)')
+    parser.add_argument('--seed', type=int, default=None, help='随机数种子')
+    args = parser.parse_args()
+
+    config = MockWikiConfig(args.latency, args.jitter, args.error_rate, args.throttle_rps, args.seed)
+    server = MockWikiServer(args.cache_dir, config, args.host, args.port, verbose=True)
+    print(f"模拟wiki服务器已启动: {server.base_url} (页面目录: {args.cache_dir})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(server.stats.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+把已有缓存页面裁剪为只含#page-content子树的形式
+
+解析器只读取#page-content中的内容，裁剪掉wikidot的导航、脚本和页面框架后，
+缓存体积和后续每次读取、解析的开销都会相应减少。已裁剪的页面会被跳过，可以重复运行。
+"""
+
+import argparse
+import os
+import sys
+
+# 添加父目录到系统路径，以便导入etg_cache模块
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from etg_cache import build_metadata, is_trimmed, list_cached_keys, read_cached_page, read_metadata, trim_page, write_metadata
+from etg_cache.pages import mark_trimmed, page_path
+
+CACHE_DIR = 'cache'
+
+
+def trim_cached_page(cache_dir, wiki_key, dry_run=False):
+    """
+    裁剪单个缓存页面，元数据中保留原始页面的哈希和大小
+
+    返回:
+    - (状态, 原大小, 裁剪后大小)，状态为'trimmed'、'skipped'或'failed'
+    """
+    path = page_path(cache_dir, wiki_key)
+    html_content = read_cached_page(cache_dir, wiki_key)
+    size = len(html_content.encode('utf-8'))
+    if is_trimmed(html_content):
+        return 'skipped', size, size
+
+    trimmed = trim_page(html_content)
+    if trimmed is None:
+        return 'failed', size, size
+    trimmed_size = len(trimmed.encode('utf-8'))
+    if dry_run:
+        return 'trimmed', size, trimmed_size
+
+    metadata = read_metadata(cache_dir, wiki_key)
+    if metadata is None:
+        # 旧缓存没有元数据，先按原始页面补一份
+        metadata = build_metadata(wiki_key, html_content, fetched_at=os.path.getmtime(path))
+    mark_trimmed(metadata, trimmed)
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(trimmed)
+    os.replace(tmp_path, path)
+    write_metadata(cache_dir, wiki_key, metadata)
+    return 'trimmed', size, trimmed_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='把缓存页面裁剪为只含#page-content子树的形式')
+    parser.add_argument('--cache-dir', type=str, default=CACHE_DIR, help=f'缓存目录 (默认: {CACHE_DIR})')
+    parser.add_argument('--dry-run', action='store_true', help='只统计能节省的空间，不修改文件')
+    args = parser.parse_args()
+
+    keys = list_cached_keys(args.cache_dir)
+    counts = {'trimmed': 0, 'skipped': 0, 'failed': 0}
+    total_before = total_after = 0
+    for wiki_key in keys:
+        status, before, after = trim_cached_page(args.cache_dir, wiki_key, args.dry_run)
+        counts[status] += 1
+        total_before += before
+        total_after += after
+        if status == 'failed':
+            print(f"{wiki_key}: 找不到完整的#page-content，保持原样")
+
+    saved = total_before - total_after
+    ratio = saved / total_before if total_before else 0.0
+    action = "可裁剪" if args.dry_run else "已裁剪"
+    print(f"共 {len(keys)} 个页面，{action}: {counts['trimmed']}，已是裁剪形式: {counts['skipped']}，失败: {counts['failed']}")
+    print(f"缓存大小: {total_before / 1024 / 1024:.1f} MB -> {total_after / 1024 / 1024:.1f} MB，节省 {ratio:.1%}")
+
+
+if __name__ == "__main__":
+    main()